@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from beanie.operators import In
 from app.db import models, schemas
 from app.core import auth
+from app.services.market_snapshot import market_snapshot
+from app.services.symbol_resolver import symbol_resolver
+from collections import defaultdict
 from typing import List
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
@@ -13,95 +17,76 @@ async def get_pending_users(current_user: models.User = Depends(auth.get_current
 async def get_users_overview(current_user: models.User = Depends(auth.get_current_admin)):
     """Fetches all approved users and their active portfolio holdings with live pricing."""
     from app.core import config
-    import yfinance as yf
-    import asyncio
     
     # 1. Get all approved non-admin users
     users = await models.User.find(
         models.User.is_approved == True,
         models.User.is_superuser == False
     ).to_list()
+    user_ids = [str(user.id) for user in users]
+    
+    # 2. Open trades and realized PnL for every user at once (two queries, not two per user)
+    open_trades = await models.Trade.find(
+        In(models.Trade.user_id, user_ids),
+        models.Trade.status == "OPEN"
+    ).to_list() if user_ids else []
+    realized = await models.Trade.aggregate([
+        {"$match": {"user_id": {"$in": user_ids}, "status": "CLOSED"}},
+        {"$group": {"_id": "$user_id", "pnl": {"$sum": "$pnl"}}}
+    ]).to_list() if user_ids else []
+    realized_pnl = {row["_id"]: row["pnl"] for row in realized}
+    
+    trades_by_user = defaultdict(list)
+    for trade in open_trades:
+        trades_by_user[trade.user_id].append(trade)
+    
+    # 3. Live prices for every held symbol from the shared last-price table
+    tickers = symbol_resolver.yf_tickers(t.symbol for t in open_trades)
+    prices = await market_snapshot.prices(tickers.values())
     
     overview_data = []
     
     # Process each user
     for user in users:
-        # Get active trades
-        active_trades = await models.Trade.find(
-            models.Trade.user_id == str(user.id),
-            models.Trade.status == "OPEN"
-        ).to_list()
-        
+        user_id = str(user.id)
         user_portfolio = {
-            "id": str(user.id),
+            "id": user_id,
             "email": user.email,
             "status": "Active" if user.is_active else "Inactive",
             "initial_balance": config.INITIAL_BALANCE,
             "holdings": [],
             "total_exposure": 0.0,
             "unrealized_pnl": 0.0,
-            "total_equity": config.INITIAL_BALANCE  # Will add realized PnL later
+            # Realized PnL for accurate total equity
+            "total_equity": config.INITIAL_BALANCE + realized_pnl.get(user_id, 0.0)
         }
         
-        # Get realized PnL for accurate total equity
-        closed_trades = await models.Trade.find(
-            models.Trade.user_id == str(user.id),
-            models.Trade.status == "CLOSED"
-        ).to_list()
-        realized_pnl = sum([t.pnl for t in closed_trades])
-        user_portfolio["total_equity"] += realized_pnl
-        
-        if not active_trades:
-            overview_data.append(user_portfolio)
-            continue
-            
-        # Fetch live prices for active holdings
-        symbols = list(set([t.symbol for t in active_trades]))
-        yf_symbols = []
-        for s in symbols:
-            if s == "NIFTY": yf_symbols.append("^NSEI")
-            elif s == "BANKNIFTY": yf_symbols.append("^NSEBANK")
-            elif "." not in s and not s.startswith("^"): yf_symbols.append(f"{s}.NS")
-            else: yf_symbols.append(s)
-            
-        try:
-            data_df = await asyncio.to_thread(yf.download, yf_symbols, period="1d", interval="1m", progress=False)
-            data = data_df['Close'] if 'Close' in data_df else data_df
-            
-            for trade in active_trades:
-                price_col = trade.symbol
-                if trade.symbol == "NIFTY": price_col = "^NSEI"
-                elif trade.symbol == "BANKNIFTY": price_col = "^NSEBANK"
-                elif "." not in trade.symbol and not trade.symbol.startswith("^"): price_col = f"{trade.symbol}.NS"
+        for trade in trades_by_user.get(user_id, []):
+            current_price = prices.get(tickers[trade.symbol])
+            if current_price is None:
+                continue
                 
-                try:
-                    current_price = float(data[price_col].iloc[-1]) if len(yf_symbols) > 1 else float(data.iloc[-1])
-                    
-                    pnl = 0.0
-                    if trade.side == "BUY":
-                        pnl = (current_price - trade.entry_price) * trade.quantity
-                    else:
-                        pnl = (trade.entry_price - current_price) * trade.quantity
-                        
-                    exposure = current_price * trade.quantity
-                    user_portfolio["total_exposure"] += exposure
-                    user_portfolio["unrealized_pnl"] += pnl
-                    
-                    user_portfolio["holdings"].append({
-                        "trade_id": str(trade.id),
-                        "symbol": trade.symbol,
-                        "side": trade.side,
-                        "quantity": trade.quantity,
-                        "entry_price": trade.entry_price,
-                        "current_price": current_price,
-                        "pnl": pnl,
-                        "pnl_pct": (pnl / (trade.entry_price * trade.quantity)) * 100 if trade.entry_price > 0 else 0,
-                        "timestamp": trade.timestamp
-                    })
-                except Exception as e:
-                    pass
-        except Exception as e:
-            pass
+            pnl = 0.0
+            if trade.side == "BUY":
+                pnl = (current_price - trade.entry_price) * trade.quantity
+            else:
+                pnl = (trade.entry_price - current_price) * trade.quantity
+                
+            exposure = current_price * trade.quantity
+            user_portfolio["total_exposure"] += exposure
+            user_portfolio["unrealized_pnl"] += pnl
+            
+            user_portfolio["holdings"].append({
+                "trade_id": str(trade.id),
+                "symbol": trade.symbol,
+                "side": trade.side,
+                "quantity": trade.quantity,
+                "entry_price": trade.entry_price,
+                "current_price": current_price,
+                "pnl": pnl,
+                "pnl_pct": (pnl / (trade.entry_price * trade.quantity)) * 100 if trade.entry_price > 0 else 0,
+                "timestamp": trade.timestamp
+            })
             
         user_portfolio["total_equity"] += user_portfolio["unrealized_pnl"]
         overview_data.append(user_portfolio)
@@ -3,7 +3,7 @@ import os
 import json
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-import httpx
+from app.utils.http_pool import get_client
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -175,7 +175,7 @@ async def chat_with_ai(request: Request):
     }
 
     async def stream_generator():
-        client = httpx.AsyncClient(timeout=30.0)
+        client = get_client("anthropic")
         try:
             async with client.stream(
                 "POST", 
@@ -201,7 +201,5 @@ async def chat_with_ai(request: Request):
         except Exception as e:
             logger.error(f"Streaming error: {e}")
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
-        finally:
-            await client.aclose()
 
     return StreamingResponse(stream_generator(), media_type="text/event-stream")
@@ -1,60 +1,193 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.db import models
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.db import models, schemas
 from app.core import auth
-from app.services.backtester import VectorizedBacktester
+from app.services import backtest_jobs as jobs
+from app.services.backtest_jobs import backtest_jobs
+from app.services.curve_store import load_curve
+from app.utils.downsample import lttb
+from app.utils.frame_codec import encode_message
 from typing import List
 import os
 from app.core import config
 from datetime import datetime, timezone
+import logging
 
 router = APIRouter(prefix="/api/v1/backtest", tags=["backtest"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/run")
 async def run_backtest(
     symbol: str,
     period: str = "1y",
     interval: str = "1d",
     initial_capital: float = 100000.0,
+    mode: str = "vectorized",
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Executes a vectorized backtest and stores results."""
+    """Executes a backtest (vectorized, or event-driven with impact and stops) and stores results."""
     try:
-        tester = VectorizedBacktester(symbol, initial_capital=initial_capital)
-        results = await tester.run(period=period, interval=interval)
-        
-        # Persist to DB
-        backtest_run = models.BacktestRun(
-            symbol=symbol,
-            user_id=str(current_user.id),
-            period=period,
-            interval=interval,
-            metrics=results,
-            equity_curve=results["equity_curve"],
-            config={
-                "initial_capital": initial_capital,
-                "strategy": "Regime-Aware Ensemble"
-            }
-        )
-        await backtest_run.insert()
-        
+        request = schemas.BacktestRequest(symbol=symbol, period=period, interval=interval, initial_capital=initial_capital, mode=mode)
+        results, _ = await jobs.run_single_backtest(str(current_user.id), request)
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
-@router.get("/history", response_model=List[models.BacktestRun])
-async def get_backtest_history(
+@router.post("/portfolio")
+async def run_portfolio_backtest(
+    request: schemas.PortfolioBacktestRequest,
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Retrieves previous backtest runs for the current user."""
-    return await models.BacktestRun.find(models.BacktestRun.user_id == str(current_user.id)).sort("-timestamp").to_list()
+    """Backtests a basket with Kelly sizing and portfolio risk limits, and stores the results."""
+    try:
+        results, _ = await jobs.run_portfolio_backtest(str(current_user.id), request)
+        return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Portfolio backtest failed: {str(e)}")
 
-@router.get("/{run_id}", response_model=models.BacktestRun)
-async def get_backtest_result(
-    run_id: str,
+@router.post("/optimize")
+async def run_optimization(
+    request: schemas.OptimizationRequest,
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    """Retrieves a specific backtest run result."""
+    """Parameter sweep (grid/random) or walk-forward optimization, stored as one run group."""
+    try:
+        summary, group_id = await jobs.run_optimization(str(current_user.id), request)
+        return {"group_id": group_id, **summary}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+
+# --- Asynchronous jobs ---
+
+def _owned_job(job_id: str, current_user: models.User) -> jobs.BacktestJob:
+    job = backtest_jobs.get(job_id)
+    if not job or job.user_id != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return job
+
+@router.post("/jobs", status_code=202)
+async def submit_backtest_job(
+    request: schemas.BacktestJobRequest,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Queues a backtest (single / portfolio / optimize) and returns its job id immediately.
+    Follow it via /jobs/{job_id}/events (SSE) or the terminal topic BACKTEST:<job_id>.
+    """
+    try:
+        job = backtest_jobs.submit(request.kind, str(current_user.id), request.params, request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job.snapshot()
+
+@router.get("/jobs")
+async def list_backtest_jobs(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Current user's queued, running and recently finished jobs."""
+    return [job.snapshot() for job in backtest_jobs.jobs_for(str(current_user.id))]
+
+@router.get("/jobs/{job_id}")
+async def get_backtest_job(
+    job_id: str,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    return _owned_job(job_id, current_user).snapshot()
+
+@router.delete("/jobs/{job_id}")
+async def cancel_backtest_job(
+    job_id: str,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    job = _owned_job(job_id, current_user)
+    if not backtest_jobs.cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status.lower()}")
+    return {"job_id": job.id, "cancelled": True}
+
+@router.get("/jobs/{job_id}/events")
+async def stream_backtest_job(
+    job_id: str,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Server-Sent Events: current state, progress, then the final result (fetch the curve from /{run_id}/equity)."""
+    job = _owned_job(job_id, current_user)
+
+    async def event_stream():
+        async for event in backtest_jobs.events(job):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {encode_message(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.get("/groups", response_model=List[models.BacktestRunGroup])
+async def get_optimization_history(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Retrieves previous optimization run groups for the current user."""
+    return await models.BacktestRunGroup.find(models.BacktestRunGroup.user_id == str(current_user.id)).sort("-timestamp").to_list()
+
+@router.get("/groups/{group_id}", response_model=models.BacktestRunGroup)
+async def get_optimization_result(
+    group_id: str,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Retrieves a specific optimization run group."""
+    group = await models.BacktestRunGroup.get(group_id)
+    if not group or group.user_id != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Optimization run not found")
+    return group
+
+@router.get("/history", response_model=List[models.BacktestRunSummary])
+async def get_backtest_history(
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Retrieves previous backtest runs for the current user (metrics only; fetch curves via /{run_id}/equity)."""
+    return await models.BacktestRun.find(
+        models.BacktestRun.user_id == str(current_user.id)
+    ).sort("-timestamp").project(models.BacktestRunSummary).to_list()
+
+async def _owned_run(run_id: str, current_user: models.User) -> models.BacktestRun:
     run = await models.BacktestRun.get(run_id)
     if not run or run.user_id != str(current_user.id):
         raise HTTPException(status_code=404, detail="Backtest run not found")
     return run
+
+@router.get("/{run_id}/equity")
+async def get_backtest_equity(
+    run_id: str,
+    points: int = Query(1000, ge=2, le=config.CURVE_MAX_POINTS),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Equity curve of a run, LTTB-downsampled to at most `points` points (x is the bar index)."""
+    run = await _owned_run(run_id, current_user)
+    curve = await load_curve(run)
+    if curve is None:
+        raise HTTPException(status_code=404, detail="Equity curve not found")
+    keep = lttb(curve, points)
+    return {
+        "run_id": run_id,
+        "total": len(curve),
+        "points": len(keep),
+        "x": keep.tolist(),
+        "y": [round(float(v), 2) for v in curve[keep]],
+    }
+
+@router.get("/{run_id}", response_model=models.BacktestRunSummary)
+async def get_backtest_result(
+    run_id: str,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """Retrieves a specific backtest run result (without the curve)."""
+    run = await _owned_run(run_id, current_user)
+    return models.BacktestRunSummary.model_validate(run.model_dump(by_alias=True))
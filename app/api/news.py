@@ -53,6 +53,5 @@ async def force_refresh(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Force refresh the news cache."""
-    news_service._last_update = 0
-    articles = await news_service.get_feed()
+    articles = await news_service.get_feed(force=True)
     return {"refreshed": True, "count": len(articles)}
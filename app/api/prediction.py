@@ -1,27 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from app.db import models, schemas
 from app.core import auth
 from app.services.ml_engine import MarketAnalyzer
 from app.services.risk_engine import RiskEngine
 import logging
 import re
-import json
-import os
 from app.core import config
 import asyncio
 from typing import List, Dict
 from datetime import datetime, timedelta, timezone
 from app.services.trading_manager import TradingManager
 from app.services.ai_auditor import AIAuditor
+from app.services.batch_predictor import batch_predictor
+from app.services.symbol_resolver import symbol_resolver, AXIOM_WATCHLIST
+from app.services.symbol_catalog import symbol_catalog
+from app.api.terminal import SYMBOL_PATTERN
 
 router = APIRouter(prefix="/api/v1/predict", tags=["prediction"])
 trading_mgr = TradingManager()
 
 logger = logging.getLogger(__name__)
 
-# Path to symbol data
-SYMBOL_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "nse_symbols.json")
-
 # --- CONCURRENCY LOCKS ---
 # Prevents race conditions where parallel requests bypass deduplication
 # Key: (user_id, symbol)
@@ -29,30 +28,51 @@ symbol_locks: Dict[tuple, asyncio.Lock] = {}
 
 @router.get("/symbols/{exchange}")
 async def get_exchange_symbols(exchange: str):
-    """Returns a list of top symbols for the requested exchange."""
-    exchange = exchange.lower()
-    
-    # Map valid exchanges to their data files
-    exchange_files = {
-        "nse": "nse_symbols.json",
-        "bse": "bse_symbols.json",
-        "us": "us_symbols.json",
-        "japan": "japan_symbols.json"
-    }
-    
-    if exchange not in exchange_files:
+    """Returns the symbol listing of the requested exchange (nse / bse / us / uk / japan)."""
+    body = symbol_catalog.listing_body(exchange)
+    if body is None:
         raise HTTPException(status_code=404, detail="Exchange not supported")
-        
-    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", exchange_files[exchange])
-    
+    return Response(content=body, media_type="application/json")
+
+@router.post("/batch")
+async def get_batch_prediction(
+    request: schemas.BatchPredictionRequest,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Screens a watchlist (default: the whole AXIOM watchlist) in one provider call.
+    Read-only: unlike /{symbol} it neither logs predictions nor opens positions.
+    """
+    if request.symbols:
+        requested = list(dict.fromkeys(s.strip().upper() for s in request.symbols))
+        # Same symbol grammar as terminal subscriptions: indices like "NIFTY 50" / "S&P 500" are valid
+        invalid = [s for s in requested if not SYMBOL_PATTERN.match(s)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid stock symbol format: {', '.join(invalid[:5])}")
+    else:
+        requested = list(AXIOM_WATCHLIST.keys())
+    if len(requested) > config.BATCH_PREDICT_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {config.BATCH_PREDICT_MAX_SYMBOLS} symbols per batch.")
+
+    # Score each yfinance ticker once; aliases (INFY, INFY.NS) each get their ticker's result
+    symbol_tickers = symbol_resolver.yf_tickers(requested)
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return []
+        scored = await batch_predictor.predict(list(dict.fromkeys(symbol_tickers.values())), period=request.period, interval=request.interval)
     except Exception as e:
-        logger.error(f"Error loading symbols for {exchange}: {e}")
-        return []
+        logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Batch prediction failed. Please try again later.")
+
+    results = {}
+    for display_name, ticker in symbol_tickers.items():
+        if ticker in scored:
+            results[display_name] = {**scored[ticker], "symbol": display_name}
+    return {
+        "interval": request.interval,
+        "period": request.period,
+        "count": len(results),
+        "missing": [sym for sym in requested if sym not in results],
+        "results": results
+    }
 
 @router.get("/{symbol}")
 async def get_prediction(
@@ -126,7 +146,7 @@ async def get_prediction(
             # --- HFT Algo 5.1/5.2: Risk Management Integration ---
             from app.core.constants import OrderSide
             risk_engine = RiskEngine(account_balance=config.INITIAL_BALANCE)
-            atr = analyzer.data['ATR'].iloc[-1]
+            atr = analyzer.signals['ATR'].iloc[-1]
             
             side = OrderSide.BUY if result['prediction'] == "BULLISH" else OrderSide.SELL
             risk_details = risk_engine.get_position_details(
@@ -1,17 +1,60 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from app.services.websocket_manager import ws_manager
-from app.core import auth
+from app.services.websocket_manager import ws_manager, equity_topic, backtest_topic, TOPIC_VESSELS, TOPIC_AIRCRAFT, TOPIC_MACRO, EQUITY_TOPIC_PREFIX
+from app.services.backtest_jobs import backtest_jobs
+from app.services.macro_service import macro_service
+from app.services.symbol_resolver import AXIOM_WATCHLIST
+from app.core import auth, config
+from app.utils.frame_codec import Frame, negotiate_encoding
+from app.utils.spatial_index import Viewport
+import re
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ws", tags=["Terminal WS"])
 
+CHANNELS = {TOPIC_VESSELS, TOPIC_AIRCRAFT, TOPIC_MACRO}
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.&^=:\- ]{1,20}$")
+
+def _error_frame(detail: str, symbols: list) -> Frame:
+    return Frame({"type": "ERROR", "detail": detail, "symbols": symbols})
+
+def _parse_topics(message: dict, user_id: str) -> tuple:
+    """
+    Accepts {"symbol": "AAPL"}, {"symbols": [...]}, {"channel(s)": "VESSELS" | "AIRCRAFT" | "MACRO"}
+    and/or {"job(s)": "<backtest job id>"} (the user's own jobs only).
+    Returns (hub topic names, symbols rejected as malformed).
+    """
+    symbols = message.get("symbols") or []
+    if not isinstance(symbols, list):
+        symbols = [symbols]
+    if message.get("symbol"):
+        symbols = [message["symbol"], *symbols]
+    channels = message.get("channels") or []
+    if message.get("channel"):
+        channels = [message["channel"], *channels]
+    
+    symbols = [str(s).strip().upper() for s in symbols if s]
+    invalid = [s for s in symbols if not SYMBOL_PATTERN.match(s)]
+    topics = [equity_topic(s) for s in symbols if SYMBOL_PATTERN.match(s)]
+    topics += [str(c).upper() for c in channels if str(c).upper() in CHANNELS]
+
+    job_ids = message.get("jobs") or []
+    if message.get("job"):
+        job_ids = [message["job"], *job_ids]
+    for job_id in job_ids:
+        job = backtest_jobs.get(str(job_id))
+        if job and job.user_id == user_id:
+            topics.append(backtest_topic(job.id))
+    return topics, invalid
+
 @router.websocket("/terminal/{client_id}")
 async def websocket_terminal_endpoint(
     websocket: WebSocket, 
     client_id: str,
-    token: str = Query(None)
+    token: str = Query(None),
+    encoding: str = Query("json", description="Frame encoding: json / msgpack"),
+    trades: str = Query("batch", description="Trade delivery: batch (EQUITY_BATCH) / raw (EQUITY tape)")
 ):
     # Enforce authentication on handshake
     try:
@@ -26,8 +69,16 @@ async def websocket_terminal_endpoint(
             await websocket.accept()
             await websocket.close(code=4403, reason="Unauthorized or Pending Approval")
             return
-            
-        await ws_manager.connect_client(websocket)
+        
+        # Default interest: both geo channels plus the user's watchlist (or the house list)
+        symbols = (user.watchlist or list(AXIOM_WATCHLIST.keys()))[:config.WS_MAX_SYMBOLS_PER_CLIENT]
+        await ws_manager.connect_client(
+            websocket,
+            encoding=negotiate_encoding(encoding),
+            trade_mode=trades.lower(),
+            user_id=str(user.id),
+            topics=[TOPIC_VESSELS, TOPIC_AIRCRAFT] + [equity_topic(s) for s in symbols]
+        )
     except Exception as e:
         logger.error(f"WS Auth Error for {client_id}: {e}")
         await websocket.close(code=4000)
@@ -38,12 +89,39 @@ async def websocket_terminal_endpoint(
             # We mostly broadcast, but we can handle inbound commands here
             data = await websocket.receive_text()
             message = json.loads(data)
+            msg_type = message.get("type")
+            
+            # Topic routing: only subscribed sockets receive a feed
+            if msg_type == "SUBSCRIBE":
+                topics, invalid = _parse_topics(message, str(user.id))
+                if invalid:
+                    ws_manager.send_frame(websocket, _error_frame("Invalid symbol", invalid))
+                rejected = await ws_manager.subscribe(websocket, topics)
+                if rejected:
+                    ws_manager.send_frame(websocket, _error_frame(
+                        f"At most {config.WS_MAX_SYMBOLS_PER_CLIENT} symbols per terminal",
+                        [t[len(EQUITY_TOPIC_PREFIX):] for t in rejected]
+                    ))
+                # Macro panels only change on refresh: start the subscriber off with the current set
+                snapshot = macro_service.snapshot_frame() if TOPIC_MACRO in topics else None
+                if snapshot:
+                    ws_manager.send_frame(websocket, snapshot)
+                logger.info(f"Client {client_id} subscribed to {topics}")
+            
+            elif msg_type == "UNSUBSCRIBE":
+                topics, _ = _parse_topics(message, str(user.id))
+                ws_manager.unsubscribe(websocket, topics)
+                logger.info(f"Client {client_id} unsubscribed from {topics}")
+            
+            # Map window: {"bbox": [west, south, east, north], "zoom": z}
+            elif msg_type == "VIEWPORT":
+                viewport = Viewport.from_message(message)
+                if viewport:
+                    ws_manager.set_viewport(websocket, viewport)
             
-            # Handle inbound terminal commands (e.g. subscribe to a new symbol)
-            if message.get("type") == "SUBSCRIBE":
-                symbol = message.get("symbol")
-                # Handle subscription logic here if needed
-                logger.info(f"Client {client_id} requested subscription to {symbol}")
+            # Opt in/out of the full trade tape
+            elif msg_type == "SET_TRADE_MODE":
+                ws_manager.set_trade_mode(websocket, str(message.get("mode", "")).lower())
             
     except WebSocketDisconnect:
         ws_manager.disconnect_client(websocket)
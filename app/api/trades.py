@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.db import models, schemas
 from app.core import auth
 from app.utils.resilience import retry_on_failure
+from app.services.market_snapshot import market_snapshot
+from app.services.symbol_resolver import symbol_resolver
 from datetime import datetime
 from typing import List
 
@@ -13,38 +15,18 @@ async def get_active_positions(
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """Returns all open paper trades for the current user, appending current_price."""
-    import yfinance as yf
     active_trades = await models.Trade.find(
         models.Trade.user_id == str(current_user.id),
         models.Trade.status == "OPEN"
     ).to_list()
     
     if active_trades:
-        symbols = list(set([t.symbol for t in active_trades]))
-        yf_symbols = []
-        for s in symbols:
-            if s == "NIFTY": yf_symbols.append("^NSEI")
-            elif s == "BANKNIFTY": yf_symbols.append("^NSEBANK")
-            elif "." not in s and not s.startswith("^"): yf_symbols.append(f"{s}.NS")
-            else: yf_symbols.append(s)
-            
-        try:
-            import asyncio
-            data_df = await asyncio.to_thread(yf.download, yf_symbols, period="1d", interval="1m", progress=False)
-            data = data_df['Close']
-            for trade in active_trades:
-                if trade.symbol == "NIFTY": price_col = "^NSEI"
-                elif trade.symbol == "BANKNIFTY": price_col = "^NSEBANK"
-                elif "." not in trade.symbol and not trade.symbol.startswith("^"): price_col = f"{trade.symbol}.NS"
-                else: price_col = trade.symbol
-                
-                try:
-                    current_price = data[price_col].iloc[-1] if len(yf_symbols) > 1 else data.iloc[-1]
-                    trade.current_price = float(current_price)
-                except:
-                    pass
-        except:
-            pass
+        tickers = symbol_resolver.yf_tickers(t.symbol for t in active_trades)
+        prices = await market_snapshot.prices(tickers.values())
+        for trade in active_trades:
+            current_price = prices.get(tickers[trade.symbol])
+            if current_price is not None:
+                trade.current_price = current_price
             
     return active_trades
 
@@ -65,7 +47,6 @@ async def get_performance_snapshot(
 ):
     """Calculates realized/unrealized P&L, Total Equity, and Active Exposure."""
     from app.core import config
-    import yfinance as yf
     
     # 1. Realized History
     history_trades = await models.Trade.find(
@@ -126,38 +107,20 @@ async def get_performance_snapshot(
     unrealized_pnl = 0.0
     total_exposure = 0.0
     
-    # Optimization: Batch fetch prices if multiple trades exist
+    # Prices from the shared last-price table (one lookup per symbol)
     if active_trades:
-        symbols = list(set([t.symbol for t in active_trades]))
-        # Map symbols for yf (NIFTY -> ^NSEI, etc.)
-        yf_symbols = []
-        for s in symbols:
-            if s == "NIFTY": yf_symbols.append("^NSEI")
-            elif s == "BANKNIFTY": yf_symbols.append("^NSEBANK")
-            elif "." not in s and not s.startswith("^"): yf_symbols.append(f"{s}.NS")
-            else: yf_symbols.append(s)
-            
-        import asyncio
-        data_df = await asyncio.to_thread(yf.download, yf_symbols, period="1d", interval="1m", progress=False)
-        data = data_df['Close']
+        tickers = symbol_resolver.yf_tickers(t.symbol for t in active_trades)
+        prices = await market_snapshot.prices(tickers.values())
         
         for trade in active_trades:
-            # Handle both Series (1 symbol) and DataFrame (multiple)
-            price_col = trade.symbol
-            if trade.symbol == "NIFTY": price_col = "^NSEI"
-            elif trade.symbol == "BANKNIFTY": price_col = "^NSEBANK"
-            elif "." not in trade.symbol and not trade.symbol.startswith("^"): price_col = f"{trade.symbol}.NS"
-            else: price_col = trade.symbol
-            
-            try:
-                current_price = data[price_col].iloc[-1] if len(yf_symbols) > 1 else data.iloc[-1]
-                if trade.side == "BUY":
-                    unrealized_pnl += (current_price - trade.entry_price) * trade.quantity
-                else:
-                    unrealized_pnl += (trade.entry_price - current_price) * trade.quantity
-                total_exposure += current_price * trade.quantity
-            except:
+            current_price = prices.get(tickers[trade.symbol])
+            if current_price is None:
                 continue
+            if trade.side == "BUY":
+                unrealized_pnl += (current_price - trade.entry_price) * trade.quantity
+            else:
+                unrealized_pnl += (trade.entry_price - current_price) * trade.quantity
+            total_exposure += current_price * trade.quantity
 
     total_equity = config.INITIAL_BALANCE + realized_pnl + unrealized_pnl
     
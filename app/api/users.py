@@ -71,9 +71,9 @@ async def add_to_watchlist(symbol: str, current_user: models.User = Depends(auth
         current_user.watchlist.append(symbol)
         await current_user.save()
         
-        # Proactively trigger WebSocket subscription if it's a new symbol
+        # Route the symbol to the user's live terminals (upstream subscription is ref-counted)
         from app.services.websocket_manager import ws_manager
-        await ws_manager.subscribe_to_symbol(symbol)
+        await ws_manager.subscribe_user(str(current_user.id), symbol)
         
     return current_user.watchlist
 
@@ -83,4 +83,7 @@ async def remove_from_watchlist(symbol: str, current_user: models.User = Depends
     if current_user.watchlist and symbol in current_user.watchlist:
         current_user.watchlist.remove(symbol)
         await current_user.save()
+        
+        from app.services.websocket_manager import ws_manager
+        ws_manager.unsubscribe_user(str(current_user.id), symbol)
     return current_user.watchlist
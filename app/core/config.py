@@ -5,7 +5,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # --- Symbol & Ticker Mapping ---
-TICKER_MAP_FILE = os.path.join(os.path.dirname(__file__), "data", "ticker_mappings.json")
+SYMBOL_DATA_DIR = os.getenv("SYMBOL_DATA_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "data"))  # Exchange listings
+TICKER_MAP_FILE = os.path.join(SYMBOL_DATA_DIR, "ticker_mappings.json")
 DEFAULT_TICKER_SUFFIX = os.getenv("DEFAULT_TICKER_SUFFIX", ".NS")
 
 def load_ticker_map():
@@ -37,6 +38,25 @@ SMA_FAST = int(os.getenv("SMA_FAST", 20))
 SMA_MEDIUM = int(os.getenv("SMA_MEDIUM", 50))
 SMA_SLOW = int(os.getenv("SMA_SLOW", 200))
 ATR_WINDOW = int(os.getenv("ATR_WINDOW", 14))
+INDICATOR_MAX_STATES = int(os.getenv("INDICATOR_MAX_STATES", 512))  # Incremental (symbol, interval) states kept
+
+# --- Batch Scoring ---
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", max((os.cpu_count() or 2) - 1, 1)))
+BATCH_PREDICT_MAX_SYMBOLS = int(os.getenv("BATCH_PREDICT_MAX_SYMBOLS", 500))  # Per request
+BATCH_PREDICT_CHUNK = int(os.getenv("BATCH_PREDICT_CHUNK", 64))  # Symbols per worker task
+PORTFOLIO_MAX_SYMBOLS = int(os.getenv("PORTFOLIO_MAX_SYMBOLS", 50))  # Assets per portfolio backtest
+OPTIMIZER_MAX_CANDIDATES = int(os.getenv("OPTIMIZER_MAX_CANDIDATES", 2000))  # Parameter sets per sweep
+
+# --- Backtest Jobs ---
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", 2))  # Jobs running concurrently
+BACKTEST_MAX_PENDING_PER_USER = int(os.getenv("BACKTEST_MAX_PENDING_PER_USER", 5))  # Queued + running
+BACKTEST_JOB_TTL = int(os.getenv("BACKTEST_JOB_TTL", 3600))  # Seconds finished jobs stay queryable
+BACKTEST_EVENT_QUEUE_SIZE = int(os.getenv("BACKTEST_EVENT_QUEUE_SIZE", 256))  # Events buffered per SSE stream
+BACKTEST_EQUITY_CHUNK = int(os.getenv("BACKTEST_EQUITY_CHUNK", 500))  # Points per BACKTEST_EQUITY hub event (final curve, sent after the run)
+CURVE_INLINE_MAX_BYTES = int(os.getenv("CURVE_INLINE_MAX_BYTES", 256 * 1024))  # Larger compressed equity curves go to GridFS
+CURVE_MAX_POINTS = int(os.getenv("CURVE_MAX_POINTS", 5000))  # Upper bound for downsampled curve requests
+EVENT_ADV_WINDOW = int(os.getenv("EVENT_ADV_WINDOW", 20))  # Bars of volume behind the event mode ADV
+EVENT_VOL_WINDOW = int(os.getenv("EVENT_VOL_WINDOW", 100))  # Bars of ATR behind the stop volatility ratio
 
 # --- Prediction Thresholds ---
 BULLISH_SCORE_THRESHOLD = float(os.getenv("BULLISH_SCORE_THRESHOLD", 3.0))
@@ -59,7 +79,48 @@ MOMENTUM_PROXIMITY = float(os.getenv("MOMENTUM_PROXIMITY", 0.995))
 OPTION_PREMIUM_DEFAULT = float(os.getenv("OPTION_PREMIUM_DEFAULT", 100))
 OPTION_SCAN_RANGE = float(os.getenv("OPTION_SCAN_RANGE", 0.10)) # 10% each side
 
+# --- Terminal WebSocket Fan-out ---
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 256))  # Frames buffered per client
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "drop_oldest")  # drop_oldest / disconnect
+TRADE_COALESCE_MS = int(os.getenv("TRADE_COALESCE_MS", 100))  # Finnhub trade batching window
+WS_MAX_SYMBOLS_PER_CLIENT = int(os.getenv("WS_MAX_SYMBOLS_PER_CLIENT", 50))  # Equity topics one terminal may hold
+
+# --- Market Snapshot (shared last-price table) ---
+SNAPSHOT_REFRESH_SECONDS = int(os.getenv("SNAPSHOT_REFRESH_SECONDS", 30))  # Batched yfinance refresh of tracked tickers
+SNAPSHOT_IDLE_TTL = int(os.getenv("SNAPSHOT_IDLE_TTL", 900))  # Tickers unread this long stop being refreshed
+MACRO_REFRESH_SECONDS = int(os.getenv("MACRO_REFRESH_SECONDS", 60))  # One batched download for all macro panels
+
+# --- Symbol Search (local catalog, Yahoo fallback) ---
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", 10))  # Typeahead suggestions per query
+SEARCH_FUZZY_MIN_SCORE = float(os.getenv("SEARCH_FUZZY_MIN_SCORE", 0.4))  # Trigram Jaccard similarity cut-off
+CACHE_TTL_SEARCH = int(os.getenv("CACHE_TTL_SEARCH", 3600))  # Yahoo search fallback results
+
+# --- Geospatial Viewports (vessel / aircraft streams) ---
+VIEWPORT_DEFAULT_ZOOM = int(os.getenv("VIEWPORT_DEFAULT_ZOOM", 2))  # Clients that never send a VIEWPORT
+VIEWPORT_DETAIL_ZOOM = int(os.getenv("VIEWPORT_DETAIL_ZOOM", 8))  # No thinning at or above this zoom
+VIEWPORT_THIN_GRID = int(os.getenv("VIEWPORT_THIN_GRID", 16))  # Max objects per map tile edge below it
+
+# --- Outbound HTTP Pools ---
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 10))  # Per provider host
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 5))  # Idle connections kept warm
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))  # Seconds before an idle socket is closed
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # Needs the h2 package
+
+# --- Blocking Provider SDKs (yfinance / FR24 / translation) ---
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", 16))  # Threads shared by all blocking SDK calls
+BLOCKING_MAX_QUEUE = int(os.getenv("BLOCKING_MAX_QUEUE", 256))  # Calls waiting per provider before rejecting
+
+# --- Bar Store (persistent OHLCV history) ---
+BAR_STORE_DIR = os.getenv(
+    "BAR_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "bars")
+)
+
 # --- Redis Configuration ---
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 CACHE_TTL_PRICE = int(os.getenv("CACHE_TTL_PRICE", 300))  # 5 minutes
 CACHE_TTL_FEATURES = int(os.getenv("CACHE_TTL_FEATURES", 900))  # 15 minutes
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 256 * 1024 * 1024))  # In-process cache budget
+CACHE_SWEEP_INTERVAL = int(os.getenv("CACHE_SWEEP_INTERVAL", 60))  # Seconds between expiry sweeps
+CACHE_REDIS_ENABLED = os.getenv("CACHE_REDIS_ENABLED", "true").lower() == "true"  # Shared L2 across workers
+REDIS_RETRY_SECONDS = int(os.getenv("REDIS_RETRY_SECONDS", 30))  # L1-only backoff after a Redis error
@@ -16,6 +16,8 @@ async def init_db():
             models.User,
             models.PredictionLog,
             models.Trade,
+            models.BacktestRun,
+            models.BacktestRunGroup,
             recovery.SystemState
         ]
     )
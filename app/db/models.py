@@ -1,7 +1,7 @@
-from beanie import Document
+from beanie import Document, PydanticObjectId
 from datetime import datetime, timezone
 from typing import Optional, List
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator
 
 class User(Document):
     email: str
@@ -50,12 +50,56 @@ class BacktestRun(Document):
     period: str
     interval: str
     metrics: dict
-    equity_curve: list
     config: dict
+    # Equity curve, stored once: zlib float32 bytes inline, or a GridFS file id when large
+    # (see app.services.curve_store). equity_curve is only set on legacy documents.
+    equity_points: int = 0
+    equity_blob: Optional[bytes] = None
+    equity_file_id: Optional[str] = None
+    equity_curve: Optional[list] = None
 
     class Settings:
         name = "backtest_runs"
 
+class BacktestRunSummary(BaseModel):
+    """Projection of BacktestRun without the curve, for listings."""
+    id: PydanticObjectId = Field(alias="_id")
+    symbol: str
+    timestamp: datetime
+    period: str
+    interval: str
+    metrics: dict
+    config: dict
+    equity_points: int = 0
+
+    @field_validator("metrics")
+    @classmethod
+    def _drop_legacy_curve(cls, metrics: dict) -> dict:
+        return {k: v for k, v in metrics.items() if k != "equity_curve"}
+
+    class Settings:
+        projection = {"_id": 1, "symbol": 1, "timestamp": 1, "period": 1, "interval": 1,
+                      "metrics": 1, "config": 1, "equity_points": 1}
+
+class BacktestRunGroup(Document):
+    """One parameter sweep / walk-forward run, stored as compact rows rather than one BacktestRun per candidate."""
+    symbol: str
+    user_id: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    period: str
+    interval: str
+    search: str  # grid / random
+    objective: str
+    param_names: List[str]
+    metric_names: List[str]
+    results: List[list]  # Per candidate: parameter values followed by metric values
+    best: dict
+    folds: list = []  # Walk-forward folds (empty for a plain sweep)
+    config: dict
+
+    class Settings:
+        name = "backtest_run_groups"
+
 class RegimeLog(Document):
     symbol: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
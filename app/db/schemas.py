@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, BeforeValidator
-from typing import Optional, List, Annotated
+from typing import Optional, List, Dict, Annotated
 from datetime import datetime
 
 # Helper to convert ObjectId to str
@@ -47,6 +47,42 @@ class PredictionResult(BaseModel):
     option_type: Optional[str] = None
     payoff_graph: List[dict]
 
+class BatchPredictionRequest(BaseModel):
+    symbols: Optional[List[str]] = None  # Defaults to the AXIOM watchlist
+    interval: str = "1h"
+    period: str = "1mo"
+
+class BacktestRequest(BaseModel):
+    symbol: str
+    period: str = "1y"
+    interval: str = "1d"
+    initial_capital: float = 100000.0
+    mode: str = "vectorized"  # vectorized / event (fill-by-fill with impact and stops)
+
+class PortfolioBacktestRequest(BaseModel):
+    symbols: List[str]
+    period: str = "1y"
+    interval: str = "1d"
+    initial_capital: float = 100000.0
+
+class OptimizationRequest(BaseModel):
+    symbol: str
+    period: str = "1y"
+    interval: str = "1d"
+    initial_capital: float = 100000.0
+    param_grid: Dict[str, List[float]]  # e.g. {"entry_threshold": [0.8, 1.0, 1.2], "rsi_window": [10, 14]}
+    search: str = "grid"  # grid / random
+    n_samples: int = 100  # random search only
+    objective: str = "sharpe_ratio"
+    folds: int = 0  # > 0 runs walk-forward
+    anchored: bool = False
+    seed: Optional[int] = None
+
+class BacktestJobRequest(BaseModel):
+    kind: str  # single / portfolio / optimize
+    params: dict  # BacktestRequest / PortfolioBacktestRequest / OptimizationRequest fields
+    priority: int = 5  # 0 (first) .. 9
+
 class ManualTradeRequest(BaseModel):
     symbol: str
     side: str # BUY/SELL
@@ -7,8 +7,19 @@ from . import (
     execution_engine,
     risk_engine,
     trading_manager,
+    symbol_resolver,
+    symbol_catalog,
     websocket_manager,
+    market_snapshot,
+    macro_service,
     data_manager,
     data_router,
-    backtester
+    bar_store,
+    batch_predictor,
+    backtester,
+    event_backtester,
+    portfolio_backtester,
+    optimizer,
+    curve_store,
+    backtest_jobs
 )
@@ -1,79 +1,117 @@
 import asyncio
+import heapq
 import json
 import logging
 import websockets
 import os
 import ssl
 import time
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from app.utils.track_store import TrackStore
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Descriptive vessel fields kept alongside the numeric track columns
+VESSEL_ATTRS = {
+    "name": "UNKNOWN vessel",
+    "type": "General Cargo",
+    "destination": "---",
+    "flag": "---",
+}
+
+def new_vessel_store() -> TrackStore:
+    return TrackStore("mmsi", attr_fields=VESSEL_ATTRS, output_names={"altitude": None}, int_columns=("heading",))
+
 class AISService:
     def __init__(self, websocket_manager):
         self.api_key = os.getenv("AISSTREAM_API_KEY")
         self.ws_manager = websocket_manager
         self.uri = "wss://stream.aisstream.io/v0/stream"
         self._is_running = False
-        self._cache: Dict[str, Dict] = {} # mmsi -> normalized_data
+        self._cache: TrackStore = new_vessel_store() # mmsi -> row
+        # One (last_seen, mmsi) entry per vessel; entries are re-keyed lazily when popped
+        self._expiry: List[Tuple[float, str]] = []
+        # Coarse ingest clock, advanced by the publisher tick instead of per message
+        self._now = time.time()
         self._last_update = 0
+        self._tasks: List[asyncio.Task] = []
         self.MAX_VESSELS = 5000
         self.TTL_SECONDS = 1800  # 30 minutes
+        self.BROADCAST_INTERVAL = 2  # seconds, throttles frontend updates
 
     async def start(self):
         if self._is_running:
             return
         self._is_running = True
-        asyncio.create_task(self._stream_loop())
+        self._now = time.time()
+        self._tasks = [
+            asyncio.create_task(self._stream_loop()),
+            asyncio.create_task(self._publish_loop())
+        ]
         logger.info("AIS Service started.")
 
     async def stop(self):
         self._is_running = False
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
         logger.info("AIS Service stopped.")
 
     async def get_vessels(self) -> List[Dict]:
         # Return flattened cache
-        return list(self._cache.values())
+        return self._cache.records()
 
-    def _normalize(self, data: dict) -> Dict:
-        """Flattens the deeply nested AISStream JSON into a clean terminal-ready format."""
+    def _normalize(self, data: dict):
+        """Flattens the deeply nested AISStream JSON straight into the columnar cache."""
         msg_type = data.get("MessageType")
         meta = data.get("MetaData", {})
         mmsi = str(meta.get("MMSI", ""))
+        now = self._now
         
         # We only care about PositionReport and ShipStaticData
         # AISStream sends them separately. We merge them in our cache if they share MMSI.
-        existing = self._cache.get(mmsi, {
-            "mmsi": mmsi,
-            "name": meta.get("ShipName", "UNKNOWN vessel").strip(),
-            "lat": meta.get("latitude"),
-            "lon": meta.get("longitude"),
-            "type": "General Cargo",
-            "destination": "---",
-            "speed": 0,
-            "heading": 0,
-            "flag": "---",
-            "last_seen": time.time()
-        })
-
         if msg_type == "PositionReport":
             pos = data.get("Message", {}).get("PositionReport", {})
-            existing["lat"] = pos.get("Latitude")
-            existing["lon"] = pos.get("Longitude")
-            existing["speed"] = pos.get("Sog", 0)
-            existing["heading"] = pos.get("TrueHeading", 0)
+            lat, lon = pos.get("Latitude"), pos.get("Longitude")
+            # Only cache if we have coordinates
+            if lat is None or lon is None:
+                return
+            attrs = None
+            if mmsi not in self._cache:
+                attrs = {"name": (meta.get("ShipName") or VESSEL_ATTRS["name"]).strip()}
+                heapq.heappush(self._expiry, (now, mmsi))
+            self._cache.upsert(
+                mmsi,
+                attrs=attrs,
+                lat=lat, lon=lon,
+                speed=pos.get("Sog", 0), heading=pos.get("TrueHeading", 0),
+                last_seen=now
+            )
         
         elif msg_type == "ShipStaticData":
             static = data.get("Message", {}).get("ShipStaticData", {})
-            existing["name"] = static.get("Name", existing["name"]).strip()
-            existing["type"] = static.get("ShipType", existing["type"])
-            existing["destination"] = static.get("Destination", existing["destination"]).strip()
-            # simple flag mapping placeholder or extracted from metadata if possible
-            
-        existing["last_seen"] = time.time()
-        return existing
+            cache = self._cache
+            row = cache.row(mmsi)
+            if row is None:
+                lat, lon = meta.get("latitude"), meta.get("longitude")
+                if lat is None or lon is None:
+                    return
+                row = cache.upsert(mmsi, lat=lat, lon=lon)
+                heapq.heappush(self._expiry, (now, mmsi))
+            cache.upsert(mmsi, attrs={
+                "name": (static.get("Name") or cache.attr("name", row)).strip(),
+                "type": static.get("ShipType", cache.attr("type", row)),
+                "destination": (static.get("Destination") or cache.attr("destination", row)).strip(),
+                # simple flag mapping placeholder or extracted from metadata if possible
+            }, last_seen=now)
 
     async def _stream_loop(self):
         while self._is_running:
@@ -94,34 +132,71 @@ class AISService:
                     }
                     await ws.send(json.dumps(subscribe_msg))
                     
+                    # Receive path only parses and upserts; eviction and broadcasting run in _publish_loop
                     async for msg in ws:
                         if not self._is_running:
                             break
-                        raw_data = json.loads(msg)
-                        normalized = self._normalize(raw_data)
-                        
-                        # Only cache if we have coordinates
-                        if normalized["lat"] and normalized["lon"]:
-                            self._cache[normalized["mmsi"]] = normalized
-                        
-                        # Throttle broadcasts to once every 2 seconds to avoid flooding frontend
-                        if time.time() - self._last_update > 2:
-                            now = time.time()
-                            
-                            # 1. TTL Eviction: Remove stale vessels
-                            stale_keys = [k for k, v in self._cache.items() if now - v.get("last_seen", now) > self.TTL_SECONDS]
-                            for k in stale_keys:
-                                del self._cache[k]
-                            
-                            # 2. Hard Cap Eviction: Keep only the most recently seen if over limit
-                            if len(self._cache) > self.MAX_VESSELS:
-                                sorted_cache = sorted(self._cache.items(), key=lambda x: x[1].get("last_seen", 0))
-                                self._cache = dict(sorted_cache[-self.MAX_VESSELS:])
-
-                            # Send the whole visible fleet to all terminals (WS Manager now handles the diff)
-                            await self.ws_manager.broadcast_vessel_data(list(self._cache.values())[:300]) 
-                            self._last_update = time.time()
+                        self._normalize(_loads(msg))
 
             except Exception as e:
                 logger.error(f"AIS Stream error: {e}. Reconnecting in 10s...")
                 await asyncio.sleep(10)
+
+    async def _publish_loop(self):
+        """Periodic ticker: evicts stale vessels, then hands the fleet to the hub for diffing."""
+        while self._is_running:
+            await asyncio.sleep(self.BROADCAST_INTERVAL)
+            try:
+                self._now = time.time()
+                removed = self._evict(self._now)
+                if removed:
+                    self._cache.discard(removed)
+                # Send the whole fleet; the WS Manager diffs it and filters per client viewport
+                await self.ws_manager.broadcast_vessel_data(self._cache)
+                self._last_update = time.time()
+            except Exception as e:
+                logger.error(f"AIS publish error: {e}")
+
+    def _evict(self, now: float) -> List[str]:
+        """
+        Pops expired and over-cap vessels off the expiry heap.
+        An entry whose vessel was seen again since it was pushed is re-pushed with
+        the newer timestamp instead, so each tick only touches what actually changes.
+        """
+        cache, heap = self._cache, self._expiry
+        removed: List[str] = []
+        cutoff = now - self.TTL_SECONDS
+        last_seen = cache.col("last_seen")
+
+        def pop_oldest() -> Optional[Tuple[float, str]]:
+            while heap:
+                seen, mmsi = heapq.heappop(heap)
+                row = cache.row(mmsi)
+                if row is None:
+                    continue
+                actual = last_seen[row]
+                if actual > seen:
+                    heapq.heappush(heap, (actual, mmsi))
+                    continue
+                return seen, mmsi
+            return None
+
+        # 1. TTL Eviction: Remove stale vessels
+        while heap and heap[0][0] < cutoff:
+            entry = pop_oldest()
+            if entry is None:
+                break
+            if entry[0] >= cutoff:
+                heapq.heappush(heap, entry)
+                break
+            removed.append(entry[1])
+
+        # 2. Hard Cap Eviction: Keep only the most recently seen if over limit
+        excess = len(cache) - len(removed) - self.MAX_VESSELS
+        while excess > 0:
+            entry = pop_oldest()
+            if entry is None:
+                break
+            removed.append(entry[1])
+            excess -= 1
+        return removed
@@ -7,6 +7,7 @@ import asyncio
 import logging
 import time
 from typing import List, Dict, Optional
+from app.utils.blocking_executor import blocking_executor
 
 logger = logging.getLogger(__name__)
 
@@ -67,8 +68,8 @@ class AviationService:
         if not self._fr_api:
             return
         try:
-            # Run in thread — FlightRadarAPI is synchronous
-            raw_flights = await asyncio.to_thread(self._fr_api.get_flights)
+            # FlightRadarAPI is synchronous: run it on the blocking SDK pool
+            raw_flights = await blocking_executor.run("fr24", self._fr_api.get_flights)
             normalized = [self._normalize(f) for f in raw_flights if f.latitude and f.longitude]
             self._cache = normalized
             self._last_update = time.time()
@@ -0,0 +1,388 @@
+"""
+Asynchronous backtest jobs.
+Submitting returns a job id immediately; jobs run on a fixed number of workers
+in priority order, publish progress to SSE subscribers and the terminal hub
+topic BACKTEST:<job_id>, and persist their results as BacktestRun /
+BacktestRunGroup documents. The simulations are vectorized (or run in a worker
+process), so no partial curve exists while a job runs: the final equity curve
+is published to the hub topic in chunks after the run, just before
+BACKTEST_DONE. SSE readers get BACKTEST_DONE only and fetch the curve from
+/{run_id}/equity, since their bounded queues may drop events.
+Job state lives in the worker process that accepted the submission.
+"""
+import time
+import uuid
+import asyncio
+import logging
+import math
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+from app.core import config
+from app.db import models, schemas
+from app.services.backtester import VectorizedBacktester
+from app.services.event_backtester import EventBacktester
+from app.services.portfolio_backtester import PortfolioBacktester
+from app.services.optimizer import Optimizer
+from app.services.websocket_manager import ws_manager, backtest_topic
+from app.services.curve_store import store_curve
+
+logger = logging.getLogger(__name__)
+
+# Job kinds -> request schema for their params
+JOB_KINDS = {
+    "single": schemas.BacktestRequest,
+    "portfolio": schemas.PortfolioBacktestRequest,
+    "optimize": schemas.OptimizationRequest,
+}
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "QUEUED", "RUNNING", "DONE", "FAILED", "CANCELLED"
+FINISHED = {DONE, FAILED, CANCELLED}
+# Final event type per finished status
+FINAL_EVENTS = {DONE: "BACKTEST_DONE", FAILED: "BACKTEST_FAILED", CANCELLED: "BACKTEST_CANCELLED"}
+
+ProgressCallback = Callable[[float, str], None]
+
+
+# --- Runners (shared by the synchronous endpoints and the job workers) ---
+
+async def _save_run(symbol: str, user_id: str, period: str, interval: str, results: dict, config: dict) -> str:
+    """Stores metrics on the BacktestRun and the equity curve once, compressed."""
+    curve = results.get("equity_curve") or []
+    backtest_run = models.BacktestRun(
+        symbol=symbol,
+        user_id=user_id,
+        period=period,
+        interval=interval,
+        metrics={k: v for k, v in results.items() if k != "equity_curve"},
+        config=config,
+        **await store_curve(curve, f"{user_id}/{symbol}/{interval}")
+    )
+    await backtest_run.insert()
+    return str(backtest_run.id)
+
+
+async def run_single_backtest(user_id: str, request: schemas.BacktestRequest,
+                              progress: Optional[ProgressCallback] = None) -> tuple:
+    """Runs and stores one single-symbol backtest. Returns (results, run id)."""
+    if progress:
+        progress(0.05, "fetching")
+    if request.mode == "vectorized":
+        tester = VectorizedBacktester(request.symbol, initial_capital=request.initial_capital)
+    elif request.mode == "event":
+        tester = EventBacktester(request.symbol, initial_capital=request.initial_capital)
+    else:
+        raise ValueError(f"Unknown backtest mode: {request.mode}")
+    results = await tester.run(period=request.period, interval=request.interval)
+    if progress:
+        progress(0.9, "saving")
+    run_id = await _save_run(
+        symbol=request.symbol,
+        user_id=user_id,
+        period=request.period,
+        interval=request.interval,
+        results=results,
+        config={
+            "initial_capital": request.initial_capital,
+            "mode": request.mode,
+            "strategy": "Regime-Aware Ensemble"
+        }
+    )
+    return results, run_id
+
+
+async def run_portfolio_backtest(user_id: str, request: schemas.PortfolioBacktestRequest,
+                                 progress: Optional[ProgressCallback] = None) -> tuple:
+    """Runs and stores one portfolio backtest. Returns (results, run id)."""
+    if not request.symbols:
+        raise ValueError("At least one symbol is required.")
+    if len(request.symbols) > config.PORTFOLIO_MAX_SYMBOLS:
+        raise ValueError(f"At most {config.PORTFOLIO_MAX_SYMBOLS} symbols per portfolio.")
+    if progress:
+        progress(0.05, "fetching")
+    tester = PortfolioBacktester(request.symbols, initial_capital=request.initial_capital)
+    results = await tester.run(period=request.period, interval=request.interval)
+    if progress:
+        progress(0.9, "saving")
+    run_id = await _save_run(
+        symbol=",".join(results["symbols"]),
+        user_id=user_id,
+        period=request.period,
+        interval=request.interval,
+        results=results,
+        config={
+            "initial_capital": request.initial_capital,
+            "mode": "portfolio",
+            "symbols": results["symbols"],
+            "strategy": "Regime-Aware Ensemble"
+        }
+    )
+    return results, run_id
+
+
+async def run_optimization(user_id: str, request: schemas.OptimizationRequest,
+                           progress: Optional[ProgressCallback] = None) -> tuple:
+    """Runs and stores one sweep / walk-forward run group. Returns (summary, group id)."""
+    symbol = request.symbol.upper()
+
+    def on_candidates(done: int, total: int):
+        logger.info(f"Optimization {symbol}: {done}/{total} candidates evaluated")
+        if progress:
+            progress(0.05 + 0.85 * done / total, "evaluating")
+
+    if progress:
+        progress(0.0, "fetching")
+    optimizer = Optimizer(initial_capital=request.initial_capital)
+    summary = await optimizer.run(
+        symbol,
+        request.param_grid,
+        period=request.period,
+        interval=request.interval,
+        search=request.search,
+        n_samples=request.n_samples,
+        objective=request.objective,
+        folds=request.folds,
+        anchored=request.anchored,
+        seed=request.seed,
+        progress=on_candidates
+    )
+    if progress:
+        progress(0.95, "saving")
+    group = models.BacktestRunGroup(
+        symbol=symbol,
+        user_id=user_id,
+        period=request.period,
+        interval=request.interval,
+        search=request.search,
+        objective=summary["objective"],
+        param_names=summary["param_names"],
+        metric_names=summary["metric_names"],
+        results=summary["results"],
+        best=summary["best"],
+        folds=summary["folds"],
+        config={
+            "initial_capital": request.initial_capital,
+            "param_grid": request.param_grid,
+            "n_samples": request.n_samples,
+            "folds": request.folds,
+            "anchored": request.anchored,
+            "strategy": "Regime-Aware Ensemble"
+        }
+    )
+    await group.insert()
+    return summary, str(group.id)
+
+
+RUNNERS = {
+    "single": run_single_backtest,
+    "portfolio": run_portfolio_backtest,
+    "optimize": run_optimization,
+}
+
+
+class BacktestJob:
+    def __init__(self, kind: str, user_id: str, request: Any, priority: int):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.user_id = user_id
+        self.request = request
+        self.priority = priority
+        self.status = QUEUED
+        self.progress = 0.0
+        self.stage = "queued"
+        self.result_id: Optional[str] = None
+        self.metrics: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": round(self.progress, 4),
+            "stage": self.stage,
+            "result_id": self.result_id,
+            "metrics": self.metrics,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "params": self.request.model_dump(),
+        }
+
+
+class BacktestJobQueue:
+    """Priority queue (lower number runs first, FIFO within a priority) drained by a bounded worker pool."""
+    def __init__(self, workers: int = config.BACKTEST_WORKERS):
+        self.workers = workers
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, BacktestJob] = {}
+        self._seq = 0
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Backtest job queue started ({self.workers} workers)")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self._jobs.values():
+            if job.status not in FINISHED:
+                self._finish(job, CANCELLED, error="Server shutting down")
+
+    # --- Submission / lookup ---
+
+    def submit(self, kind: str, user_id: str, params: dict, priority: int = 5) -> BacktestJob:
+        """Validates params against the kind's schema and queues the job. Raises ValueError if rejected."""
+        if self._queue is None:
+            raise RuntimeError("Backtest job queue is not running")
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        request = JOB_KINDS[kind].model_validate(params)
+        self._purge()
+        pending = sum(1 for j in self._jobs.values() if j.user_id == user_id and j.status not in FINISHED)
+        if pending >= config.BACKTEST_MAX_PENDING_PER_USER:
+            raise ValueError(f"At most {config.BACKTEST_MAX_PENDING_PER_USER} pending backtest jobs per user.")
+
+        job = BacktestJob(kind, user_id, request, min(max(int(priority), 0), 9))
+        self._jobs[job.id] = job
+        self._seq += 1
+        self._queue.put_nowait((job.priority, self._seq, job.id))
+        logger.info(f"Backtest job {job.id} ({kind}) queued at priority {job.priority}")
+        return job
+
+    def get(self, job_id: str) -> Optional[BacktestJob]:
+        return self._jobs.get(job_id)
+
+    def jobs_for(self, user_id: str) -> List[BacktestJob]:
+        return sorted((j for j in self._jobs.values() if j.user_id == user_id), key=lambda j: -j.created_at)
+
+    def cancel(self, job: BacktestJob) -> bool:
+        if job.status in FINISHED:
+            return False
+        if job.task is not None:
+            job.task.cancel()  # the worker records the cancellation
+        else:
+            self._finish(job, CANCELLED)  # still queued: the worker skips it
+        return True
+
+    def _purge(self):
+        cutoff = time.time() - config.BACKTEST_JOB_TTL
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    # --- Progress fan-out ---
+
+    def _publish(self, job: BacktestJob, event: Dict[str, Any], sse: bool = True):
+        for queue in job.subscribers if sse else ():
+            if queue.full():
+                queue.get_nowait()  # slow SSE reader: drop its oldest event
+            queue.put_nowait(event)
+        asyncio.create_task(ws_manager.broadcast_to_clients(event, topic=backtest_topic(job.id)))
+
+    def _progress(self, job: BacktestJob, progress: float, stage: str):
+        job.progress, job.stage = progress, stage
+        self._publish(job, {"type": "BACKTEST_PROGRESS", **self._state(job)})
+
+    @staticmethod
+    def _state(job: BacktestJob) -> Dict[str, Any]:
+        return {"job_id": job.id, "status": job.status, "progress": round(job.progress, 4), "stage": job.stage}
+
+    def _finish(self, job: BacktestJob, status: str, error: Optional[str] = None):
+        job.status, job.error, job.finished_at = status, error, time.time()
+        if status == DONE:
+            job.progress, job.stage = 1.0, "done"
+        self._publish(job, {
+            "type": FINAL_EVENTS[status],
+            **self._state(job),
+            "result_id": job.result_id,
+            "metrics": job.metrics,
+            "error": error,
+        })
+
+    async def events(self, job: BacktestJob) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Current state, then live events until the job finishes. Yields None as a keep-alive when idle."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=config.BACKTEST_EVENT_QUEUE_SIZE)
+        job.subscribers.add(queue)
+        try:
+            yield {"type": "BACKTEST_STATUS", **job.snapshot()}
+            if job.status in FINISHED:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["type"] in FINAL_EVENTS.values():
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    # --- Workers ---
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+            job.task = asyncio.create_task(self._execute(job))
+            try:
+                await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                if not job.task.done():
+                    # The worker itself is being stopped
+                    job.task.cancel()
+                    raise
+
+    async def _execute(self, job: BacktestJob):
+        job.status, job.started_at = RUNNING, time.time()
+        self._progress(job, 0.0, "starting")
+        try:
+            results, job.result_id = await RUNNERS[job.kind](
+                job.user_id, job.request, progress=lambda p, stage: self._progress(job, p, stage)
+            )
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+            return
+        except Exception as e:
+            logger.error(f"Backtest job {job.id} failed: {e}", exc_info=True)
+            self._finish(job, FAILED, error=str(e))
+            return
+
+        job.metrics = {k: v for k, v in results.items() if k not in ("equity_curve", "results")}
+        self._stream_equity(job, results.get("equity_curve") or [])
+        self._finish(job, DONE)
+
+    def _stream_equity(self, job: BacktestJob, curve: list):
+        """
+        Publishes the finished equity curve to the hub topic in BACKTEST_EQUITY_CHUNK-point
+        events, so no single frame carries the whole curve. Only the final curve exists:
+        nothing is streamed while the simulation runs. SSE queues drop their oldest events
+        when full, so SSE readers skip the chunks and fetch /{run_id}/equity after DONE.
+        """
+        size = config.BACKTEST_EQUITY_CHUNK
+        for offset in range(0, len(curve), size):
+            points = [None if isinstance(v, float) and not math.isfinite(v) else v for v in curve[offset:offset + size]]
+            self._publish(job, {
+                "type": "BACKTEST_EQUITY",
+                "job_id": job.id,
+                "offset": offset,
+                "total": len(curve),
+                "points": points,
+            }, sse=False)
+
+
+backtest_jobs = BacktestJobQueue()
@@ -1,8 +1,10 @@
+import asyncio
 import pandas as pd
 import numpy as np
 from app.core import config
 from app.services.ml_engine import MarketAnalyzer
-from app.utils.regime_detector import RegimeDetector, MarketRegime
+from app.utils.regime_detector import RegimeDetector, REGIMES, WEIGHT_MATRIX
+from app.utils.backtest_kernels import performance_metrics, periods_per_year
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,40 +21,18 @@ class VectorizedBacktester:
         self.slippage = slippage
         self.analyzer = MarketAnalyzer(symbol)
         self.regime_detector = RegimeDetector()
+        self.interval = "1d"
 
     async def run(self, period="1y", interval="1d"):
         """Main execution loop for backtesting."""
-        # 1. Fetch historical bulk data (Separated from live via analyzer)
-        await self.analyzer.fetch_data(period=period, interval=interval)
-        self.analyzer.calculate_indicators()
-        
-        # 2. Generate signals for the entire history (Vectorized)
-        df = self.analyzer.generate_vectorized_signals()
-        
-        # 3. Apply Regime Detection to weights (Vectorized if possible, or iterative bucketed)
-        # For simplicity, we'll calculate regime daily if interval is intraday
-        # or use a rolling regime for the whole df
-        df['Regime'] = df.apply(lambda x: self.regime_detector.detect_regime(df.loc[:x.name].tail(100)), axis=1)
-        
-        # Apply weighting logic based on regime
-        def calc_composite_score(row):
-            weights = self.regime_detector.get_strategy_weights(row['Regime'])
-            return (
-                (row['Scalp_Signal'] * weights['scalping']) +
-                (row['Momentum_Signal'] * weights['momentum']) +
-                (row['MR_Signal'] * weights['mean_reversion'])
-            )
-            
-        df['Composite_Score'] = df.apply(calc_composite_score, axis=1)
-        
-        # 4. Generate Position (Shifted to avoid lookahead bias)
-        df['Signal'] = 0
-        df.loc[df['Composite_Score'] >= 1.0, 'Signal'] = 1
-        df.loc[df['Composite_Score'] <= -1.0, 'Signal'] = -1
-        
+        df = await self.generate_signals(period=period, interval=interval)
+        return await asyncio.to_thread(self._simulate, df)
+
+    def _simulate(self, df: pd.DataFrame) -> dict:
+        # 5. Position (Shifted to avoid lookahead bias)
         df['Position'] = df['Signal'].shift(1).fillna(0)
         
-        # 5. Returns Calculation (Vectorized)
+        # 6. Returns Calculation (Vectorized)
         df['Market_Return'] = df['Close'].pct_change()
         # Apply slippage and commission to entries/exits
         df['Execution_Cost'] = (df['Position'].diff().abs() * (self.slippage + self.commission))
@@ -62,46 +42,44 @@ class VectorizedBacktester:
         
         return self._calculate_metrics(df)
 
-    def _calculate_metrics(self, df: pd.DataFrame) -> dict:
-        """Computes institutional-grade trading metrics."""
-        returns = df['Strategy_Return'].dropna()
-        
-        total_return = (df['Equity_Curve'].iloc[-1] / self.initial_capital) - 1
-        
-        # Annualized volatility (assuming 252 trading days)
-        # Adjust scale based on interval (simplified to daily for now)
-        vol = returns.std() * np.sqrt(252)
-        
-        # Sharpe Ratio
-        risk_free_rate = 0.02 # Assume 2%
-        sharpe = (returns.mean() * 252 - risk_free_rate) / vol if vol > 0 else 0
-        
-        # Sortino Ratio (downside risk only)
-        downside_returns = returns[returns < 0]
-        downside_std = downside_returns.std() * np.sqrt(252)
-        sortino = (returns.mean() * 252 - risk_free_rate) / downside_std if downside_std > 0 else 0
-        
-        # Max Drawdown
-        rolling_max = df['Equity_Curve'].cummax()
-        drawdown = df['Equity_Curve'] / rolling_max - 1
-        max_dd = drawdown.min()
+    async def generate_signals(self, period="1y", interval="1d") -> pd.DataFrame:
+        """Bars with indicators, regime, Composite_Score and the -1/0/1 Signal (not yet shifted)."""
+        # 1. Fetch historical bulk data (Separated from live via analyzer)
+        await self.analyzer.fetch_data(period=period, interval=interval)
+        self.interval = interval
+        # CPU-bound part off the event loop so long histories don't stall live endpoints
+        return await asyncio.to_thread(self._build_signals)
+
+    def _build_signals(self) -> pd.DataFrame:
+        self.analyzer.calculate_indicators()
         
-        # Profit Factor
-        gross_profit = returns[returns > 0].sum()
-        gross_loss = abs(returns[returns < 0].sum())
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+        # 2. Generate signals for the entire history (Vectorized)
+        df = self.analyzer.generate_vectorized_signals()
         
-        # Win Rate
-        win_rate = len(returns[returns > 0]) / len(returns[returns != 0]) if len(returns[returns != 0]) > 0 else 0
+        # 3. Rolling regime per bar (trailing 100-bar window) and its ensemble weights,
+        # gathered from the weight matrix by regime code
+        codes = self.regime_detector.detect_regime_series(df, window=100)
+        df['Regime'] = np.array([r.value for r in REGIMES])[codes]
+        weights = WEIGHT_MATRIX[codes]
+        df['Composite_Score'] = (
+            df['Scalp_Signal'].to_numpy() * weights[:, 0] +
+            df['Momentum_Signal'].to_numpy() * weights[:, 1] +
+            df['MR_Signal'].to_numpy() * weights[:, 2]
+        )
+        
+        # 4. Signal (callers shift it into a position to avoid lookahead bias)
+        df['Signal'] = 0
+        df.loc[df['Composite_Score'] >= 1.0, 'Signal'] = 1
+        df.loc[df['Composite_Score'] <= -1.0, 'Signal'] = -1
         
+        return df
+
+    def _calculate_metrics(self, df: pd.DataFrame) -> dict:
+        """Computes institutional-grade trading metrics."""
+        returns = df['Strategy_Return'].dropna().to_numpy()
+        metrics = performance_metrics(returns, self.initial_capital, periods_per_year(self.interval))
         return {
             "symbol": self.symbol,
-            "total_return": round(total_return * 100, 2),
-            "sharpe_ratio": round(sharpe, 2),
-            "sortino_ratio": round(sortino, 2),
-            "max_drawdown": round(max_dd * 100, 2),
-            "profit_factor": round(profit_factor, 2),
-            "win_rate": round(win_rate * 100, 2),
-            "final_equity": round(df['Equity_Curve'].iloc[-1], 2),
+            **metrics,
             "equity_curve": df['Equity_Curve'].tolist()
         }
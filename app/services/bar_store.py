@@ -0,0 +1,148 @@
+"""
+Persistent OHLCV bar store.
+Keeps one Parquet file per (symbol, interval) on local disk so repeated
+prediction/backtest runs only download the missing tail of history from the
+provider, and history survives restarts.
+"""
+import os
+import re
+import time
+import logging
+import tempfile
+import pandas as pd
+from typing import Optional
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Earliest bar a file is known to cover, kept in the Parquet metadata via DataFrame.attrs
+COVERED_FROM = "covered_from"
+COVERED_MAX = "max"  # full provider history
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# How far back the provider serves each intraday interval (yfinance limits); daily and up are unlimited
+PROVIDER_LOOKBACK = {
+    "1m": pd.Timedelta(days=7),
+    "2m": pd.Timedelta(days=60),
+    "5m": pd.Timedelta(days=60),
+    "15m": pd.Timedelta(days=60),
+    "30m": pd.Timedelta(days=60),
+    "90m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730),
+    "1h": pd.Timedelta(days=730),
+}
+
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Start of a yfinance-style period ending at `now`. None means the full history."""
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    offset = PERIOD_OFFSETS.get(period)
+    return now - offset if offset is not None else None
+
+
+def merge_bars(stored: Optional[pd.DataFrame], fresh: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Appends fresh bars; on overlapping timestamps the fresh (final) bar wins."""
+    if stored is None or stored.empty:
+        return fresh if fresh is not None else pd.DataFrame()
+    if fresh is None or fresh.empty:
+        return stored
+    if stored.index.tz is not None and fresh.index.tz is not None:
+        fresh = fresh.tz_convert(stored.index.tz)
+    merged = pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    merged.attrs = dict(stored.attrs)
+    return merged
+
+
+class BarStore:
+    def __init__(self, root: str = config.BAR_STORE_DIR):
+        self.root = root
+        self.enabled = PARQUET_AVAILABLE
+        if not self.enabled:
+            logger.warning("pyarrow not installed: bar store disabled, history will be re-downloaded")
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.root, interval, f"{safe}.parquet")
+
+    def age(self, symbol: str, interval: str) -> Optional[float]:
+        """Seconds since the file was last synced with the provider, None if absent."""
+        try:
+            return time.time() - os.path.getmtime(self._path(symbol, interval))
+        except OSError:
+            return None
+
+    def load(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        if not self.enabled:
+            return None
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"Bar store: unreadable {path} ({e}), discarding")
+            return None
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Atomic write (temp file + rename) so concurrent readers never see a partial file."""
+        if not self.enabled or df is None or df.empty:
+            return
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Bar store: failed to write {path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @staticmethod
+    def covers(df: Optional[pd.DataFrame], start: Optional[pd.Timestamp]) -> bool:
+        """True if the stored bars reach back to `start` (None = full history)."""
+        if df is None or df.empty:
+            return False
+        covered = df.attrs.get(COVERED_FROM)
+        if covered is None:
+            return False
+        if covered == COVERED_MAX:
+            return True
+        return start is not None and pd.Timestamp(covered) <= start
+
+    @staticmethod
+    def tail_reachable(df: pd.DataFrame, interval: str, start: Optional[pd.Timestamp], now: pd.Timestamp) -> bool:
+        """
+        False when a tail fetch from the last stored bar can't close the gap: the bar is
+        older than the period start or than the provider's lookback for the interval.
+        """
+        last = df.index[-1]
+        if last.tzinfo is None:
+            last = last.tz_localize("UTC")
+        if start is not None and last < start:
+            return False
+        lookback = PROVIDER_LOOKBACK.get(interval)
+        return lookback is None or last > now - lookback
+
+
+bar_store = BarStore()
@@ -0,0 +1,72 @@
+"""
+Multi-symbol screening.
+Bars for the whole watchlist come from one batched provider download, are
+stacked into (time x symbols) arrays, and are scored in chunks on the process
+pool, so screening hundreds of names costs one round-trip plus a few
+vectorized passes instead of one fetch and one pandas pass per symbol.
+"""
+import asyncio
+import logging
+import numpy as np
+import yfinance as yf
+from typing import Dict, List
+from app.core import config
+from app.utils.panel_scoring import FIELDS, stack_panel, score_panel
+from app.utils.process_pool import process_pool
+from app.utils.blocking_executor import blocking_executor
+
+logger = logging.getLogger(__name__)
+
+
+def download_panel(tickers: List[str], period: str, interval: str) -> Dict[str, np.ndarray]:
+    """One yfinance call for every ticker. Returns right-aligned (time x tickers) arrays."""
+    data = yf.download(
+        tickers,
+        period=period,
+        interval=interval,
+        progress=False,
+        threads=True,
+        auto_adjust=True,
+        multi_level_index=True
+    )
+    if data is None or data.empty:
+        return {}
+    fields = {}
+    for name in FIELDS:
+        # Columns are (field, ticker); reindex keeps the request order and NaN-fills tickers yfinance dropped
+        fields[name] = data[name].reindex(columns=tickers).to_numpy(dtype=float)
+    return stack_panel(fields)
+
+
+class BatchPredictor:
+    def __init__(self, chunk_size: int = config.BATCH_PREDICT_CHUNK):
+        self.chunk_size = chunk_size
+
+    async def predict(self, tickers: List[str], period: str = "1mo", interval: str = "1h") -> Dict[str, dict]:
+        """Returns {ticker: prediction} for every ticker the provider had bars for."""
+        # 1. One provider round-trip for the whole basket
+        panel = await blocking_executor.run("yfinance", download_panel, tickers, period, interval)
+        if not panel:
+            return {}
+
+        # 2. Column chunks scored in parallel worker processes
+        jobs = []
+        for start in range(0, len(tickers), self.chunk_size):
+            cols = slice(start, start + self.chunk_size)
+            jobs.append(process_pool.run(
+                score_panel,
+                tickers[cols],
+                panel["High"][:, cols],
+                panel["Low"][:, cols],
+                panel["Close"][:, cols],
+                panel["Volume"][:, cols]
+            ))
+
+        results = {}
+        for chunk in await asyncio.gather(*jobs):
+            results.update(chunk)
+        logger.info(f"Batch prediction: scored {len(results)}/{len(tickers)} symbols ({interval}, {period})")
+        return results
+
+
+batch_predictor = BatchPredictor()
@@ -0,0 +1,358 @@
+"""
+Two-tier cache for DataFrames, computed features, quotes and news.
+L1 is in-process: values are stored as-is (no serialization), bounded by an
+estimated byte budget with LRU eviction, and expired by TTL both on read and by
+a background sweep. L2 is Redis, shared by every uvicorn worker: frames travel
+as Parquet bytes, everything else as JSON, and writes are announced over
+pub/sub so other workers drop their stale L1 copies.
+"""
+import io
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core import config
+from app.utils.frame_codec import encode_message
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine for frames in L2)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# L2 value tags
+_TAG_FRAME = b"P"
+_TAG_JSON = b"J"
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint in bytes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    def __init__(self, max_bytes: int = config.CACHE_MAX_BYTES, sweep_interval: int = config.CACHE_SWEEP_INTERVAL):
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expiry, size), LRU first
+        self._bytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[1] <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, value: Any, ttl: int):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Cache: {key} ({size} bytes) exceeds the cache budget, not cached")
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+        # LRU eviction down to the byte budget
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        if key in self._entries:
+            self._drop(key)
+
+    def _drop(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def sweep(self) -> int:
+        """Removes every expired entry. Returns how many were dropped."""
+        now = time.monotonic()
+        expired = [k for k, (_, expiry, _) in self._entries.items() if expiry <= now]
+        for k in expired:
+            self._drop(k)
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Cache sweep error: {e}")
+
+    def start(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    def stop(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCache:
+    """
+    Redis L2. Any Redis error marks the tier unavailable for REDIS_RETRY_SECONDS,
+    during which reads miss and writes are skipped (callers fall back to L1 only).
+    """
+    def __init__(self, url: str = config.REDIS_URL, client=None):
+        self.url = url
+        self._client = client  # injectable (e.g. fakeredis) for local runs
+        self._retry_at = 0.0
+        self._down = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return self._client is not None and time.monotonic() >= self._retry_at
+
+    async def connect(self) -> bool:
+        if self._client is None:
+            if aioredis is None:
+                logger.warning("redis package not installed: shared cache tier disabled")
+                return False
+            self._client = aioredis.from_url(self.url, socket_connect_timeout=1, socket_timeout=1)
+        try:
+            await self._client.ping()
+            self._retry_at = 0.0
+            self._down = False
+            logger.info("Redis cache tier connected")
+            return True
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    def _failed(self, e: Exception):
+        self.errors += 1
+        if not self._down:
+            logger.warning(f"Redis cache tier unavailable ({e}); serving from L1 only")
+            self._down = True
+        self._retry_at = time.monotonic() + config.REDIS_RETRY_SECONDS
+
+    @staticmethod
+    def encode(value: Any) -> Optional[bytes]:
+        if isinstance(value, pd.DataFrame):
+            if not PARQUET_AVAILABLE:
+                return None
+            buf = io.BytesIO()
+            value.to_parquet(buf)
+            return _TAG_FRAME + buf.getvalue()
+        return _TAG_JSON + encode_message(value).encode()
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        if data[:1] == _TAG_FRAME:
+            return pd.read_parquet(io.BytesIO(data[1:]))
+        return _loads(data[1:])
+
+    async def get(self, key: str) -> Optional[tuple]:
+        """Returns (value, remaining ttl in seconds) or None."""
+        if not self.available:
+            return None
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                data, pttl = await pipe.get(key).pttl(key).execute()
+        except Exception as e:
+            self._failed(e)
+            return None
+        self._down = False
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.decode(data), max(pttl, 1000) / 1000.0
+
+    async def set(self, key: str, value: Any, ttl: int):
+        if not self.available:
+            return
+        # A value that can't be serialized is skipped on its own; it says nothing about Redis
+        try:
+            data = self.encode(value)
+        except Exception as e:
+            logger.warning(f"Cache: {key} not serializable for the shared tier ({e}), kept in L1 only")
+            return
+        if data is None:
+            return
+        try:
+            await self._client.set(key, data, ex=max(int(ttl), 1))
+        except Exception as e:
+            self._failed(e)
+
+    async def delete(self, key: str):
+        if not self.available:
+            return
+        try:
+            await self._client.delete(key)
+        except Exception as e:
+            self._failed(e)
+
+    async def publish(self, channel: str, message: str):
+        if not self.available:
+            return
+        try:
+            await self._client.publish(channel, message)
+        except Exception as e:
+            self._failed(e)
+
+    def pubsub(self):
+        return self._client.pubsub()
+
+    async def close(self):
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.available,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class TieredCache:
+    """
+    In-process L1 in front of an optional Redis L2.
+    Same async get/set/delete interface as MemoryCache, so callers don't care which tiers are live.
+    """
+    INVALIDATION_CHANNEL = "axiom:cache:invalidate"
+
+    def __init__(self, l1: MemoryCache, l2: Optional[RedisCache] = None):
+        self.l1 = l1
+        self.l2 = l2
+        self._origin = uuid.uuid4().hex  # this worker, so it ignores its own invalidations
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.l1.get(key)
+        if value is not None or self.l2 is None:
+            return value
+        hit = await self.l2.get(key)
+        if hit is None:
+            return None
+        value, ttl = hit
+        await self.l1.set(key, value, ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int):
+        await self.l1.set(key, value, ttl)
+        if self.l2 is not None:
+            await self.l2.set(key, value, ttl)
+            await self.l2.publish(self.INVALIDATION_CHANNEL, f"{self._origin}|{key}")
+
+    async def delete(self, key: str):
+        await self.l1.delete(key)
+        if self.l2 is not None:
+            await self.l2.delete(key)
+            await self.l2.publish(self.INVALIDATION_CHANNEL, f"{self._origin}|{key}")
+
+    async def _listen(self):
+        """Drops L1 entries other workers have overwritten or deleted."""
+        while True:
+            if not self.l2.available:
+                await asyncio.sleep(config.REDIS_RETRY_SECONDS)
+                await self.l2.connect()
+                continue
+            try:
+                pubsub = self.l2.pubsub()
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    origin, _, key = (data.decode() if isinstance(data, bytes) else data).partition("|")
+                    if origin != self._origin:
+                        await self.l1.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.l2._failed(e)
+
+    async def start(self):
+        self.l1.start()
+        if self.l2 is not None and self._listener is None:
+            await self.l2.connect()
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        self.l1.stop()
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self.l2 is not None:
+            await self.l2.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"l1": self.l1.stats()}
+        if self.l2 is not None:
+            stats["l2"] = self.l2.stats()
+        return stats
+
+
+# Shared by every DataRouter (routers are created per request)
+memory_cache = MemoryCache()
+shared_cache = TieredCache(memory_cache, RedisCache() if config.CACHE_REDIS_ENABLED else None)
@@ -0,0 +1,70 @@
+"""
+Compact storage for backtest equity curves.
+Curves are stored once per run as zlib-compressed float32 arrays: inline on
+the BacktestRun document when small, in GridFS when larger than
+CURVE_INLINE_MAX_BYTES, so run documents stay small however long the backtest.
+"""
+import zlib
+import logging
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+from bson import ObjectId
+from app.core import config
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pymongo.asynchronous.database import AsyncDatabase
+    from gridfs import AsyncGridFSBucket
+except ImportError:
+    AsyncDatabase = AsyncGridFSBucket = None
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+except ImportError:
+    AsyncIOMotorGridFSBucket = None
+
+GRIDFS_BUCKET = "equity_curves"
+
+
+def encode_curve(curve: Sequence[float]) -> bytes:
+    """float32 little-endian, zlib-compressed. NaN (e.g. the first bar) survives the round-trip."""
+    return zlib.compress(np.asarray(curve, dtype="<f4").tobytes(), level=6)
+
+
+def decode_curve(blob: bytes) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype="<f4").astype(float)
+
+
+def _bucket():
+    # Whichever async driver Beanie was initialised with
+    db = models.BacktestRun.get_pymongo_collection().database
+    if AsyncGridFSBucket is not None and isinstance(db, AsyncDatabase):
+        return AsyncGridFSBucket(db, bucket_name=GRIDFS_BUCKET)
+    return AsyncIOMotorGridFSBucket(db, bucket_name=GRIDFS_BUCKET)
+
+
+async def store_curve(curve: Sequence[float], name: str) -> Dict[str, Any]:
+    """Encodes a curve and returns the BacktestRun fields that reference it."""
+    blob = encode_curve(curve)
+    fields: Dict[str, Any] = {"equity_points": len(curve)}
+    if len(blob) <= config.CURVE_INLINE_MAX_BYTES:
+        fields["equity_blob"] = blob
+    else:
+        file_id = await _bucket().upload_from_stream(name, blob)
+        fields["equity_file_id"] = str(file_id)
+    return fields
+
+
+async def load_curve(run: "models.BacktestRun") -> Optional[np.ndarray]:
+    """The run's equity curve, whichever way it was stored (including legacy float lists)."""
+    if run.equity_blob is not None:
+        return decode_curve(run.equity_blob)
+    if run.equity_file_id is not None:
+        stream = await _bucket().open_download_stream(ObjectId(run.equity_file_id))
+        return decode_curve(await stream.read())
+    legacy = run.equity_curve or run.metrics.get("equity_curve")
+    if legacy is not None:
+        return np.array([np.nan if v is None else v for v in legacy], dtype=float)
+    return None
@@ -7,32 +7,18 @@ from typing import Dict, Any, Optional
 import yfinance as yf
 from app.utils.finnhub_client import FinnhubClient
 from app.utils.breeze_client import BreezeClient
+from app.services.cache import shared_cache
+from app.services.bar_store import bar_store, merge_bars, period_start, COVERED_FROM, COVERED_MAX
+from app.utils.single_flight import SingleFlight
+from app.utils.blocking_executor import blocking_executor
+from app.services.symbol_resolver import symbol_resolver
 from app.core import config
 
 logger = logging.getLogger(__name__)
 
-# Redis could be used here, but we'll implement a fallback local cache for resilience
-class LocalCache:
-    def __init__(self):
-        self.data = {}
-        self._lock = asyncio.Lock()
-
-    async def get(self, key: str):
-        async with self._lock:
-            entry = self.data.get(key)
-            if entry:
-                if entry['expiry'] > asyncio.get_event_loop().time():
-                    return entry['value']
-                else:
-                    del self.data[key]
-            return None
-
-    async def set(self, key: str, value: Any, ttl: int):
-        async with self._lock:
-            self.data[key] = {
-                'value': value,
-                'expiry': asyncio.get_event_loop().time() + ttl
-            }
+# Shared across routers (one per request): concurrent misses for the same
+# (symbol, interval, period) coalesce into one provider fetch
+_price_flights = SingleFlight()
 
 class DataRouter:
     """
@@ -42,16 +28,19 @@ class DataRouter:
     def __init__(self):
         self.finnhub = FinnhubClient()
         self.breeze = BreezeClient()
-        self.cache = LocalCache()
+        self.cache = shared_cache
 
     def _is_indian_market(self, symbol: str) -> bool:
-        """Determines if the symbol belongs to NSE/BSE."""
-        symbol = symbol.upper()
-        # Basic heuristic: .NS, .BO or typical Indian symbols if mapping exists
-        if any(suffix in symbol for suffix in [".NS", ".BO"]):
+        """
+        Determines if the symbol belongs to NSE/BSE: an explicit .NS / .BO / ^NSE / ^BSE ticker,
+        or a watchlist / ticker_mappings.json entry on those exchanges. Listing order and the
+        bare-name fallback (DEFAULT_TICKER_SUFFIX) are not evidence: ABB or an unlisted US ticker stays US.
+        """
+        symbol = symbol.strip().upper()
+        if symbol.endswith((".NS", ".BO")) or symbol.startswith(("^NSE", "^BSE")):
             return True
-        # Check against ticker map or other heuristics if needed
-        return False
+        mapping = symbol_resolver.mapping(symbol)
+        return mapping is not None and mapping.exchange in ("NSE", "BSE")
 
     async def get_price_data(self, symbol: str, interval: str = "1h", period: str = "1mo") -> pd.DataFrame:
         """
@@ -59,24 +48,35 @@ class DataRouter:
         Checks cache first.
         """
         cache_key = f"prices:{symbol}:{interval}:{period}"
-        cached_df_json = await self.cache.get(cache_key)
+        cached_df = await self.cache.get(cache_key)
         
-        if cached_df_json:
+        if cached_df is not None:
             logger.info(f"Cache hit for {symbol}")
-            return pd.read_json(cached_df_json)
+            # Callers normalize the frame in place, so hand out a copy and keep the cached one pristine
+            return cached_df.copy()
+
+        df = await _price_flights.do(
+            (symbol, interval, period),
+            lambda: self._load_price_data(symbol, interval, period, cache_key)
+        )
+        # Every coalesced caller gets its own copy of the shared result
+        return df.copy()
 
+    async def _load_price_data(self, symbol: str, interval: str, period: str, cache_key: str) -> pd.DataFrame:
+        """Cache-miss path: provider fetch, real-time enrichment, cache fill."""
         logger.info(f"Cache miss for {symbol}, routing to provider...")
         
         # 1. Indian Markets -> Breeze (Fallback to yfinance for now)
         if self._is_indian_market(symbol):
             # Currently Breeze is a placeholder, so we use yfinance as fallback
-            df = await self._fetch_from_yfinance(symbol, interval, period)
+            df = await self._get_history(symbol, interval, period)
         else:
             # 2. US/Global Markets -> Finnhub for real-time, yfinance for history
             # For 1mo data, yfinance is often more robust on free tiers
-            df = await self._fetch_from_yfinance(symbol, interval, period)
+            df = await self._get_history(symbol, interval, period)
             
             # Enrich with real-time quote from Finnhub if requested interval is small
+            # (synthetic bar: applied after the bar store, never persisted)
             if interval in ["1m", "5m", "15m", "1h"]:
                 quote = await self.finnhub.get_quote(symbol)
                 if quote and 'c' in quote:
@@ -95,14 +95,58 @@ class DataRouter:
 
         # Cache the result
         if not df.empty:
-            await self.cache.set(cache_key, df.to_json(), config.CACHE_TTL_PRICE)
-            
+            await self.cache.set(cache_key, df, config.CACHE_TTL_PRICE)
+
+        return df
+
+    async def _get_history(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        """
+        Serves bars from the on-disk bar store, downloading only what is missing:
+        the full period when the store doesn't reach back far enough, otherwise just the tail.
+        """
+        stored = await asyncio.to_thread(bar_store.load, symbol, interval)
+        now = pd.Timestamp.now(tz="UTC")
+        start = period_start(period, now)
+
+        if bar_store.covers(stored, start) and not bar_store.tail_reachable(stored, interval, start, now):
+            # A tail fetch would come back empty (or leave a gap): start over from the full period
+            logger.info(f"Bar store: {symbol} {interval} last bar out of provider reach, refetching")
+            stored = None
+
+        if not bar_store.covers(stored, start):
+            fresh = await self._fetch_from_yfinance(symbol, interval, period)
+            if fresh.empty:
+                return fresh
+            df = merge_bars(stored, fresh)
+            df.attrs[COVERED_FROM] = COVERED_MAX if start is None else start.isoformat()
+            await asyncio.to_thread(bar_store.save, symbol, interval, df)
+        else:
+            age = bar_store.age(symbol, interval)
+            df = stored
+            if age is None or age > config.CACHE_TTL_PRICE:
+                # Re-fetch from the last stored bar: it may have been provisional when written
+                tail = await self._fetch_tail(symbol, interval, stored.index[-1])
+                logger.info(f"Bar store: {symbol} {interval} +{len(tail)} bars")
+                # An empty tail must not rewrite the file: that would mark stale bars as freshly synced
+                if not tail.empty:
+                    df = merge_bars(stored, tail)
+                    await asyncio.to_thread(bar_store.save, symbol, interval, df)
+
+        if start is not None:
+            if df.index.tz is None:
+                start = start.tz_localize(None)
+            df = df[df.index >= start]
         return df
 
+    async def _fetch_tail(self, symbol: str, interval: str, since: pd.Timestamp) -> pd.DataFrame:
+        """Bars from `since` (inclusive) to now."""
+        ticker = yf.Ticker(symbol)
+        return await blocking_executor.run("yfinance", ticker.history, start=since, interval=interval)
+
     async def _fetch_from_yfinance(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
         """Helper to fetch bulk data from yfinance asynchronously."""
         ticker = yf.Ticker(symbol)
-        data = await asyncio.to_thread(ticker.history, period=period, interval=interval)
+        data = await blocking_executor.run("yfinance", ticker.history, period=period, interval=interval)
         return data
 
     async def get_features(self, symbol: str, feature_key: str) -> Any:
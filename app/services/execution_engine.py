@@ -6,25 +6,27 @@ from typing import Dict, Any
 logger = logging.getLogger(__name__)
 
 class ExecutionEngine:
+    IMPACT_COEFF = 0.1  # Heuristic square-root impact coefficient
+    DEFAULT_ADV = 1000000.0  # Assumed average daily volume when none is known
+
     def __init__(self, simulation_mode: bool = True):
         self.simulation_mode = simulation_mode
         self.base_spread_bps = 2.0  # Assumed 2 bps base spread for highly liquid large caps
 
-    def calculate_market_impact(self, quantity: float, adv: float = 1000000.0) -> float:
+    def calculate_market_impact(self, quantity: float, adv: float = DEFAULT_ADV) -> float:
         """
         Square root market impact model.
         impact = config_coeff * volatility * sqrt(order_size / ADV)
         Uses a heuristic participation rate for simulated environments.
         """
-        impact_coeff = 0.1  # Heuristic coefficient
         participation_rate = max(0.000001, quantity / adv) # Avoid zero
-        market_impact_bps = impact_coeff * math.sqrt(participation_rate) * 10000
+        market_impact_bps = self.IMPACT_COEFF * math.sqrt(participation_rate) * 10000
         
         # Total slippage is half the spread + market impact
         total_slippage_bps = (self.base_spread_bps / 2.0) + market_impact_bps
         return total_slippage_bps / 10000.0
 
-    def route_order(self, symbol: str, quantity: float, side: str, price: float, adv: float = 1000000.0) -> Dict[str, Any]:
+    def route_order(self, symbol: str, quantity: float, side: str, price: float, adv: float = DEFAULT_ADV) -> Dict[str, Any]:
         """
         Smart Order Router (SOR) 
         In simulation: Applies non-linear market impact slippage based on trade size.
@@ -0,0 +1,366 @@
+"""
+Incremental (streaming) indicator engine.
+Keeps per-(symbol, interval) state — rolling sums, EMA recurrences and a
+monotonic deque for the rolling high — so each new bar costs O(1) instead of a
+full pandas pass over the frame. The last bar of every frame is treated as
+provisional (still forming): it is evaluated with `peek` semantics and never
+committed to the state.
+
+Results reproduce MarketAnalyzer.calculate_indicators on the same frame,
+including the frame-origin effects of the vectorized path (NaN warm-up rows,
+first-row TR/RSI deltas, EMAs seeded at the first row), so a frame whose
+period window slid forward still matches exactly.
+"""
+import threading
+import logging
+import numpy as np
+import pandas as pd
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# Mirrors MarketAnalyzer.calculate_indicators
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_STD_MULT = 2.0
+
+_A_FAST = 2.0 / (MACD_FAST + 1)
+_A_SLOW = 2.0 / (MACD_SLOW + 1)
+_A_SIG = 2.0 / (MACD_SIGNAL + 1)
+
+# Committed rows replayed one by one before falling back to a vectorized re-seed
+_MAX_REPLAY = 256
+# Running sums are recomputed from the stored bars this often to cancel float drift
+_REBUILD_EVERY = 1024
+
+_BAR_COLUMNS = ("High", "Low", "Close", "Volume")
+
+
+def _ema_seed_response(c: float, r: float, j) -> float:
+    """
+    Signal-line EMA (seeded with its first input) of the geometric sequence c * r**k,
+    evaluated at k = j. Closed form of z_k = a*c*r**k + (1-a)*z_{k-1}, z_0 = c.
+    """
+    q = 1.0 - _A_SIG
+    amp = _A_SIG * c * r / (r - q)
+    return amp * r ** j + (c - amp) * q ** j
+
+
+class IndicatorState:
+    """Committed bars for one (symbol, interval) plus the running window state."""
+
+    def __init__(self, capacity: int = 512):
+        self.lock = threading.Lock()
+        self.n = 0
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.cols: Dict[str, np.ndarray] = {
+            c: np.zeros(capacity) for c in
+            ("high", "low", "close", "volume", "tr", "gain", "loss", "ema_fast", "ema_slow", "signal", "atr")
+        }
+        self.windows: Tuple[Tuple[str, int], ...] = (
+            ("close", config.SMA_FAST), ("close", config.SMA_MEDIUM), ("close", config.SMA_SLOW),
+            ("tr", config.ATR_WINDOW), ("gain", config.RSI_WINDOW), ("loss", config.RSI_WINDOW),
+            ("volume", config.MOMENTUM_LOOKBACK),
+        )
+        self.sums: Dict[Tuple[str, int], float] = {}
+        self.sq_sum = 0.0  # Σ (close - anchor)² over the Bollinger window
+        self.anchor = 0.0
+        self.high_dq: deque = deque()  # indices, rolling max of High over MOMENTUM_LOOKBACK
+
+    # --- Storage ---
+    def _reserve(self, needed: int):
+        cap = len(self.ts)
+        if needed <= cap:
+            return
+        new_cap = max(needed, cap * 2)
+        ts = np.zeros(new_cap, dtype=np.int64)
+        ts[:self.n] = self.ts[:self.n]
+        self.ts = ts
+        for c, arr in self.cols.items():
+            grown = np.zeros(new_cap)
+            grown[:self.n] = arr[:self.n]
+            self.cols[c] = grown
+
+    def _rebuild_running(self):
+        """Recomputes window sums and the rolling-high deque from the stored bars (O(window))."""
+        n, cols = self.n, self.cols
+        self.sums = {(c, w): float(cols[c][max(0, n - w):n].sum()) for c, w in self.windows}
+        bb = config.SMA_FAST
+        self.anchor = float(cols["close"][n - 1]) if n else 0.0
+        self.sq_sum = float(((cols["close"][max(0, n - bb):n] - self.anchor) ** 2).sum())
+        lb = config.MOMENTUM_LOOKBACK
+        self.high_dq = deque()
+        high = cols["high"]
+        for i in range(max(0, n - lb), n):
+            while self.high_dq and high[self.high_dq[-1]] <= high[i]:
+                self.high_dq.pop()
+            self.high_dq.append(i)
+
+    def truncate(self, n: int):
+        """Drops committed bars from index n on (e.g. a bar that was revised upstream)."""
+        if n < self.n:
+            self.n = n
+            self._rebuild_running()
+
+    def seed(self, ts: np.ndarray, bars: Dict[str, np.ndarray]):
+        """Cold start: vectorized pandas pass over the bars, stored as the committed history."""
+        k = len(ts)
+        self.n = 0
+        self._reserve(k)
+        high, low, close, volume = (pd.Series(bars[c]) for c in ("high", "low", "close", "volume"))
+        prev = close.shift()
+        tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+        delta = close.diff()
+        ema_fast = close.ewm(span=MACD_FAST, adjust=False).mean()
+        ema_slow = close.ewm(span=MACD_SLOW, adjust=False).mean()
+        signal = (ema_fast - ema_slow).ewm(span=MACD_SIGNAL, adjust=False).mean()
+
+        cols = self.cols
+        self.ts[:k] = ts
+        cols["high"][:k], cols["low"][:k] = high, low
+        cols["close"][:k], cols["volume"][:k] = close, volume
+        cols["tr"][:k] = tr
+        cols["gain"][:k] = delta.where(delta > 0, 0)
+        cols["loss"][:k] = -delta.where(delta < 0, 0)
+        cols["ema_fast"][:k], cols["ema_slow"][:k], cols["signal"][:k] = ema_fast, ema_slow, signal
+        cols["atr"][:k] = tr.rolling(window=config.ATR_WINDOW).mean()
+        self.n = k
+        self._rebuild_running()
+
+    def _bar_terms(self, h: float, l: float, c: float) -> Tuple[float, float, float, float, float, float]:
+        """TR, gain, loss and the EMA recurrences for a bar following the last committed one."""
+        n, cols = self.n, self.cols
+        if n == 0:
+            return h - l, 0.0, 0.0, c, c, 0.0
+        pc = cols["close"][n - 1]
+        tr = max(h - l, abs(h - pc), abs(l - pc))
+        d = c - pc
+        ema_fast = (1 - _A_FAST) * cols["ema_fast"][n - 1] + _A_FAST * c
+        ema_slow = (1 - _A_SLOW) * cols["ema_slow"][n - 1] + _A_SLOW * c
+        signal = (1 - _A_SIG) * cols["signal"][n - 1] + _A_SIG * (ema_fast - ema_slow)
+        return tr, (d if d > 0 else 0.0), (-d if d < 0 else 0.0), ema_fast, ema_slow, signal
+
+    def commit(self, ts: int, h: float, l: float, c: float, v: float):
+        """O(1) append of a completed bar."""
+        tr, gain, loss, ema_fast, ema_slow, signal = self._bar_terms(h, l, c)
+        n = self.n
+        self._reserve(n + 1)
+        cols = self.cols
+        values = {"high": h, "low": l, "close": c, "volume": v, "tr": tr, "gain": gain, "loss": loss}
+        for key in self.windows:
+            col, w = key
+            leaving = cols[col][n - w] if n >= w else 0.0
+            self.sums[key] += values[col] - leaving
+        bb = config.SMA_FAST
+        leaving = (cols["close"][n - bb] - self.anchor) ** 2 if n >= bb else 0.0
+        self.sq_sum += (c - self.anchor) ** 2 - leaving
+
+        self.ts[n] = ts
+        for col, value in values.items():
+            cols[col][n] = value
+        cols["ema_fast"][n], cols["ema_slow"][n], cols["signal"][n] = ema_fast, ema_slow, signal
+        cols["atr"][n] = self.sums[("tr", config.ATR_WINDOW)] / config.ATR_WINDOW if n + 1 >= config.ATR_WINDOW else np.nan
+
+        lb = config.MOMENTUM_LOOKBACK
+        while self.high_dq and cols["high"][self.high_dq[-1]] <= h:
+            self.high_dq.pop()
+        self.high_dq.append(n)
+        while self.high_dq[0] <= n - lb:
+            self.high_dq.popleft()
+
+        self.n = n + 1
+        if self.n % _REBUILD_EVERY == 0:
+            self._rebuild_running()
+
+    # --- Reads ---
+    def _macd_at(self, k: int, s: int, ema_fast: float, ema_slow: float, signal: float) -> Tuple[float, float]:
+        """MACD / signal at row k as the vectorized path sees them for a frame starting at row s."""
+        cols = self.cols
+        j = k - s
+        c_fast = cols["close"][s] - cols["ema_fast"][s]
+        c_slow = cols["close"][s] - cols["ema_slow"][s]
+        q_fast, q_slow, q_sig = 1 - _A_FAST, 1 - _A_SLOW, 1 - _A_SIG
+        macd = (ema_fast + c_fast * q_fast ** j) - (ema_slow + c_slow * q_slow ** j)
+        macd_s = cols["ema_fast"][s] - cols["ema_slow"][s]
+        sig = (
+            signal + q_sig ** j * (macd_s - cols["signal"][s])
+            + _ema_seed_response(c_fast, q_fast, j) - _ema_seed_response(c_slow, q_slow, j)
+        )
+        return float(macd), float(sig)
+
+    def peek(self, s: int, h: float, l: float, c: float, v: float) -> Dict[str, float]:
+        """
+        Indicators for a provisional bar following the committed ones, for a frame
+        whose first row is committed row s. Nothing is mutated.
+        """
+        n, cols = self.n, self.cols
+        t = n
+        avail = t - s + 1
+        nan = np.nan
+        tr, gain, loss, ema_fast, ema_slow, signal = self._bar_terms(h, l, c)
+        values = {"close": c, "volume": v, "tr": tr, "gain": gain, "loss": loss}
+
+        def window_sum(col: str, w: int) -> float:
+            leaving = cols[col][n - w] if n >= w else 0.0
+            return self.sums[(col, w)] + values[col] - leaving
+
+        def window_mean(col: str, w: int) -> float:
+            return window_sum(col, w) / w if avail >= w else nan
+
+        # The vectorized path has no previous close at the frame's first row:
+        # TR there is High-Low and the RSI delta is 0, which matters when that row
+        # is still inside the window.
+        atr_w, rsi_w = config.ATR_WINDOW, config.RSI_WINDOW
+        atr = nan
+        if avail >= atr_w:
+            atr = window_sum("tr", atr_w)
+            if avail == atr_w:
+                atr -= cols["tr"][s] - (cols["high"][s] - cols["low"][s])
+            atr /= atr_w
+        rsi = nan
+        if avail >= rsi_w:
+            g, lo = window_sum("gain", rsi_w), window_sum("loss", rsi_w)
+            if avail == rsi_w:
+                g -= cols["gain"][s]
+                lo -= cols["loss"][s]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rs = np.float64(g / rsi_w) / np.float64(lo / rsi_w)
+                rsi = float(100 - (100 / (1 + rs)))
+
+        sma_fast = window_mean("close", config.SMA_FAST)
+        bb_upper = bb_lower = nan
+        bb = config.SMA_FAST
+        if avail >= bb:
+            leaving = (cols["close"][n - bb] - self.anchor) ** 2 if n >= bb else 0.0
+            sq = self.sq_sum + (c - self.anchor) ** 2 - leaving
+            mean_dev = sma_fast - self.anchor
+            var = max((sq - bb * mean_dev * mean_dev) / (bb - 1), 0.0)
+            std = var ** 0.5
+            bb_upper, bb_lower = sma_fast + std * BB_STD_MULT, sma_fast - std * BB_STD_MULT
+
+        lb = config.MOMENTUM_LOOKBACK
+        recent_high = nan
+        if avail >= lb:
+            recent_high = h
+            for i in self.high_dq:
+                if i > n - lb:
+                    recent_high = max(recent_high, cols["high"][i])
+                    break
+
+        macd, sig = self._macd_at(t, s, ema_fast, ema_slow, signal)
+        k = t - 1
+        prev_macd, prev_sig = self._macd_at(k, s, cols["ema_fast"][k], cols["ema_slow"][k], cols["signal"][k])
+
+        # Median of ATR/Close over the frame, as the regime detector sees it
+        first_full = s + atr_w  # first row whose ATR window excludes the frame origin
+        ratios = [cols["atr"][first_full:n] / cols["close"][first_full:n]]
+        edge = s + atr_w - 1
+        if edge < n:
+            edge_atr = (cols["atr"][edge] * atr_w - cols["tr"][s] + (cols["high"][s] - cols["low"][s])) / atr_w
+            ratios.append(np.array([edge_atr / cols["close"][edge]]))
+        ratios.append(np.array([atr / c]))
+        ratios = np.concatenate(ratios)
+        ratios = ratios[~np.isnan(ratios)]
+        vol_median = float(np.median(ratios)) if ratios.size else nan
+
+        return {
+            "Close": float(c),
+            "High": float(h),
+            "Volume": float(v),
+            "ATR": float(atr),
+            "RSI": rsi,
+            "SMA_20": float(sma_fast),
+            "SMA_50": float(window_mean("close", config.SMA_MEDIUM)),
+            "SMA_200": float(window_mean("close", config.SMA_SLOW)),
+            "Vol_Ratio": float(atr / c * 100),
+            "MACD": macd,
+            "Signal_Line": sig,
+            "Prev_MACD": prev_macd,
+            "Prev_Signal_Line": prev_sig,
+            "BB_Upper": float(bb_upper),
+            "BB_Lower": float(bb_lower),
+            "Recent_High": float(recent_high),
+            "Avg_Volume": float(window_mean("volume", lb)),
+            "Vol_Median": vol_median,
+            "Rows": avail,
+        }
+
+    def snapshot(self, df: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """
+        Syncs the state with a (normalized) OHLCV frame and returns the indicators of its
+        last row. Only bars the state hasn't seen are processed; a revised bar rolls the
+        state back to it.
+        """
+        m = len(df)
+        if m < 2 or any(c not in df.columns for c in _BAR_COLUMNS):
+            return None
+        ts = df.index.values.astype("datetime64[ns]").view("int64")
+        bars = {c.lower(): df[c].to_numpy(dtype=float) for c in _BAR_COLUMNS}
+        if any(np.isnan(arr).any() for arr in bars.values()):
+            return None
+
+        committed = m - 1  # the frame's last bar stays provisional
+        s = int(np.searchsorted(self.ts[:self.n], ts[0]))
+        if s >= self.n or self.ts[s] != ts[0]:
+            self.seed(ts[:committed], {c: arr[:committed] for c, arr in bars.items()})
+            s = 0
+        else:
+            overlap = min(self.n - s, committed)
+            same = self.ts[s:s + overlap] == ts[:overlap]
+            for c, arr in bars.items():
+                same &= self.cols[c][s:s + overlap] == arr[:overlap]
+            mismatch = np.flatnonzero(~same)
+            p = int(mismatch[0]) if mismatch.size else overlap
+            if p == 0 or committed - p > _MAX_REPLAY:
+                self.seed(ts[:committed], {c: arr[:committed] for c, arr in bars.items()})
+                s = 0
+            else:
+                self.truncate(s + p)
+                for i in range(p, committed):
+                    self.commit(ts[i], bars["high"][i], bars["low"][i], bars["close"][i], bars["volume"][i])
+
+        last = m - 1
+        return self.peek(s, bars["high"][last], bars["low"][last], bars["close"][last], bars["volume"][last])
+
+
+class IndicatorEngine:
+    """Per-(symbol, interval) indicator states, LRU-bounded."""
+
+    def __init__(self, max_states: int = config.INDICATOR_MAX_STATES):
+        self.max_states = max_states
+        self._states: "OrderedDict[tuple, IndicatorState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, key: tuple) -> IndicatorState:
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = IndicatorState()
+                while len(self._states) > self.max_states:
+                    self._states.popitem(last=False)
+            else:
+                self._states.move_to_end(key)
+            return state
+
+    def snapshot(self, symbol: str, interval: str, df: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Last-row indicators for the frame, or None if the frame can't be handled incrementally."""
+        state = self._state((symbol, interval))
+        with state.lock:
+            try:
+                return state.snapshot(df)
+            except Exception as e:
+                logger.warning(f"Indicator engine: resetting {symbol} {interval} state ({e})")
+                state.n = 0
+                return None
+
+    def reset(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == symbol]:
+                    del self._states[key]
+
+
+indicator_engine = IndicatorEngine()
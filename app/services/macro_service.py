@@ -0,0 +1,187 @@
+"""
+Macro quote panels (yields, FX, commodities, crypto).
+One background task downloads every macro ticker in a single batched call on a
+schedule, builds the four panels, and keeps each one as pre-serialized JSON so
+the endpoints only hand out bytes. Panels that changed are pushed to terminals
+subscribed to the MACRO topic.
+"""
+import time
+import asyncio
+import logging
+import math
+import yfinance as yf
+from typing import Dict, Optional
+from app.core import config
+from app.utils.frame_codec import Frame, encode_message
+from app.utils.single_flight import SingleFlight
+from app.utils.blocking_executor import blocking_executor
+from app.services.websocket_manager import ws_manager, TOPIC_MACRO
+
+logger = logging.getLogger(__name__)
+
+# Panel -> yfinance ticker -> label (maturity for yields)
+MACRO_PANELS = {
+    "yields": {'^IRX': '3M', '^ZT': '2Y', '^FVX': '5Y', '^TNX': '10Y', '^TYX': '30Y'},
+    "fx": {
+        'DX-Y.NYB': 'DXY',
+        'USDINR=X': 'USD/INR',
+        'EURUSD=X': 'EUR/USD',
+        'GBPUSD=X': 'GBP/USD',
+        'JPY=X': 'USD/JPY',
+        'AUDUSD=X': 'AUD/USD',
+        'CHF=X': 'USD/CHF'
+    },
+    "commodities": {
+        'CL=F': 'WTI Crude',
+        'BZ=F': 'Brent Crude',
+        'NG=F': 'Natural Gas',
+        'GC=F': 'Gold',
+        'SI=F': 'Silver',
+        'HG=F': 'Copper'
+    },
+    "crypto": {
+        'BTC-USD': 'Bitcoin',
+        'ETH-USD': 'Ethereum',
+        'SOL-USD': 'Solana',
+        'BNB-USD': 'BNB',
+        'XRP-USD': 'XRP',
+        'DOGE-USD': 'Dogecoin'
+    },
+}
+MACRO_TICKERS = [ticker for tickers in MACRO_PANELS.values() for ticker in tickers]
+
+
+def download_closes(tickers: list) -> Dict[str, tuple]:
+    """One yfinance call for every macro ticker: {ticker: (last close, previous close)}."""
+    data = yf.download(
+        tickers,
+        period="5d",
+        interval="1d",
+        progress=False,
+        threads=True,
+        auto_adjust=True,
+        multi_level_index=True
+    )
+    if data is None or data.empty:
+        return {}
+    close = data["Close"].reindex(columns=tickers)
+    closes = {}
+    for ticker in tickers:
+        series = close[ticker].dropna()
+        if series.empty or math.isnan(float(series.iloc[-1])):
+            continue
+        price = float(series.iloc[-1])
+        closes[ticker] = (price, float(series.iloc[-2]) if len(series) > 1 else price)
+    return closes
+
+
+def _asset_row(label: str, price: float, prev: float, decimals: int) -> dict:
+    chg_pct = ((price - prev) / prev) * 100 if prev else 0.0
+    return {
+        'symbol': label,
+        'price': round(price, decimals),
+        'change_pct': round(chg_pct, 2) if not math.isnan(chg_pct) else 0.0,
+        'up': chg_pct >= 0 if not math.isnan(chg_pct) else True
+    }
+
+
+def build_panels(closes: Dict[str, tuple]) -> Dict[str, dict]:
+    """Response payloads of the four macro endpoints."""
+    yields = []
+    for ticker, maturity in MACRO_PANELS["yields"].items():
+        if ticker not in closes:
+            continue
+        val, prev = closes[ticker]
+        chg_bps = (val - prev) * 100 if prev else 0.0
+        yields.append({
+            'maturity': maturity,
+            'yield': round(val, 3), # IRX is actually a discount yield but close enough
+            'chg_bps': round(chg_bps, 1) if not math.isnan(chg_bps) else 0.0,
+            'up': chg_bps >= 0 if not math.isnan(chg_bps) else True
+        })
+
+    def assets(panel: str, decimals) -> dict:
+        return {"assets": [
+            _asset_row(label, *closes[ticker], decimals(closes[ticker][0]))
+            for ticker, label in MACRO_PANELS[panel].items() if ticker in closes
+        ]}
+
+    return {
+        "yields": {'US': yields},
+        "fx": assets("fx", lambda price: 4 if price < 100 else 2),
+        "commodities": assets("commodities", lambda price: 2),
+        "crypto": assets("crypto", lambda price: 4 if price < 1 else 2),
+    }
+
+
+class MacroService:
+    def __init__(self, refresh_interval: int = config.MACRO_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.panels: Dict[str, dict] = {}
+        self._bodies: Dict[str, bytes] = {}  # panel -> serialized response
+        self.updated_at: Optional[float] = None
+        self._snapshot: Optional[Frame] = None  # All panels, shared by every new subscriber
+        self._flight = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self):
+        """Downloads all macro tickers once, rebuilds the panels and pushes the changed ones."""
+        await self._flight.do("macro", self._refresh)
+
+    async def _refresh(self):
+        try:
+            closes = await blocking_executor.run("yfinance", download_closes, MACRO_TICKERS)
+        except Exception as e:
+            logger.error(f"Macro refresh failed: {e}")
+            return
+        if not closes:
+            logger.warning("Macro refresh returned no data; keeping the previous panels")
+            return
+
+        changed = {}
+        for panel, payload in build_panels(closes).items():
+            if payload == self.panels.get(panel):
+                continue
+            self.panels[panel] = payload
+            self._bodies[panel] = encode_message(payload).encode()
+            changed[panel] = payload
+        self.updated_at = time.time()
+        if changed:
+            self._snapshot = None
+            await ws_manager.broadcast_to_clients(self.message(changed), topic=TOPIC_MACRO)
+
+    def message(self, panels: Optional[Dict[str, dict]] = None) -> dict:
+        """MACRO frame body for the given panels (all of them by default)."""
+        return {"type": "MACRO", "payload": self.panels if panels is None else panels, "timestamp": self.updated_at}
+
+    def snapshot_frame(self) -> Optional[Frame]:
+        if self._snapshot is None and self.panels:
+            self._snapshot = Frame(self.message())
+        return self._snapshot
+
+    async def body(self, panel: str) -> bytes:
+        """
+        Serialized panel. Before the first successful refresh it waits for a refresh already
+        in flight, but never starts one: downloads only come from the scheduled loop.
+        """
+        if panel not in self._bodies:
+            await self._flight.wait("macro")
+        return self._bodies.get(panel) or encode_message(build_panels({})[panel]).encode()
+
+
+# Global instance
+macro_service = MacroService()
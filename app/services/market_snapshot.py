@@ -0,0 +1,159 @@
+"""
+In-process last-price table.
+Keeps price / prev_close / timestamp for every provider ticker in use. The
+terminal hub's Finnhub trade batches update prices as they print; a scheduled
+refresh fetches every tracked ticker in one batched yfinance download (which
+also supplies prev_close). Endpoints read the table in O(1) per symbol, and
+tickers seen for the first time are fetched together in one coalesced call.
+"""
+import time
+import asyncio
+import logging
+import math
+import yfinance as yf
+from typing import Dict, Iterable, List, Optional
+from app.core import config
+from app.utils.single_flight import SingleFlight
+from app.utils.blocking_executor import blocking_executor
+from app.services.symbol_resolver import symbol_resolver
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TRADE = "trade"  # Finnhub print
+SOURCE_REFRESH = "refresh"  # Batched yfinance refresh
+
+
+def download_quotes(tickers: List[str]) -> Dict[str, dict]:
+    """One yfinance call for every ticker: last close and the one before it."""
+    data = yf.download(
+        tickers,
+        period="5d",
+        interval="1d",
+        progress=False,
+        threads=True,
+        auto_adjust=True,
+        multi_level_index=True
+    )
+    if data is None or data.empty:
+        return {}
+    close = data["Close"].reindex(columns=tickers)
+    now = time.time()
+    quotes = {}
+    for ticker in tickers:
+        series = close[ticker].dropna()
+        if series.empty:
+            continue
+        price = float(series.iloc[-1])
+        prev = float(series.iloc[-2]) if len(series) > 1 else price
+        if math.isnan(price):
+            continue
+        quotes[ticker] = {"price": price, "prev_close": prev, "timestamp": now, "source": SOURCE_REFRESH}
+    return quotes
+
+
+class MarketSnapshot:
+    def __init__(self, refresh_interval: int = config.SNAPSHOT_REFRESH_SECONDS,
+                 idle_ttl: int = config.SNAPSHOT_IDLE_TTL):
+        self.refresh_interval = refresh_interval
+        self.idle_ttl = idle_ttl
+        self._quotes: Dict[str, dict] = {}  # ticker -> price / prev_close / timestamp / source
+        self._last_used: Dict[str, float] = {}  # tracked tickers -> last read
+        self._misses: Dict[str, float] = {}  # tickers the provider had no quote for -> when
+        self._flight = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def __len__(self):
+        return len(self._quotes)
+
+    # --- Feeds ---
+
+    def update_trade(self, symbol: str, price: float, timestamp_ms: float):
+        """Hub trade batch for a streamed symbol. Only moves the price; prev_close comes from the refresh."""
+        ticker = symbol_resolver.yf_ticker(symbol)
+        quote = self._quotes.get(ticker)
+        if quote is None:
+            # prev_close is unknown until the ticker's first download
+            quote = self._quotes[ticker] = {"price": price, "prev_close": None, "source": SOURCE_TRADE}
+        quote["price"] = price
+        quote["timestamp"] = timestamp_ms / 1000
+        quote["source"] = SOURCE_TRADE
+
+    def _merge(self, quotes: Dict[str, dict]):
+        for ticker, fresh in quotes.items():
+            quote = self._quotes.get(ticker)
+            # A print newer than the download keeps its price; prev_close always comes from the download
+            if quote is not None and quote["source"] == SOURCE_TRADE and quote["timestamp"] >= fresh["timestamp"] - self.refresh_interval:
+                quote["prev_close"] = fresh["prev_close"]
+            else:
+                self._quotes[ticker] = fresh
+
+    async def _fetch(self, tickers: List[str]):
+        try:
+            quotes = await blocking_executor.run("yfinance", download_quotes, tickers)
+        except Exception as e:
+            logger.error(f"Market snapshot refresh failed ({len(tickers)} tickers): {e}")
+            return
+        self._merge(quotes)
+        now = time.time()
+        for ticker in tickers:
+            if ticker in quotes:
+                self._misses.pop(ticker, None)
+            else:
+                self._misses[ticker] = now
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            # Drop tickers nobody has read for a while, then refresh the rest in one call
+            cutoff = time.time() - self.idle_ttl
+            for ticker in [t for t, used in self._last_used.items() if used < cutoff]:
+                del self._last_used[ticker]
+                self._quotes.pop(ticker, None)
+                self._misses.pop(ticker, None)
+            if self._last_used:
+                await self._fetch(sorted(self._last_used))
+
+    # --- Readers ---
+
+    def get(self, ticker: str) -> Optional[dict]:
+        """O(1) lookup without fetching; None when the ticker isn't in the table yet."""
+        return self._quotes.get(ticker)
+
+    async def quotes(self, tickers: Iterable[str]) -> Dict[str, dict]:
+        """
+        Quotes for `tickers`, tracking them for the scheduled refresh. Tickers missing from
+        the table (or only seen on the tape so far) are fetched in one batched download,
+        shared by concurrent readers. prev_close is None only if that download failed.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        now = time.time()
+        for ticker in tickers:
+            self._last_used[ticker] = now
+        # Unknown tickers are retried by the scheduled refresh, not on every read
+        missing = [
+            t for t in tickers
+            if self._quotes.get(t, {}).get("prev_close") is None and now - self._misses.get(t, 0) > self.refresh_interval
+        ]
+        if missing:
+            key = ",".join(sorted(missing))
+            await self._flight.do(key, lambda: self._fetch(missing))
+        return {t: self._quotes[t] for t in tickers if t in self._quotes}
+
+    async def prices(self, tickers: Iterable[str]) -> Dict[str, float]:
+        return {t: q["price"] for t, q in (await self.quotes(tickers)).items()}
+
+    def stats(self) -> dict:
+        return {"tickers": len(self._quotes), "tracked": len(self._last_used), "inflight": len(self._flight)}
+
+
+# Global instance
+market_snapshot = MarketSnapshot()
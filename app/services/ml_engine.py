@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from app.core import config
 from app.services.data_router import DataRouter
+from app.services.indicator_engine import indicator_engine
 from app.utils.regime_detector import RegimeDetector, MarketRegime
 from app.utils.resilience import retry_on_failure
 import logging
@@ -12,13 +13,15 @@ class MarketAnalyzer:
     def __init__(self, symbol):
         self.symbol = symbol
         self.data = None
+        self.interval = None
         self.router = DataRouter()
         self.regime_detector = RegimeDetector()
 
     @retry_on_failure(retries=3)
-    async def fetch_data(self, symbol: str, period: str = "1mo", interval: str = "1h"):
+    async def fetch_data(self, period: str = "1mo", interval: str = "1h"):
         """Fetches data via the DataRouter and applies normalization."""
         self.data = await self.router.get_price_data(self.symbol, interval=interval, period=period)
+        self.interval = interval
         
         if self.data.empty:
             raise Exception(f"No data found for symbol {self.symbol}")
@@ -103,15 +106,62 @@ class MarketAnalyzer:
         
         return df
 
+    def _latest_signals(self):
+        """
+        Last-bar indicators and signals from the incremental engine (O(1) per new bar).
+        Mirrors calculate_indicators + generate_vectorized_signals + detect_regime for the last row.
+        Returns None when the frame can't be handled incrementally.
+        """
+        snap = indicator_engine.snapshot(self.symbol, self.interval, self.data)
+        if snap is None:
+            return None
+        
+        scalp = 0
+        if snap['RSI'] < 30:
+            scalp += 2
+        if snap['RSI'] > 70:
+            scalp -= 2
+        if snap['MACD'] > snap['Signal_Line'] and snap['Prev_MACD'] <= snap['Prev_Signal_Line']:
+            scalp += 2
+        if snap['MACD'] < snap['Signal_Line'] and snap['Prev_MACD'] >= snap['Prev_Signal_Line']:
+            scalp -= 2
+        
+        momentum = 0
+        if snap['Close'] > snap['Recent_High'] * config.MOMENTUM_PROXIMITY and snap['Volume'] > snap['Avg_Volume'] * 1.3:
+            momentum = 2
+        
+        mean_rev = 0
+        if snap['Close'] < snap['BB_Lower'] and snap['RSI'] < 35:
+            mean_rev = 2
+        if snap['Close'] > snap['BB_Upper'] and snap['RSI'] > 65:
+            mean_rev = -2
+        
+        regime = self.regime_detector.classify(
+            close=snap['Close'],
+            sma_200=snap['SMA_200'],
+            atr=snap['ATR'],
+            vol_median=snap['Vol_Median'],
+            rows=snap['Rows']
+        )
+        row = {**snap, 'Scalp_Signal': scalp, 'Momentum_Signal': momentum, 'MR_Signal': mean_rev}
+        return pd.DataFrame([row], index=self.data.index[-1:]), regime
+
     def predict_direction(self, strategy_type="ensemble"):
         """
-        Interface for real-time prediction using vectorized logic.
+        Interface for real-time prediction.
+        Hot symbols are served by the incremental indicator engine; the full vectorized
+        pass is the fallback (and what the backtester uses).
         """
-        self.calculate_indicators()
-        self.signals = self.generate_vectorized_signals()
+        latest = self._latest_signals() if self.interval else None
+        if latest is not None:
+            # One-row frame: the auditor and risk sizing only read the last bar
+            self.signals, regime = latest
+        else:
+            self.calculate_indicators()
+            self.signals = self.generate_vectorized_signals()
+            regime = self.regime_detector.detect_regime(self.signals)
         
         # Current Regime Handling
-        regime = self.regime_detector.detect_regime(self.signals)
         weights = self.regime_detector.get_strategy_weights(regime)
         
         last_row = self.signals.iloc[-1]
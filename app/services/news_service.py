@@ -12,11 +12,15 @@ from datetime import datetime, timezone
 from typing import List, Dict
 from dotenv import load_dotenv
 from deep_translator import GoogleTranslator
+from app.utils.http_pool import get_client
+from app.utils.blocking_executor import blocking_executor
+from app.services.cache import shared_cache
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 FINNHUB_KEY = os.getenv("FINNHUB_API_KEY")
+NEWS_CACHE_KEY = "news:feed"
 
 # ─── RANKING WEIGHTS ──────────────────────────────────────────────────────────
 # Each keyword hit adds to the article's severity score (0–100)
@@ -109,21 +113,28 @@ class NewsIntelligenceService:
         self._last_update: float = 0
         self._ttl: int = 300  # refresh every 5 minutes
 
-    async def get_feed(self, limit: int = 40) -> List[Dict]:
+    async def get_feed(self, limit: int = 40, force: bool = False) -> List[Dict]:
         now = datetime.now(timezone.utc).timestamp()
-        if now - self._last_update > self._ttl or not self._cache:
-            await self._refresh()
+        if force or now - self._last_update > self._ttl or not self._cache:
+            # Another worker may already have refreshed (and translated) the feed
+            shared = None if force else await shared_cache.get(NEWS_CACHE_KEY)
+            if shared:
+                self._cache = shared
+                self._last_update = now
+            else:
+                await self._refresh()
+                await shared_cache.set(NEWS_CACHE_KEY, self._cache, self._ttl)
         return self._cache[:limit]
 
     async def _refresh(self):
         logger.info("Refreshing news intelligence feed...")
         # Fetch all sources in PARALLEL — reduces cold-start from ~45s to ~8s
-        async with httpx.AsyncClient(timeout=8) as client:
-            finnhub, gdelt = await asyncio.gather(
-                self._fetch_finnhub(client),
-                self._fetch_gdelt(client),
-                return_exceptions=False
-            )
+        # Shared keep-alive pools, one per upstream host
+        finnhub, gdelt = await asyncio.gather(
+            self._fetch_finnhub(get_client("finnhub")),
+            self._fetch_gdelt(get_client("gdelt")),
+            return_exceptions=False
+        )
         articles = finnhub + gdelt
 
         # Classify, deduplicate, rank
@@ -149,9 +160,9 @@ class NewsIntelligenceService:
             translator = GoogleTranslator(source='auto', target='en')
             try:
                 if a.get("headline"):
-                    a["headline"] = await asyncio.to_thread(translator.translate, a["headline"])
+                    a["headline"] = await blocking_executor.run("translate", translator.translate, a["headline"])
                 if a.get("summary"):
-                    a["summary"] = await asyncio.to_thread(translator.translate, a["summary"])
+                    a["summary"] = await blocking_executor.run("translate", translator.translate, a["summary"])
             except Exception as e:
                 logger.warning(f"Translation failed for {a.get('headline', '')[:20]}: {e}")
             return a
@@ -6,8 +6,11 @@ import httpx
 import asyncio
 import logging
 import os
+import time
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
+from app.utils.http_pool import get_client
+from app.utils.track_store import TrackStore
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -45,12 +48,31 @@ ICAO_COUNTRY = {
 # Well-known cargo airline ICAO callsign prefixes
 CARGO_CALLSIGNS = {"FDX", "UPS", "DHK", "CLX", "GTI", "BOX", "PAC", "ATN", "ABX"}
 
+# Descriptive aircraft fields kept alongside the numeric track columns
+AIRCRAFT_ATTRS = {
+    "callsign": "",
+    "country": "---",
+    "altitude_m": 0,
+    "on_ground": False,
+    "speed_ms": 0,
+    "type": "PAX",
+    "squawk": "",
+}
+
+def new_aircraft_store() -> TrackStore:
+    return TrackStore(
+        "icao24",
+        attr_fields=AIRCRAFT_ATTRS,
+        output_names={"speed": "speed_kts", "altitude": "altitude_ft", "last_seen": None},
+        int_columns=("speed", "altitude", "heading")
+    )
+
 
 class OpenSkyService:
     def __init__(self, websocket_manager=None):
         self.ws_manager   = websocket_manager
         self._is_running  = False
-        self._cache: List[Dict] = []
+        self._cache: TrackStore = new_aircraft_store()
         self._last_update: float = 0
         self.daily_calls = 0  # Tracking for adaptive budget
         self.current_interval = POLL_INTERVAL
@@ -74,18 +96,17 @@ class OpenSkyService:
 
     async def get_flights(self) -> List[Dict]:
         """Returns cached flight list for REST endpoints. Refreshes if stale."""
-        import time
         if time.time() - self._last_update > self.current_interval or not self._cache:
             await self._fetch_and_update()
-        return self._cache
+        return self._cache.records()
 
     async def _poll_loop(self):
         while self._is_running:
             await self._fetch_and_update()
             
-            # Broadcast incremental diffs via WS Manager
+            # Broadcast incremental diffs via WS Manager (filtered per client viewport)
             if self.ws_manager and self._cache:
-                await self.ws_manager.broadcast_aircraft_data(self._cache[:300])
+                await self.ws_manager.broadcast_aircraft_data(self._cache)
             
             # Adaptive interval logic
             # Authenticated budget: 4000 calls/day. 
@@ -97,47 +118,56 @@ class OpenSkyService:
             await asyncio.sleep(self.current_interval)
 
     async def _fetch_and_update(self):
-        import time
         try:
-            async with httpx.AsyncClient(timeout=15, auth=self._auth) as client:
-                resp = await client.get(f"{BASE_URL}/states/all")
-                self.daily_calls += 1
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    states = data.get("states") or []
-                    self._cache = [self._normalize(s) for s in states if s[5] and s[6]]  # must have lon/lat
-                    self._last_update = time.time()
-                    logger.info(f"OpenSky: fetched {len(self._cache)} aircraft (Daily calls: {self.daily_calls})")
-                elif resp.status_code == 429:
-                    logger.warning("OpenSky: rate limited (429) — cooling down")
-                    self.current_interval = 300 # 5 min cooldown
-                else:
-                    logger.warning(f"OpenSky API error: {resp.status_code}")
+            resp = await get_client("opensky").get(f"{BASE_URL}/states/all", auth=self._auth)
+            self.daily_calls += 1
+            
+            if resp.status_code == 200:
+                data = resp.json()
+                states = data.get("states") or []
+                self._load_states(states)
+                self._last_update = time.time()
+                logger.info(f"OpenSky: fetched {len(self._cache)} aircraft (Daily calls: {self.daily_calls})")
+            elif resp.status_code == 429:
+                logger.warning("OpenSky: rate limited (429) — cooling down")
+                self.current_interval = 300 # 5 min cooldown
+            else:
+                logger.warning(f"OpenSky API error: {resp.status_code}")
         except Exception as e:
             logger.error(f"OpenSky fetch error: {e}")
 
-    def _normalize(self, s: list) -> Dict:
-        """Map raw state vector to a clean dict."""
-        callsign = (s[1] or "").strip()
-        icao = (s[0] or "").lower()
-        is_cargo = any(callsign.startswith(pfx) for pfx in CARGO_CALLSIGNS)
-
-        return {
-            "icao24":     icao,
-            "callsign":   callsign or icao.upper(),
-            "country":    s[2] or "---",
-            "lon":        round(s[5], 4) if s[5] else None,
-            "lat":        round(s[6], 4) if s[6] else None,
-            "altitude_m": round(s[7], 0) if s[7] else 0,
-            "altitude_ft": round((s[7] or 0) * 3.281),
-            "on_ground":  s[8] or False,
-            "speed_ms":   s[9] or 0,
-            "speed_kts":  round((s[9] or 0) * 1.944),
-            "heading":    round(s[10] or 0),
-            "type":       "CARGO" if is_cargo else "PAX",
-            "squawk":     s[14] or "",
-        }
+    def _load_states(self, states: list):
+        """Maps raw state vectors straight into the columnar cache (no per-aircraft dicts)."""
+        now = time.time()
+        ids, lat, lon, alt_ft, speed_kts, heading = [], [], [], [], [], []
+        attrs = {f: [] for f in AIRCRAFT_ATTRS}
+        for s in states:
+            if not (s[5] and s[6]):  # must have lon/lat
+                continue
+            callsign = (s[1] or "").strip()
+            icao = (s[0] or "").lower()
+            is_cargo = any(callsign.startswith(pfx) for pfx in CARGO_CALLSIGNS)
+
+            ids.append(icao)
+            lon.append(round(s[5], 4))
+            lat.append(round(s[6], 4))
+            alt_ft.append(round((s[7] or 0) * 3.281))
+            speed_kts.append(round((s[9] or 0) * 1.944))
+            heading.append(round(s[10] or 0))
+            attrs["callsign"].append(callsign or icao.upper())
+            attrs["country"].append(s[2] or "---")
+            attrs["altitude_m"].append(round(s[7], 0) if s[7] else 0)
+            attrs["on_ground"].append(s[8] or False)
+            attrs["speed_ms"].append(s[9] or 0)
+            attrs["type"].append("CARGO" if is_cargo else "PAX")
+            attrs["squawk"].append(s[14] or "")
+
+        self._cache.load(
+            ids,
+            {"lat": lat, "lon": lon, "altitude": alt_ft, "speed": speed_kts, "heading": heading,
+             "last_seen": [now] * len(ids)},
+            attrs
+        )
 
 
 # Singleton — instantiated by main.py / websocket_manager
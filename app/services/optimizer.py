@@ -0,0 +1,195 @@
+"""
+Parameter sweeps and walk-forward optimization of the regime-aware ensemble.
+Bars are fetched once per run, window-dependent indicators are precomputed once
+per distinct window, and candidates are evaluated in chunks on the process pool.
+"""
+import asyncio
+import inspect
+import itertools
+import logging
+import math
+import random
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from app.core import config
+from app.services.ml_engine import MarketAnalyzer
+from app.utils.regime_detector import RegimeDetector, WEIGHT_MATRIX
+from app.utils.backtest_kernels import (
+    DEFAULT_PARAMS, METRIC_NAMES, precompute_features, composite_signal,
+    strategy_returns, performance_metrics, evaluate_candidates, periods_per_year
+)
+from app.utils.process_pool import process_pool
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], Any]
+
+
+def build_candidates(param_grid: Dict[str, Sequence[float]], search: str = "grid",
+                     n_samples: int = 100, seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Expands a {param: [values]} grid into parameter sets (unswept params keep their defaults)."""
+    unknown = set(param_grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    names = list(param_grid)
+    values = [list(dict.fromkeys(param_grid[name])) for name in names]
+    if any(not v for v in values):
+        raise ValueError("Every swept parameter needs at least one value")
+
+    space = math.prod(len(v) for v in values)
+    if search == "grid":
+        combos = itertools.product(*values)
+        limit = space
+    elif search == "random":
+        # Sample distinct grid points; falls back to the full grid when it is smaller than n_samples
+        rng = random.Random(seed)
+        limit = min(n_samples, space)
+        picked = np.unravel_index(sorted(rng.sample(range(space), limit)), [len(v) for v in values])
+        combos = (tuple(v[int(i)] for v, i in zip(values, point)) for point in zip(*picked))
+    else:
+        raise ValueError(f"Unknown search mode: {search}")
+
+    if limit > config.OPTIMIZER_MAX_CANDIDATES:
+        raise ValueError(f"{limit} candidates exceeds the limit of {config.OPTIMIZER_MAX_CANDIDATES}")
+    return [{**DEFAULT_PARAMS, **dict(zip(names, combo))} for combo in combos]
+
+
+def walk_forward_windows(n: int, folds: int, anchored: bool = False) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """(train, test) bar ranges: the history is cut into folds + 1 segments and each test segment follows its train window."""
+    bounds = np.linspace(0, n, folds + 2).astype(int)
+    return [
+        ((0 if anchored else int(bounds[i]), int(bounds[i + 1])), (int(bounds[i + 1]), int(bounds[i + 2])))
+        for i in range(folds)
+    ]
+
+
+def _score(metrics: Dict[str, float], objective: str) -> float:
+    value = metrics.get(objective, float('nan'))
+    return value if value == value else float('-inf')  # NaN ranks last
+
+
+class Optimizer:
+    def __init__(self, initial_capital: float = 100000.0, commission: float = 0.0, slippage: float = 0.0001):
+        self.initial_capital = initial_capital
+        self.cost = commission + slippage
+        self.regime_detector = RegimeDetector()
+
+    async def _prepare(self, symbol: str, period: str, interval: str, param_grid: Dict[str, Sequence[float]]):
+        """Fetches bars once and builds the arrays every candidate shares."""
+        analyzer = MarketAnalyzer(symbol)
+        await analyzer.fetch_data(period=period, interval=interval)
+
+        def build():
+            analyzer.calculate_indicators()
+            codes = self.regime_detector.detect_regime_series(analyzer.data, window=100)
+            return analyzer.data.index, precompute_features(analyzer.data, WEIGHT_MATRIX[codes], param_grid)
+
+        return await asyncio.to_thread(build)
+
+    async def _evaluate(self, features: Dict[str, np.ndarray], candidates: List[Dict[str, float]],
+                        windows: List[Tuple[int, int]], annualization: float,
+                        progress: Optional[ProgressCallback]) -> List[List[Dict[str, float]]]:
+        """Evaluates candidates on the process pool in a few chunks per worker (features are pickled once per chunk)."""
+        n_chunks = max(min(len(candidates), process_pool.workers * 4), 1)
+        size = math.ceil(len(candidates) / n_chunks)
+        chunks = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+
+        async def run_chunk(index: int, chunk: List[Dict[str, float]]):
+            return index, await process_pool.run(
+                evaluate_candidates, features, chunk, windows, self.initial_capital, self.cost, annualization
+            )
+
+        results: List[Optional[list]] = [None] * len(chunks)
+        done = 0
+        for finished in asyncio.as_completed([run_chunk(i, c) for i, c in enumerate(chunks)]):
+            index, chunk_results = await finished
+            results[index] = chunk_results
+            done += len(chunk_results)
+            if progress is not None:
+                outcome = progress(done, len(candidates))
+                if inspect.isawaitable(outcome):
+                    await outcome
+        return [row for chunk_results in results for row in chunk_results]
+
+    async def run(
+        self,
+        symbol: str,
+        param_grid: Dict[str, Sequence[float]],
+        period: str = "1y",
+        interval: str = "1d",
+        search: str = "grid",
+        n_samples: int = 100,
+        objective: str = "sharpe_ratio",
+        folds: int = 0,
+        anchored: bool = False,
+        seed: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Sweeps param_grid. With folds > 0 runs walk-forward: each fold picks the best
+        candidate on its train window and scores it out-of-sample on the next segment.
+        """
+        if objective not in METRIC_NAMES:
+            raise ValueError(f"Unknown objective: {objective}")
+        candidates = build_candidates(param_grid, search, n_samples, seed)
+        param_names = list(DEFAULT_PARAMS)
+
+        # 1. Bars and shared indicator arrays, once
+        index, features = await self._prepare(symbol, period, interval, param_grid)
+        n = len(index)
+
+        # 2. Every candidate on the full history (sweep) or on every train window (walk-forward)
+        if folds > 0 and n // (folds + 1) < config.SMA_FAST:
+            raise ValueError(f"{n} bars is too short for {folds} walk-forward folds")
+        splits = walk_forward_windows(n, folds, anchored) if folds > 0 else []
+        windows = [train for train, _ in splits] if splits else [(0, n)]
+        annualization = periods_per_year(interval)
+        evaluated = await self._evaluate(features, candidates, windows, annualization, progress)
+
+        summary = {
+            "candidates": len(candidates),
+            "param_names": param_names,
+            "objective": objective,
+        }
+        if not splits:
+            best = max(range(len(candidates)), key=lambda i: _score(evaluated[i][0], objective))
+            summary.update({
+                "metric_names": list(METRIC_NAMES),
+                # One compact row per candidate: parameter values, then metric values
+                "results": [
+                    [candidates[i][p] for p in param_names] + [evaluated[i][0][m] for m in METRIC_NAMES]
+                    for i in range(len(candidates))
+                ],
+                "best": {"params": candidates[best], "metrics": evaluated[best][0]},
+                "folds": [],
+            })
+            return summary
+
+        # 3. Walk-forward: best per train window, scored on the following test window
+        def out_of_sample():
+            fold_rows, oos_returns = [], []
+            for k, (train, test) in enumerate(splits):
+                best = max(range(len(candidates)), key=lambda i: _score(evaluated[i][k], objective))
+                params = candidates[best]
+                returns = strategy_returns(features, composite_signal(features, params), test[0], test[1], self.cost)
+                oos_returns.append(returns)
+                fold_rows.append({
+                    "train": [str(index[train[0]]), str(index[train[1] - 1])],
+                    "test": [str(index[test[0]]), str(index[test[1] - 1])],
+                    "params": params,
+                    "train_metrics": evaluated[best][k],
+                    "test_metrics": performance_metrics(returns, self.initial_capital, annualization),
+                })
+            return fold_rows, performance_metrics(np.concatenate(oos_returns), self.initial_capital, annualization)
+
+        fold_rows, oos_metrics = await asyncio.to_thread(out_of_sample)
+        summary.update({
+            "metric_names": [f"fold{k}_{objective}" for k in range(len(splits))],
+            "results": [
+                [candidates[i][p] for p in param_names] + [evaluated[i][k][objective] for k in range(len(splits))]
+                for i in range(len(candidates))
+            ],
+            "best": {"params": fold_rows[-1]["params"], "metrics": oos_metrics},
+            "folds": fold_rows,
+        })
+        return summary
@@ -0,0 +1,125 @@
+"""
+Portfolio-level backtesting across a basket of symbols.
+Each symbol's regime-aware ensemble signal is aligned onto one time index as a
+(bars x assets) matrix; RiskEngine Kelly sizing, the exposure cap and the daily
+drawdown circuit breaker are then applied to whole matrices at once.
+"""
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from typing import List
+from app.services.backtester import VectorizedBacktester
+from app.services.risk_engine import RiskEngine
+from app.utils.backtest_kernels import performance_metrics, observed_periods_per_year
+
+logger = logging.getLogger(__name__)
+
+# Bars that stand for whole sessions: aligned on exchange-local calendar dates, not instants
+SESSION_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+
+def local_sessions(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Re-indexes daily-or-longer bars by their exchange-local date, so an NSE and a US bar
+    of the same session share one row (midnight IST and midnight New York are different UTC instants).
+    """
+    index = frame.index
+    if index.tz is not None:
+        index = index.tz_localize(None)  # Keeps the exchange wall-clock date
+    frame = frame.set_axis(index.normalize())
+    return frame[~frame.index.duplicated(keep="last")]
+
+
+class PortfolioBacktester:
+    def __init__(self, symbols: List[str], initial_capital=100000.0, commission=0.0, slippage=0.0001):
+        self.symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        self.initial_capital = initial_capital
+        self.cost = commission + slippage
+        self.risk_engine = RiskEngine(account_balance=initial_capital)
+
+    async def run(self, period="1y", interval="1d") -> dict:
+        # 1. Per-symbol signals, fetched concurrently
+        testers = [VectorizedBacktester(s, initial_capital=self.initial_capital) for s in self.symbols]
+        frames = await asyncio.gather(
+            *(t.generate_signals(period=period, interval=interval) for t in testers),
+            return_exceptions=True
+        )
+        signals, skipped = {}, []
+        for symbol, frame in zip(self.symbols, frames):
+            if isinstance(frame, Exception) or frame.empty:
+                logger.warning(f"Portfolio backtest: skipping {symbol} ({frame if isinstance(frame, Exception) else 'no data'})")
+                skipped.append(symbol)
+            else:
+                signals[symbol] = frame
+        if not signals:
+            raise ValueError("No data for any symbol in the portfolio")
+        return await asyncio.to_thread(self._simulate, signals, skipped, interval)
+
+    def _simulate(self, signals: dict, skipped: List[str], interval: str) -> dict:
+        symbols = list(signals)
+
+        # 2. Align on the union of bar timestamps: session bars by exchange-local date,
+        # intraday bars by instant (mixed exchange timezones end up in UTC);
+        # prices and signals carry forward over bars where an asset didn't trade
+        if interval in SESSION_INTERVALS:
+            signals = {s: local_sessions(f) for s, f in signals.items()}
+        close = pd.concat({s: f['Close'] for s, f in signals.items()}, axis=1, sort=True).ffill()
+        score = pd.concat({s: f['Composite_Score'] for s, f in signals.items()}, axis=1, sort=True).reindex(close.index).ffill().fillna(0)
+        signal = pd.concat({s: f['Signal'] for s, f in signals.items()}, axis=1, sort=True).reindex(close.index).ffill().fillna(0)
+        returns = close.pct_change().fillna(0).to_numpy()
+        index = close.index
+
+        # 3. Kelly sizing, with the prediction confidence as the Kelly scale
+        abs_score = np.abs(score.to_numpy())
+        confidence = np.where(abs_score >= 1.0, np.minimum(0.6 + abs_score * 0.1, 0.95), 0.0)
+        target = signal.to_numpy() * self.risk_engine.kelly_fractions(confidence)
+
+        # 4. Exposure cap: scale down bars whose gross exposure exceeds MAX_EXPOSURE_PCT
+        gross = np.abs(target).sum(axis=1)
+        scale = np.where(gross > self.risk_engine.MAX_EXPOSURE_PCT, self.risk_engine.MAX_EXPOSURE_PCT / np.where(gross > 0, gross, 1), 1.0)
+        target = target * scale[:, None]
+
+        # 5. Positions trade on the next bar (no lookahead)
+        weights = np.vstack([np.zeros((1, len(symbols))), target[:-1]])
+
+        # 6. Daily drawdown circuit breaker: after the bar where the day's P&L breaches
+        # MAX_DAILY_DRAWDOWN_PCT, the book is flat for the rest of that day.
+        # Returns up to the breach don't depend on the halt, so one pass finds every breach.
+        day = pd.Series(index.normalize(), index=index)
+        asset_returns = self._asset_returns(weights, returns)
+        day_return = pd.Series(1 + asset_returns.sum(axis=1), index=index).groupby(day).cumprod() - 1
+        breached = (day_return <= self.risk_engine.MAX_DAILY_DRAWDOWN_PCT).groupby(day).cummax()
+        halted = breached.groupby(day).shift(1, fill_value=False).to_numpy(dtype=bool)
+        if halted.any():
+            weights[halted] = 0.0
+            asset_returns = self._asset_returns(weights, returns)
+
+        # 7. Portfolio equity and per-asset attribution (first bar has no return)
+        portfolio_returns = asset_returns.sum(axis=1)[1:]
+        equity = self.initial_capital * np.cumprod(1 + portfolio_returns)
+        trades = np.count_nonzero(np.diff(weights, axis=0, prepend=0), axis=0)
+        attribution = {
+            symbol: {
+                "return_contribution": round(float(asset_returns[1:, i].sum()) * 100, 2),
+                "avg_exposure": round(float(np.abs(weights[:, i]).mean()) * 100, 2),
+                "trades": int(trades[i]),
+            }
+            for i, symbol in enumerate(symbols)
+        }
+
+        return {
+            "symbols": symbols,
+            "skipped": skipped,
+            # Annualized on the bars the aligned calendar really has (weekend crypto, extra sessions)
+            **performance_metrics(portfolio_returns, self.initial_capital, observed_periods_per_year(index, interval)),
+            "avg_gross_exposure": round(float(np.abs(weights).sum(axis=1).mean()) * 100, 2),
+            "halted_bars": int(halted.sum()),
+            "attribution": attribution,
+            "equity_curve": equity.tolist()
+        }
+
+    def _asset_returns(self, weights: np.ndarray, returns: np.ndarray) -> np.ndarray:
+        """Per-asset return contributions net of execution costs on weight changes."""
+        turnover = np.abs(np.diff(weights, axis=0, prepend=0))
+        return weights * returns - turnover * self.cost
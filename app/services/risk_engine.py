@@ -2,6 +2,13 @@ import numpy as np
 from app.core import config
 
 class RiskEngine:
+    KELLY_FRACTION = 0.25  # Fractional Kelly for safety
+    MAX_POSITION_PCT = 0.15  # Cap per position
+    MAX_DAILY_DRAWDOWN_PCT = -0.03  # Stop trading at 3% daily loss
+    MAX_EXPOSURE_PCT = 0.50  # Max 50% of balance exposed
+    MIN_STOP_PCT = 0.005  # 0.5% minimum stop distance
+    TAKE_PROFIT_RATIO = 1.5  # Take-profit distance per unit of stop distance
+
     def __init__(
         self, 
         account_balance=config.INITIAL_BALANCE, 
@@ -19,44 +26,48 @@ class RiskEngine:
         HFT Algo 5.1: Kelly Criterion
         f* = (bp - q) / b
         """
-        b = self.avg_win / self.avg_loss
-        p = self.win_rate
-        q = 1 - p
-        
-        kelly_f = (b * p - q) / b
-        
         # Apply fractional Kelly (0.25) for safety and scale by confidence
-        safe_f = max(0, kelly_f * 0.25 * confidence)
+        safe_f = max(0, self._kelly_f() * self.KELLY_FRACTION * confidence)
         
         # Cap at 15% of account
-        return min(safe_f, 0.15)
+        return min(safe_f, self.MAX_POSITION_PCT)
+
+    def kelly_fractions(self, confidence: np.ndarray) -> np.ndarray:
+        """calculate_kelly_size over an array of confidences (e.g. bars x assets)."""
+        return np.clip(self._kelly_f() * self.KELLY_FRACTION * np.asarray(confidence, dtype=float), 0, self.MAX_POSITION_PCT)
+
+    def _kelly_f(self) -> float:
+        b = self.avg_win / self.avg_loss
+        p = self.win_rate
+        q = 1 - p
+        return (b * p - q) / b
+
+    @staticmethod
+    def stop_multipliers(volatility_ratio) -> np.ndarray:
+        """ATR multiplier of the dynamic stop: wider in high volatility, tighter in low."""
+        ratio = np.asarray(volatility_ratio, dtype=float)
+        return np.where(ratio > 1.5, 2.5, np.where(ratio < 0.7, 1.5, 2.0))
 
     def calculate_dynamic_stops(self, entry_price, atr, side="BUY", volatility_ratio=1.0):
         """
         HFT Algo 5.2: Dynamic Stop Loss with Hard Floor Constraints
         """
-        # Hard floor for minimum stop distance to avoid noise-outs in low vol
-        MIN_STOP_PCT = 0.005 # 0.5% minimum stop distance
-        
         # Adjust multiplier based on volatility
-        multiplier = 2.0
-        if volatility_ratio > 1.5:
-            multiplier = 2.5
-        elif volatility_ratio < 0.7:
-            multiplier = 1.5
+        multiplier = float(self.stop_multipliers(volatility_ratio))
             
         calculated_stop_dist = atr * multiplier
-        min_stop_dist = entry_price * MIN_STOP_PCT
+        # Hard floor for minimum stop distance to avoid noise-outs in low vol
+        min_stop_dist = entry_price * self.MIN_STOP_PCT
         
         # Apply the absolute floor to stop distance
         effective_stop_dist = max(calculated_stop_dist, min_stop_dist)
             
         if side == "BUY":
             stop_loss = entry_price - effective_stop_dist
-            take_profit = entry_price + (effective_stop_dist * 1.5)
+            take_profit = entry_price + (effective_stop_dist * self.TAKE_PROFIT_RATIO)
         else:
             stop_loss = entry_price + effective_stop_dist
-            take_profit = entry_price - (effective_stop_dist * 1.5)
+            take_profit = entry_price - (effective_stop_dist * self.TAKE_PROFIT_RATIO)
             
         return {
             "stop_loss": round(stop_loss, 2),
@@ -87,16 +98,13 @@ class RiskEngine:
         Portfolio-level risk circuit breaker.
         Returns True if trading is ALLOWED, False if HALTED.
         """
-        MAX_DAILY_DRAWDOWN_PCT = -0.03 # Stop trading at 3% daily loss
-        MAX_EXPOSURE_PCT = 0.50 # Max 50% of balance exposed
-        
         # Check Daily Drawdown limit
         current_drawdown_pct = current_day_pnl / self.account_balance
-        if current_drawdown_pct <= MAX_DAILY_DRAWDOWN_PCT:
+        if current_drawdown_pct <= self.MAX_DAILY_DRAWDOWN_PCT:
             return False # Halt trading, hard stop hit
             
         # Check Max Exposure limit
-        if (open_exposure / self.account_balance) >= MAX_EXPOSURE_PCT:
+        if (open_exposure / self.account_balance) >= self.MAX_EXPOSURE_PCT:
             return False # Wait for positions to close
             
         return True
@@ -0,0 +1,308 @@
+"""
+Symbol catalog for typeahead search.
+Built once from the resolver's exchange listings (NSE, BSE, US, LSE, TSE)
+plus its explicit mappings (watchlist, indices, crypto): sorted arrays of
+symbols and name words answer prefix queries with a bisect, and a trigram
+index over the same text catches typos. Yahoo's search API is asked about
+queries with no prefix hit; its answers are cached and coalesced per query,
+and rank ahead of the catalog's fuzzy matches.
+"""
+import re
+import time
+import heapq
+import logging
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+from app.core import config
+from app.utils.frame_codec import encode_message
+from app.utils.http_pool import get_client
+from app.utils.single_flight import SingleFlight
+from app.services.cache import shared_cache
+from app.services.symbol_resolver import symbol_resolver, SymbolInfo
+
+logger = logging.getLogger(__name__)
+
+# /predict/symbols/{exchange} route key -> resolver exchange
+EXCHANGES = {"nse": "NSE", "bse": "BSE", "us": "US", "uk": "LSE", "japan": "TSE"}
+
+YAHOO_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+REMOTE_TYPES = {"EQUITY", "INDEX", "ETF", "CURRENCY", "CRYPTOCURRENCY"}
+
+_WORD = re.compile(r"[A-Z0-9&]+")
+
+# Display names for explicit mappings whose listings carry none (or that have no listing)
+MAPPED_NAMES = {
+    "AAPL": "Apple Inc.",
+    "AMZN": "Amazon.com, Inc.",
+    "BABA": "Alibaba Group Holding Limited",
+    "BTCUSDT": "Bitcoin",
+    "COST": "Costco Wholesale Corporation",
+    "ETHUSDT": "Ethereum",
+    "GOOGL": "Alphabet Inc.",
+    "HDFC": "HDFC Bank Limited",
+    "META": "Meta Platforms, Inc.",
+    "MSFT": "Microsoft Corporation",
+    "NFLX": "Netflix, Inc.",
+    "NVDA": "NVIDIA Corporation",
+    "QCOM": "Qualcomm Incorporated",
+    "SBUX": "Starbucks Corporation",
+    "SOLUSDT": "Solana",
+    "TSLA": "Tesla, Inc.",
+    "UBER": "Uber Technologies, Inc.",
+    "NIFTY 50": "Nifty 50",
+    "NIFTY": "Nifty 50",
+    "BANKNIFTY": "Nifty Bank",
+    "FINNIFTY": "Nifty Financial Services",
+    "SENSEX": "S&P BSE Sensex",
+    "DOW JONES": "Dow Jones Industrial Average",
+    "S&P 500": "S&P 500",
+}
+TYPE_DISP = {"EQUITY": "Equity", "INDEX": "Index", "CRYPTOCURRENCY": "Cryptocurrency"}
+
+
+def trigrams(text: str) -> set:
+    """Word trigrams, each word padded with a space on both sides."""
+    grams = set()
+    for word in _WORD.findall(text.upper()):
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _quote_type(info: SymbolInfo) -> str:
+    """Yahoo quoteType of an explicit mapping; ticker_mappings.json holds index aliases (NIFTY, FINNIFTY)."""
+    if info.exchange == "BINANCE":
+        return "CRYPTOCURRENCY"
+    if info.yf.startswith("^") or info.symbol in (symbol.upper() for symbol in config.TICKER_MAP):
+        return "INDEX"
+    return "EQUITY"
+
+
+def _result(info: SymbolInfo, name: str = "", quote_type: str = "EQUITY") -> dict:
+    """Same shape as the Yahoo search results the frontend already renders."""
+    return {
+        "symbol": info.yf,
+        "name": name or info.name or info.symbol,
+        "exchange": info.exchange,
+        "type": quote_type,
+        "typeDisp": TYPE_DISP[quote_type],
+    }
+
+
+def _name_suffixes(name: str) -> List[str]:
+    """Name from each word on: TOYOTA MOTOR CORPORATION, MOTOR CORPORATION, CORPORATION."""
+    words = _WORD.findall(name.upper())
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SymbolCatalog:
+    def __init__(self):
+        self._rows: List[dict] = []  # Pre-built search results, indexed by row id
+        self._symbol_keys: List[str] = []  # Sorted symbols / tickers
+        self._symbol_rows: List[int] = []
+        self._name_keys: List[str] = []  # Sorted name suffixes, one per word start
+        self._name_rows: List[int] = []
+        self._featured_keys: List[str] = []  # Sorted symbols and name suffixes of the explicit mappings, scanned first
+        self._featured_rows: List[int] = []
+        self._grams: Dict[str, List[int]] = {}  # trigram -> row ids
+        self._gram_counts: List[int] = []  # row id -> trigrams in its text
+        self._listings: Dict[str, bytes] = {}  # route exchange -> serialized listing
+        self._flight = SingleFlight()
+        self.remote_calls = 0
+        self.loaded = False
+
+    def load(self):
+        started = time.perf_counter()
+        rows, texts, symbol_pairs, name_pairs, featured_pairs = [], [], [], [], []
+        by_yf: Dict[str, int] = {}  # yfinance ticker -> row, so mappings merge into their listing
+        for exchange in EXCHANGES.values():
+            for info in symbol_resolver.listings(exchange):
+                row = len(rows)
+                rows.append(_result(info))
+                texts.append([info.symbol, info.name])
+                by_yf.setdefault(info.yf, row)
+                symbol_pairs.append((info.symbol, row))
+                if info.yf != info.symbol:
+                    symbol_pairs.append((info.yf, row))
+                name_pairs.extend((suffix, row) for suffix in _name_suffixes(info.name))
+
+        for info in symbol_resolver.mapped():
+            name = MAPPED_NAMES.get(info.symbol, info.name)
+            row = by_yf.get(info.yf)
+            if row is None:
+                row = by_yf[info.yf] = len(rows)
+                rows.append(_result(info, name, _quote_type(info)))
+                texts.append([])
+                symbol_pairs.append((info.yf, row))
+            elif not texts[row][1] and name:
+                rows[row]["name"] = name  # Listing row without a name (most of us_symbols.json)
+            texts[row] += [info.symbol, name]
+            symbol_pairs.append((info.symbol, row))
+            featured_pairs.append((info.symbol, row))
+            suffixes = _name_suffixes(name)
+            name_pairs.extend((suffix, row) for suffix in suffixes)
+            featured_pairs.extend((suffix, row) for suffix in suffixes)
+
+        grams, gram_counts = {}, []
+        for row, text in enumerate(texts):
+            row_grams = trigrams(" ".join(text))
+            gram_counts.append(len(row_grams))
+            for gram in row_grams:
+                grams.setdefault(gram, []).append(row)
+
+        symbol_pairs.sort()
+        name_pairs.sort()
+        featured_pairs.sort()
+        self._rows = rows
+        self._symbol_keys = [key for key, _ in symbol_pairs]
+        self._symbol_rows = [row for _, row in symbol_pairs]
+        self._name_keys = [key for key, _ in name_pairs]
+        self._name_rows = [row for _, row in name_pairs]
+        self._featured_keys = [key for key, _ in featured_pairs]
+        self._featured_rows = [row for _, row in featured_pairs]
+        self._grams = grams
+        self._gram_counts = gram_counts
+        self._listings = {}
+        self.loaded = True
+        logger.info(f"Symbol catalog: {len(rows)} listings indexed in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _ensure(self):
+        if not self.loaded:
+            self.load()
+
+    # --- Local search ---
+
+    @staticmethod
+    def _scan(keys: List[str], rows: List[int], prefix: str) -> Iterator[tuple]:
+        """(key, row) for every key starting with `prefix`, in sorted order."""
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i], rows[i]
+            i += 1
+
+    def _prefix(self, query: str, limit: int) -> List[int]:
+        """Exact symbol, then explicit mappings, then symbol prefix, then name / name-word prefix."""
+        hits: Dict[int, None] = {}
+        i = bisect_left(self._symbol_keys, query)
+        if i < len(self._symbol_keys) and self._symbol_keys[i] == query:
+            hits[self._symbol_rows[i]] = None
+        for scan in (self._scan(self._featured_keys, self._featured_rows, query),
+                     self._scan(self._symbol_keys, self._symbol_rows, query),
+                     self._scan(self._name_keys, self._name_rows, query)):
+            for _, row in scan:
+                if len(hits) >= limit:
+                    return list(hits)
+                hits.setdefault(row, None)
+        return list(hits)
+
+    def _fuzzy(self, query: str, limit: int, exclude: List[int]) -> List[int]:
+        """
+        Rows by trigram Jaccard similarity to the query, at least SEARCH_FUZZY_MIN_SCORE.
+        Dividing by the union keeps long names from matching on incidental shared grams.
+        """
+        query_grams = trigrams(query)
+        if len(query_grams) < 2:
+            return []
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._grams.get(gram, ()))
+        for row in exclude:
+            shared.pop(row, None)
+        gram_counts, size = self._gram_counts, len(query_grams)
+        candidates = []
+        for row, count in shared.items():
+            score = count / (size + gram_counts[row] - count)
+            if score >= config.SEARCH_FUZZY_MIN_SCORE:
+                candidates.append((-score, gram_counts[row], row))
+        return [row for _, _, row in heapq.nsmallest(limit, candidates)]
+
+    def _local(self, query: str, limit: int) -> tuple:
+        """(prefix rows, fuzzy rows) for a normalised query."""
+        rows = self._prefix(query, limit)
+        fuzzy = []
+        if len(rows) < limit and len(query) >= 3:
+            fuzzy = self._fuzzy(query, limit - len(rows), rows)
+        return rows, fuzzy
+
+    def search_local(self, query: str, limit: int = config.SEARCH_MAX_RESULTS) -> List[dict]:
+        """Catalog matches only; never leaves the process."""
+        self._ensure()
+        query = " ".join(query.upper().split())
+        if not query:
+            return []
+        prefix, fuzzy = self._local(query, limit)
+        return [self._rows[row] for row in prefix + fuzzy]
+
+    # --- Yahoo fallback ---
+
+    async def _fetch_remote(self, query: str) -> List[dict]:
+        self.remote_calls += 1
+        try:
+            response = await get_client("yahoo").get(YAHOO_SEARCH_URL, params={"q": query})
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            logger.error(f"Yahoo search fallback failed for '{query}': {e}")
+            return []
+        results = [
+            {
+                "symbol": item.get("symbol"),
+                "name": item.get("shortname") or item.get("longname"),
+                "exchange": item.get("exchange"),
+                "type": item.get("quoteType"),
+                "typeDisp": item.get("typeDisp"),
+            }
+            for item in data.get("quotes", []) if item.get("quoteType") in REMOTE_TYPES
+        ]
+        await shared_cache.set(f"search:{query}", results, config.CACHE_TTL_SEARCH)
+        return results
+
+    async def search_remote(self, query: str) -> List[dict]:
+        query = " ".join(query.upper().split())
+        cached = await shared_cache.get(f"search:{query}")
+        if cached is not None:
+            return cached
+        return await self._flight.do(query, lambda: self._fetch_remote(query))
+
+    async def search(self, query: str, limit: int = config.SEARCH_MAX_RESULTS) -> List[dict]:
+        """Prefix matches stay local; otherwise Yahoo (cached) results, then the catalog's fuzzy matches."""
+        self._ensure()
+        query = " ".join(query.upper().split())
+        if not query:
+            return []
+        prefix, fuzzy = self._local(query, limit)
+        if prefix:
+            return [self._rows[row] for row in prefix + fuzzy]
+        results: Dict[str, dict] = {}
+        for result in [*(await self.search_remote(query)), *(self._rows[row] for row in fuzzy)]:
+            results.setdefault(result["symbol"], result)
+        return list(results.values())[:limit]
+
+    # --- Listings ---
+
+    def listing_body(self, exchange: str) -> Optional[bytes]:
+        """Serialized listing of one exchange (route key: nse / bse / us / uk / japan); None if unsupported."""
+        exchange = exchange.lower()
+        if exchange not in EXCHANGES:
+            return None
+        body = self._listings.get(exchange)
+        if body is None:
+            rows = [
+                {"symbol": info.symbol, "name": info.name, "sector": info.sector}
+                for info in symbol_resolver.listings(EXCHANGES[exchange])
+            ]
+            body = self._listings[exchange] = encode_message(rows).encode()
+        return body
+
+    def stats(self) -> dict:
+        return {
+            "listings": len(self._rows),
+            "keys": len(self._symbol_keys) + len(self._name_keys),
+            "trigrams": len(self._grams),
+            "remote_calls": self.remote_calls,
+        }
+
+
+# Global instance
+symbol_catalog = SymbolCatalog()
@@ -0,0 +1,258 @@
+"""
+Symbol resolution.
+One hashed index, built once from the exchange listings (data/*_symbols.json),
+ticker_mappings.json and the house watchlist, maps a platform symbol to its
+yfinance ticker, Finnhub symbol, exchange and currency, and maps yfinance or
+Finnhub symbols back, in O(1) per lookup. Symbols outside the listings fall
+back to the suffix rules every call site used to apply on its own, and the
+result is memoised.
+"""
+import os
+import re
+import json
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# Canonical symbol → yfinance ticker mapping
+AXIOM_WATCHLIST = {
+    "AAPL": "AAPL",
+    "AMZN": "AMZN",
+    "BABA": "BABA",
+    "BTCUSDT": "BTC-USD",
+    "COST": "COST",
+    "ETHUSDT": "ETH-USD",
+    "GOOGL": "GOOG",
+    "HDFC": "HDFCBANK.NS",
+    "INFY": "INFY.NS",
+    "META": "META",
+    "MSFT": "MSFT",
+    "NFLX": "NFLX",
+    "NVDA": "NVDA",
+    "ONGC": "ONGC.NS",
+    "QCOM": "QCOM",
+    "RELIANCE": "RELIANCE.NS",
+    "SBUX": "SBUX",
+    "SOLUSDT": "SOL-USD",
+    "TCS": "TCS.NS",
+    "TSLA": "TSLA",
+    "UBER": "UBER",
+    "WIPRO": "WIPRO.NS",
+    "NIFTY 50": "^NSEI",
+    "SENSEX": "^BSESN",
+    "DOW JONES": "^DJI",
+    "S&P 500": "^GSPC",
+}
+
+# Listing file -> (exchange, currency, yfinance suffix added to bare listing symbols)
+LISTINGS = {
+    "nse_symbols.json": ("NSE", "INR", ".NS"),
+    "bse_symbols.json": ("BSE", "INR", ""),
+    "us_symbols.json": ("US", "USD", ""),
+    "uk_symbols.json": ("LSE", "GBP", ""),
+    "japan_symbols.json": ("TSE", "JPY", ""),
+}
+
+# yfinance suffix -> (exchange, currency), for tickers outside the listings
+SUFFIXES = {
+    ".NS": ("NSE", "INR"),
+    ".BO": ("BSE", "INR"),
+    ".L": ("LSE", "GBP"),
+    ".T": ("TSE", "JPY"),
+}
+INDEX_MARKETS = {
+    "^NSEI": ("NSE", "INR"),
+    "^NSEBANK": ("NSE", "INR"),
+    "^BSESN": ("BSE", "INR"),
+}
+TICKER_PATTERN = re.compile(r"[0-9A-Z&^.-]+")
+CRYPTO_QUOTE = "USDT"  # Binance pairs stream from Finnhub as BINANCE:<BASE>USDT
+MEMO_MAX = 50000  # Fallback resolutions remembered
+
+
+class SymbolInfo(NamedTuple):
+    symbol: str  # Canonical platform symbol
+    yf: str  # yfinance ticker
+    finnhub: str  # Finnhub stream symbol
+    exchange: str
+    currency: str
+    name: str = ""
+    sector: str = ""
+
+
+def _market_of(ticker: str) -> tuple:
+    if ticker in INDEX_MARKETS:
+        return INDEX_MARKETS[ticker]
+    if ticker.endswith("-USD"):
+        return "BINANCE", CRYPTO_QUOTE
+    for suffix, market in SUFFIXES.items():
+        if ticker.endswith(suffix):
+            return market
+    return "US", "USD"
+
+
+def _mapped(symbol: str, ticker: str, name: str = "") -> SymbolInfo:
+    """Entry for an explicit symbol -> ticker mapping (watchlist / ticker_mappings.json)."""
+    exchange, currency = _market_of(ticker)
+    if exchange == "BINANCE":
+        finnhub = f"BINANCE:{symbol}"
+    elif exchange == "US" and TICKER_PATTERN.fullmatch(symbol) and not symbol.startswith("^"):
+        finnhub = symbol  # US share classes stream under the exchange ticker (GOOGL, not yfinance's GOOG)
+    else:
+        finnhub = ticker
+    return SymbolInfo(symbol, ticker, finnhub, exchange, currency, name)
+
+
+def fallback(symbol: str) -> SymbolInfo:
+    """Rules for symbols outside the index: <BASE>USDT is a Binance pair, bare names default to DEFAULT_TICKER_SUFFIX."""
+    if symbol.endswith(CRYPTO_QUOTE) and len(symbol) > len(CRYPTO_QUOTE):
+        return _mapped(symbol, f"{symbol[:-len(CRYPTO_QUOTE)]}-USD")
+    if symbol.startswith("BINANCE:"):
+        return fallback(symbol.split(":", 1)[1])
+    if any(c in symbol for c in ".^=-"):
+        return _mapped(symbol, symbol)
+    return _mapped(symbol, f"{symbol}{config.DEFAULT_TICKER_SUFFIX}")
+
+
+class SymbolResolver:
+    def __init__(self, data_dir: str = config.SYMBOL_DATA_DIR):
+        self.data_dir = data_dir
+        self._by_symbol: Dict[str, SymbolInfo] = {}
+        self._by_yf: Dict[str, SymbolInfo] = {}
+        self._by_finnhub: Dict[str, SymbolInfo] = {}
+        self._memo: Dict[str, SymbolInfo] = {}
+        self._mapped: Dict[str, SymbolInfo] = {}  # Explicit mappings (watchlist, ticker_mappings.json) by symbol
+        self._listings: Dict[str, List[SymbolInfo]] = {}  # exchange -> listing rows, in file order
+        self.loaded = False
+
+    def _add(self, info: SymbolInfo, override: bool = False):
+        # First registration wins unless overriding, so explicit mappings beat listings
+        # and the default market (NSE) beats other listings for bare names
+        if override:
+            self._by_symbol[info.symbol] = self._by_yf[info.yf] = self._by_finnhub[info.finnhub] = info
+            return
+        self._by_symbol.setdefault(info.symbol, info)
+        self._by_yf.setdefault(info.yf, info)
+        self._by_finnhub.setdefault(info.finnhub, info)
+
+    def _read_listing(self, filename: str) -> List[SymbolInfo]:
+        path = os.path.join(self.data_dir, filename)
+        if not os.path.exists(path):
+            return []
+        exchange, currency, suffix = LISTINGS[filename]
+        try:
+            with open(path, "r") as f:
+                rows = json.load(f)
+        except Exception as e:
+            logger.error(f"Symbol resolver: failed to read {filename}: {e}")
+            return []
+        infos = []
+        for row in rows:
+            symbol = str(row.get("symbol") or "").strip()
+            name = str(row.get("name") or "").strip()
+            # The Japan listing carries the ticker in "name" and the company in "symbol"
+            if name and TICKER_PATTERN.fullmatch(name) and not TICKER_PATTERN.fullmatch(symbol):
+                symbol, name = name, symbol.rsplit(".", 1)[0]
+            symbol = symbol.upper()
+            if not symbol:
+                continue
+            ticker = f"{symbol}{suffix}"
+            infos.append(SymbolInfo(symbol, ticker, ticker, exchange, currency, name, str(row.get("sector") or "")))
+        return infos
+
+    def load(self):
+        """Builds the index. Explicit mappings first, then listings in LISTINGS order."""
+        self._by_symbol.clear()
+        self._by_yf.clear()
+        self._by_finnhub.clear()
+        self._memo.clear()
+        self._mapped = {}
+        self._listings = {}
+
+        for symbol, ticker in AXIOM_WATCHLIST.items():
+            self._add(_mapped(symbol, ticker))
+        for symbol, ticker in config.TICKER_MAP.items():
+            self._add(_mapped(symbol.upper(), ticker))
+        mapped_symbols = [*AXIOM_WATCHLIST, *(symbol.upper() for symbol in config.TICKER_MAP)]
+        for filename, (exchange, _, _) in LISTINGS.items():
+            infos = self._read_listing(filename)
+            self._listings[exchange] = infos
+            for info in infos:
+                # Watchlist names (e.g. INFY -> INFY.NS) keep their mapping but pick up listing details
+                mapped = self._by_symbol.get(info.symbol)
+                if mapped is not None and mapped.yf == info.yf and not mapped.name:
+                    self._add(info, override=True)
+                else:
+                    self._add(info)
+        # After the listings, so mappings carry the listing details they picked up
+        self._mapped = {symbol: self._by_symbol[symbol] for symbol in mapped_symbols}
+        self.loaded = True
+        logger.info(f"Symbol resolver: {len(self._by_symbol)} symbols, {len(self._by_yf)} tickers indexed")
+
+    def _ensure(self):
+        if not self.loaded:
+            self.load()
+
+    # --- Lookups ---
+
+    def resolve(self, symbol: str) -> SymbolInfo:
+        """Info for a platform symbol, yfinance ticker or Finnhub symbol (rule-based if unknown)."""
+        self._ensure()
+        key = symbol.strip().upper()
+        info = self._by_symbol.get(key) or self._by_yf.get(key) or self._by_finnhub.get(key) or self._memo.get(key)
+        if info is None:
+            info = fallback(key)
+            if len(self._memo) < MEMO_MAX:
+                self._memo[key] = info
+        return info
+
+    def lookup(self, symbol: str) -> Optional[SymbolInfo]:
+        """Indexed symbols only: None instead of a rule-based guess."""
+        self._ensure()
+        key = symbol.strip().upper()
+        return self._by_symbol.get(key) or self._by_yf.get(key) or self._by_finnhub.get(key)
+
+    def mapping(self, symbol: str) -> Optional[SymbolInfo]:
+        """Explicit mapping of a symbol (watchlist / ticker_mappings.json); None for listings and guesses."""
+        self._ensure()
+        return self._mapped.get(symbol.strip().upper())
+
+    def yf_ticker(self, symbol: str) -> str:
+        return self.resolve(symbol).yf
+
+    def finnhub_symbol(self, symbol: str) -> str:
+        return self.resolve(symbol).finnhub
+
+    def from_finnhub(self, finnhub_symbol: str) -> SymbolInfo:
+        """Info for a symbol as it appears on the Finnhub stream."""
+        self._ensure()
+        return self._by_finnhub.get(finnhub_symbol) or self.resolve(finnhub_symbol)
+
+    # --- Batch ---
+
+    def resolve_many(self, symbols: Iterable[str]) -> Dict[str, SymbolInfo]:
+        """{input symbol: info}, one hash lookup per distinct symbol."""
+        return {symbol: self.resolve(symbol) for symbol in dict.fromkeys(symbols)}
+
+    def yf_tickers(self, symbols: Iterable[str]) -> Dict[str, str]:
+        """{input symbol: yfinance ticker}."""
+        return {symbol: info.yf for symbol, info in self.resolve_many(symbols).items()}
+
+    def mapped(self) -> List[SymbolInfo]:
+        """Explicit mappings (watchlist, ticker_mappings.json): indices and crypto the listings don't carry."""
+        self._ensure()
+        return list(self._mapped.values())
+
+    def listings(self, exchange: str) -> List[SymbolInfo]:
+        """Listing rows of one exchange (NSE / BSE / US / LSE / TSE)."""
+        self._ensure()
+        return self._listings.get(exchange.upper(), [])
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._by_symbol), "tickers": len(self._by_yf), "memoised": len(self._memo)}
+
+
+# Global instance
+symbol_resolver = SymbolResolver()
@@ -1,6 +1,8 @@
 from app.db import models, recovery
 from app.core import config
 from app.services.execution_engine import ExecutionEngine
+from app.utils.blocking_executor import blocking_executor
+from app.services.symbol_resolver import symbol_resolver
 from datetime import datetime, timezone
 from app.core.constants import OrderSide, OrderStatus
 import logging
@@ -78,13 +80,9 @@ class TradingManager:
         # 1. Fetch current price if not provided
         if not current_price:
             import yfinance as yf
-            search_symbol = trade.symbol.upper()
-            if search_symbol == "NIFTY": search_symbol = "^NSEI"
-            elif search_symbol == "BANKNIFTY": search_symbol = "^NSEBANK"
-            else: search_symbol = f"{search_symbol}.NS"
-            
-            ticker = yf.Ticker(search_symbol)
-            current_price = ticker.history(period="1d")['Close'].iloc[-1]
+            ticker = yf.Ticker(symbol_resolver.yf_ticker(trade.symbol))
+            history = await blocking_executor.run("yfinance", ticker.history, period="1d")
+            current_price = history['Close'].iloc[-1]
 
         # 2. Route via SOR (Simulation)
         exit_side = OrderSide.SELL if trade.side == OrderSide.BUY else OrderSide.BUY
@@ -4,14 +4,121 @@ import logging
 import websockets
 import os
 import ssl
-from typing import Dict, Set, Any
+from typing import Dict, Set, Any, Optional
 from dotenv import load_dotenv
 from fastapi import WebSocket, WebSocketDisconnect
+from app.core import config
+from app.utils.frame_codec import Frame, ENCODING_JSON
+from app.utils.spatial_index import Viewport, select_in_viewport
+from app.utils.track_store import TrackStore
+from app.services.market_snapshot import market_snapshot
+from app.services.symbol_resolver import symbol_resolver
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Queue overflow policies for slow terminals
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+
+# Trade delivery modes: coalesced EQUITY_BATCH frames or the full EQUITY tape
+TRADE_MODE_BATCH = "batch"
+TRADE_MODE_RAW = "raw"
+
+# Topic routing: per-symbol equity topics plus one channel per geospatial feed
+TOPIC_VESSELS = "VESSELS"
+TOPIC_AIRCRAFT = "AIRCRAFT"
+TOPIC_MACRO = "MACRO"  # Yields / FX / commodities / crypto panels
+EQUITY_TOPIC_PREFIX = "EQUITY:"
+BACKTEST_TOPIC_PREFIX = "BACKTEST:"  # Progress of one backtest job
+
+# Per-column movement thresholds below which an object is not re-sent
+VESSEL_DIFF_THRESHOLDS = {"lat": 1e-4, "lon": 1e-4, "speed": 0.0}  # ~10m, or any speed change
+AIRCRAFT_DIFF_THRESHOLDS = {"lat": 1e-3, "lon": 1e-3, "altitude": 100}  # looser, they move faster
+
+# Geo channel -> (diff frame type, snapshot payload key)
+GEO_FEEDS = {
+    TOPIC_VESSELS: ("VESSEL_DIFF", "vessels"),
+    TOPIC_AIRCRAFT: ("AIRCRAFT_DIFF", "aircraft"),
+}
+
+def equity_topic(symbol: str) -> str:
+    """Topic of a symbol under its canonical name, so aliases (BTC-USD / BTCUSDT, INFY.NS / INFY) share one topic."""
+    return f"{EQUITY_TOPIC_PREFIX}{symbol_resolver.resolve(symbol).symbol}"
+
+def backtest_topic(job_id: str) -> str:
+    return f"{BACKTEST_TOPIC_PREFIX}{job_id}"
+
+class ClientConnection:
+    """
+    Outbound side of a single terminal socket.
+    Frames are queued by the hub and drained by a dedicated writer task,
+    so a slow link only ever backs up its own queue.
+    """
+    def __init__(self, websocket: WebSocket, manager: "WebSocketManager",
+                 encoding: str = ENCODING_JSON,
+                 trade_mode: str = TRADE_MODE_BATCH,
+                 user_id: Optional[str] = None,
+                 queue_size: int = config.WS_SEND_QUEUE_SIZE,
+                 overflow_policy: str = config.WS_OVERFLOW_POLICY):
+        self.websocket = websocket
+        self.manager = manager
+        self.encoding = encoding
+        self.trade_mode = trade_mode
+        self.user_id = user_id
+        self.topics: Set[str] = set()
+        self.viewport: Optional[Viewport] = None # None = shared default world view
+        self.visible: Dict[str, Set[str]] = {} # geo topic -> ids this client currently holds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflow_policy = overflow_policy
+        self.dropped_frames = 0
+        self.closed = False
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self):
+        self.closed = True
+        if self._writer and not self._writer.done() and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def enqueue(self, frame: Frame) -> bool:
+        """Non-blocking enqueue. Returns False if the client must be dropped."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            if self.overflow_policy != OVERFLOW_DROP_OLDEST:
+                return False
+            # Stale market frames are worthless to a live terminal: shed the oldest
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.dropped_frames += 1
+            self.queue.put_nowait(frame)
+            return True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                # Encoded once per wire format and shared across all clients
+                data = frame.encode(self.encoding)
+                if isinstance(data, bytes):
+                    await self.websocket.send_bytes(data)
+                else:
+                    await self.websocket.send_text(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Client writer failed, dropping client: {e}")
+            self.manager.disconnect_client(self.websocket)
+
 class WebSocketManager:
     """
     Central Hub (Hub-and-Spoke)
@@ -20,10 +127,11 @@ class WebSocketManager:
     """
     def __init__(self):
         self.finnhub_key = os.getenv("FINNHUB_API_KEY")
-        self.active_clients: Set[WebSocket] = set()
+        self.active_clients: Dict[WebSocket, ClientConnection] = {}
         self.connections: Dict[str, Any] = {}
-        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
-        self.active_symbols: Set[str] = set() # Currently subscribed Finnhub symbols
+        self.active_symbols: Set[str] = set() # Canonical symbols with a live upstream subscription
+        self.upstream_symbols: Dict[str, Set[str]] = {} # Finnhub symbol -> subscribed canonical symbols (its ref-count)
+        self.topic_clients: Dict[str, Set[ClientConnection]] = {} # topic -> interested clients
         self._is_running = False
         
         # Lazy import to avoid circular dependency
@@ -31,8 +139,12 @@ class WebSocketManager:
         self.opensky_service = None
         
         # v3.0 Diff States
-        self.last_vessel_state: Dict[str, Dict] = {} # mmsi -> data
-        self.last_aircraft_state: Dict[str, Dict] = {} # callsign -> data
+        self.last_vessel_state = TrackStore("mmsi") # columnar mirror of the last broadcast
+        self.last_aircraft_state = TrackStore("icao24")
+        self.default_viewport = Viewport.world()
+        # Default-viewport snapshots, rebuilt only when state changes: channels -> (frame, selections)
+        self._snapshot_frames: Dict[frozenset, tuple] = {}
+        self._trade_batches: Dict[str, Dict] = {} # symbol -> trades aggregated in the current window
 
     async def start(self):
         if self._is_running:
@@ -41,6 +153,7 @@ class WebSocketManager:
         
         # Start Upstream Fetchers
         asyncio.create_task(self._finnhub_loop())
+        asyncio.create_task(self._trade_flush_loop())
         
         from app.services.ais_service import AISService
         from app.services.opensky_service import OpenSkyService
@@ -59,164 +172,370 @@ class WebSocketManager:
         if self.opensky_service: await self.opensky_service.stop()
         for ws in self.connections.values():
             if ws and hasattr(ws, 'close'): await ws.close()
+        for client in list(self.active_clients.values()):
+            client.stop()
+        self.active_clients.clear()
         logger.info("Axiom WebSocket Hub stopped.")
 
     # --- Client Management ---
-    async def connect_client(self, websocket: WebSocket):
+    async def connect_client(self, websocket: WebSocket, encoding: str = ENCODING_JSON,
+                             trade_mode: str = TRADE_MODE_BATCH, user_id: Optional[str] = None,
+                             topics: Optional[list] = None):
         await websocket.accept()
-        self.active_clients.add(websocket)
-        logger.info(f"Client connected. Active: {len(self.active_clients)}")
+        if trade_mode not in (TRADE_MODE_BATCH, TRADE_MODE_RAW):
+            trade_mode = TRADE_MODE_BATCH
+        client = ClientConnection(websocket, self, encoding=encoding, trade_mode=trade_mode, user_id=user_id)
+        self.active_clients[websocket] = client
+        client.start()
+        logger.info(f"Client connected. Active: {len(self.active_clients)} ({encoding})")
+        
+        for topic in topics or []:
+            await self._add_topic(client, topic)
         
         # Send initial snapshots if data exists
-        if self.last_vessel_state or self.last_aircraft_state:
-            snapshot = {
+        snapshot = self._snapshot_for(client, client.topics)
+        if snapshot:
+            client.enqueue(snapshot)
+
+    def _geo_state(self, topic: str) -> TrackStore:
+        if topic == TOPIC_VESSELS:
+            return self.last_vessel_state
+        return self.last_aircraft_state
+
+    def _snapshot_for(self, client: ClientConnection, topics: Set[str]) -> Optional[Frame]:
+        """
+        SNAPSHOT of the client's viewport for the given geo channels.
+        Default-viewport clients share one cached frame, so a reconnect storm costs one build and one encode.
+        """
+        channels = frozenset(t for t in topics if t in GEO_FEEDS and len(self._geo_state(t)))
+        if not channels:
+            return None
+        
+        cached = self._snapshot_frames.get(channels) if client.viewport is None else None
+        if cached is None:
+            viewport = client.viewport or self.default_viewport
+            payload, selections = {}, {}
+            for topic in channels:
+                store = self._geo_state(topic)
+                selected = select_in_viewport(store, viewport)
+                selections[topic] = selected
+                payload[GEO_FEEDS[topic][1]] = store.records(store.rows_for(selected))
+            cached = (Frame({
                 "type": "SNAPSHOT",
-                "payload": {
-                    "vessels": list(self.last_vessel_state.values()),
-                    "aircraft": list(self.last_aircraft_state.values())
-                },
+                "payload": payload,
                 "timestamp": asyncio.get_event_loop().time()
-            }
-            try:
-                await websocket.send_text(json.dumps(snapshot))
-            except Exception as e:
-                logger.error(f"Failed to send initial snapshot: {e}")
+            }), selections)
+            if client.viewport is None:
+                self._snapshot_frames[channels] = cached
+        
+        frame, selections = cached
+        client.visible.update(selections)
+        return frame
+
+    def set_viewport(self, websocket: WebSocket, viewport: Viewport):
+        """Moves a client's map window and sends only what entered or left it."""
+        client = self.active_clients.get(websocket)
+        if not client:
+            return
+        client.viewport = viewport
+        for topic in GEO_FEEDS:
+            if topic not in client.topics:
+                continue
+            store = self._geo_state(topic)
+            prev = client.visible.get(topic, set())
+            selected = select_in_viewport(store, viewport)
+            client.visible[topic] = selected
+            frame = self._geo_diff_frame(GEO_FEEDS[topic][0], store, prev, selected, set())
+            if frame:
+                self._fanout(frame, [client])
+
+    def set_trade_mode(self, websocket: WebSocket, mode: str):
+        """Switches a client between coalesced batches and the full trade tape."""
+        client = self.active_clients.get(websocket)
+        if client and mode in (TRADE_MODE_BATCH, TRADE_MODE_RAW):
+            client.trade_mode = mode
 
     def disconnect_client(self, websocket: WebSocket):
-        self.active_clients.remove(websocket)
+        client = self.active_clients.pop(websocket, None)
+        if client is None:
+            return
+        client.stop()
+        for topic in list(client.topics):
+            self._remove_topic(client, topic)
         logger.info(f"Client disconnected. Active: {len(self.active_clients)}")
 
-    async def broadcast_to_clients(self, message: dict):
-        """Unified broadcast to all connected AXIOM terminals."""
-        if not self.active_clients:
+    # --- Topic Routing ---
+    async def subscribe(self, websocket: WebSocket, topics: list) -> list:
+        """
+        Adds topics to a client; geo channels get an immediate snapshot of that channel.
+        Returns the equity topics refused because the client is at WS_MAX_SYMBOLS_PER_CLIENT.
+        """
+        client = self.active_clients.get(websocket)
+        if not client:
+            return []
+        added, rejected = set(), []
+        for topic in topics:
+            if topic in client.topics:
+                continue
+            if await self._add_topic(client, topic):
+                added.add(topic)
+            else:
+                rejected.append(topic)
+        snapshot = self._snapshot_for(client, added)
+        if snapshot:
+            client.enqueue(snapshot)
+        return rejected
+
+    def unsubscribe(self, websocket: WebSocket, topics: list):
+        client = self.active_clients.get(websocket)
+        if not client:
+            return
+        for topic in topics:
+            self._remove_topic(client, topic)
+
+    async def subscribe_user(self, user_id: str, symbol: str):
+        """Watchlist add: route the symbol to every live terminal of that user."""
+        for client in list(self.active_clients.values()):
+            if client.user_id == user_id:
+                await self._add_topic(client, equity_topic(symbol))
+
+    def unsubscribe_user(self, user_id: str, symbol: str):
+        for client in list(self.active_clients.values()):
+            if client.user_id == user_id:
+                self._remove_topic(client, equity_topic(symbol))
+
+    async def _add_topic(self, client: ClientConnection, topic: str) -> bool:
+        """Returns False (topic not added) when an equity topic would exceed WS_MAX_SYMBOLS_PER_CLIENT."""
+        if topic.startswith(EQUITY_TOPIC_PREFIX) and topic not in client.topics:
+            held = sum(1 for t in client.topics if t.startswith(EQUITY_TOPIC_PREFIX))
+            if held >= config.WS_MAX_SYMBOLS_PER_CLIENT:
+                return False
+        client.topics.add(topic)
+        interested = self.topic_clients.setdefault(topic, set())
+        first = not interested
+        interested.add(client)
+        # Upstream subscriptions are reference-counted by the topic's client set
+        if first and topic.startswith(EQUITY_TOPIC_PREFIX):
+            await self.subscribe_to_symbol(topic[len(EQUITY_TOPIC_PREFIX):])
+        return True
+
+    def _remove_topic(self, client: ClientConnection, topic: str):
+        client.topics.discard(topic)
+        client.visible.pop(topic, None)
+        interested = self.topic_clients.get(topic)
+        if interested is None:
+            return
+        interested.discard(client)
+        if not interested:
+            del self.topic_clients[topic]
+            if topic.startswith(EQUITY_TOPIC_PREFIX):
+                asyncio.create_task(self.unsubscribe_from_symbol(topic[len(EQUITY_TOPIC_PREFIX):]))
+
+    def _clients_for(self, topic: str) -> list:
+        return list(self.topic_clients.get(topic, ()))
+
+    def _evict_slow_client(self, websocket: WebSocket):
+        """Overflow policy 'disconnect': drop the client and close its socket in the background."""
+        client = self.active_clients.get(websocket)
+        dropped = client.queue.qsize() if client else 0
+        self.disconnect_client(websocket)
+        logger.warning(f"Disconnecting slow client ({dropped} frames backlogged)")
+        asyncio.create_task(self._close_quietly(websocket, code=1013))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def broadcast_to_clients(self, message: dict, topic: Optional[str] = None):
+        """
+        Broadcast to the terminals subscribed to `topic` (all terminals if None).
+        Enqueue-only: never awaits the network, so one slow socket cannot stall the feeds.
+        """
+        clients = self._clients_for(topic) if topic else list(self.active_clients.values())
+        if not clients:
             return
         
-        # Normalize and serialize
-        payload = json.dumps(message)
-        disconnected = set()
-        
-        for client in self.active_clients:
-            try:
-                await client.send_text(payload)
-            except Exception:
-                disconnected.add(client)
-        
-        for client in disconnected:
-            self.disconnect_client(client)
+        # Wrapped once; each wire encoding is produced lazily by the first writer that needs it
+        self._fanout(Frame(message), clients)
+
+    def send_frame(self, websocket: WebSocket, frame: Frame):
+        """Queues a frame for one terminal (e.g. a snapshot on subscribe)."""
+        client = self.active_clients.get(websocket)
+        if client:
+            self._fanout(frame, [client])
+
+    def _fanout(self, frame: Frame, clients: list):
+        for client in clients:
+            if not client.enqueue(frame):
+                self._evict_slow_client(client.websocket)
 
     # --- Upstream Normalization & Broadcasting ---
     
 
-    async def broadcast_vessel_data(self, current: list):
+    async def broadcast_vessel_data(self, current: TrackStore):
         """Broadcasts only the changed/new vessels (diff) to save bandwidth."""
-        current_map = {v['mmsi']: v for v in current}
-        
-        updated = []
-        for mmsi, v in current_map.items():
-            prev = self.last_vessel_state.get(mmsi)
-            if not prev:
-                updated.append(v)
-                continue
-            
-            # Threshold: only update if position changed by > 0.0001 (~10m)
-            pos_changed = (
-                abs(prev.get('lat', 0) - v.get('lat', 0)) > 0.0001 or
-                abs(prev.get('lon', 0) - v.get('lon', 0)) > 0.0001
-            )
-            # Or if status/speed changed significantly
-            status_changed = prev.get('speed') != v.get('speed')
-            
-            if pos_changed or status_changed:
-                updated.append(v)
-        
-        removed = [
-            mmsi for mmsi in self.last_vessel_state
-            if mmsi not in current_map
-        ]
-        
+        updated, removed = self.last_vessel_state.sync(current, VESSEL_DIFF_THRESHOLDS)
         if updated or removed:
-            message = {
-                "type": "VESSEL_DIFF",
-                "payload": {
-                    "updated": updated,
-                    "removed": removed
-                },
-                "timestamp": asyncio.get_event_loop().time()
-            }
-            await self.broadcast_to_clients(message)
-        
-        # Always maintain full state in the hub for next diff
-        self.last_vessel_state = current_map
+            self._snapshot_frames.clear()
+            self._publish_geo_diff(TOPIC_VESSELS, set(updated))
 
-    async def broadcast_aircraft_data(self, current: list):
+    async def broadcast_aircraft_data(self, current: TrackStore):
         """Broadcasts only the changed/new aircraft (diff) using icao24 as key."""
-        current_map = {a['icao24']: a for a in current}
-        
-        updated = []
-        for icao, a in current_map.items():
-            prev = self.last_aircraft_state.get(icao)
-            if not prev:
-                updated.append(a)
-                continue
-            
-            # Threshold for aircraft is looser since they move faster
-            pos_changed = (
-                abs(prev.get('lat', 0) - a.get('lat', 0)) > 0.001 or
-                abs(prev.get('lon', 0) - a.get('lon', 0)) > 0.001
-            )
-            alt_changed = abs(prev.get('altitude_ft', 0) - a.get('altitude_ft', 0)) > 100
-            
-            if pos_changed or alt_changed:
-                updated.append(a)
-        
-        removed = [
-            icao for icao in self.last_aircraft_state
-            if icao not in current_map
-        ]
-        
+        updated, removed = self.last_aircraft_state.sync(current, AIRCRAFT_DIFF_THRESHOLDS)
         if updated or removed:
-            message = {
-                "type": "AIRCRAFT_DIFF",
-                "payload": {
-                    "updated": updated,
-                    "removed": removed
-                },
-                "timestamp": asyncio.get_event_loop().time()
-            }
-            await self.broadcast_to_clients(message)
+            self._snapshot_frames.clear()
+            self._publish_geo_diff(TOPIC_AIRCRAFT, set(updated))
+
+    def _publish_geo_diff(self, topic: str, changed: Set[str]):
+        """
+        Sends each subscriber the diff of its own viewport: changed objects inside it,
+        objects that entered it, and ids that left it or disappeared.
+        Clients sharing a viewport and prior view share one selection and one frame.
+        """
+        msg_type = GEO_FEEDS[topic][0]
+        store = self._geo_state(topic)
+        selections: Dict[tuple, Set[str]] = {}
+        frames: Dict[tuple, tuple] = {}
         
-        self.last_aircraft_state = current_map
+        for client in self._clients_for(topic):
+            viewport = client.viewport or self.default_viewport
+            prev = client.visible.get(topic)
+            memo_key = (viewport.key, id(prev))
+            memo = frames.get(memo_key)
+            if memo is None or memo[0] is not prev:
+                selected = selections.get(viewport.key)
+                if selected is None:
+                    selected = selections[viewport.key] = select_in_viewport(store, viewport)
+                memo = frames[memo_key] = (prev, selected, self._geo_diff_frame(msg_type, store, prev or set(), selected, changed))
+            
+            client.visible[topic] = memo[1]
+            if memo[2]:
+                self._fanout(memo[2], [client])
+
+    @staticmethod
+    def _geo_diff_frame(msg_type: str, store: TrackStore, prev: Set[str], selected: Set[str],
+                        changed: Set[str]) -> Optional[Frame]:
+        entered = selected - prev
+        updated = entered | (changed & selected)
+        removed = prev - selected
+        if not updated and not removed:
+            return None
+        return Frame({
+            "type": msg_type,
+            "payload": {
+                "updated": store.records(store.rows_for(updated)),
+                "removed": list(removed)
+            },
+            "timestamp": asyncio.get_event_loop().time()
+        })
 
     async def _broadcast_trade(self, trades: list):
-        """Normalize and broadcast Finnhub trade data."""
+        """
+        Aggregates Finnhub prints into the current coalescing window.
+        Clients in raw mode still receive every print as an EQUITY frame.
+        """
         for trade in trades:
-            message = {
-                "type": "EQUITY",
-                "symbol": trade["s"],
-                "price": trade["p"],
-                "volume": trade["v"],
-                "timestamp": trade["t"]
-            }
-            await self.broadcast_to_clients(message)
+            price = trade["p"]
+            volume = trade["v"]
+            for symbol in self._platform_symbols(trade["s"]):
+                batch = self._trade_batches.get(symbol)
+                if batch is None:
+                    batch = self._trade_batches[symbol] = {"notional": 0.0, "volume": 0.0, "count": 0}
+                batch["notional"] += price * volume
+                batch["volume"] += volume
+                batch["count"] += 1
+                batch["price"] = price
+                batch["timestamp"] = trade["t"]
+
+                raw_clients = [c for c in self._clients_for(f"{EQUITY_TOPIC_PREFIX}{symbol}") if c.trade_mode == TRADE_MODE_RAW]
+                if raw_clients:
+                    self._fanout(Frame({
+                        "type": "EQUITY",
+                        "symbol": symbol,
+                        "price": price,
+                        "volume": volume,
+                        "timestamp": trade["t"]
+                    }), raw_clients)
+
+    def _platform_symbols(self, finnhub_symbol: str) -> Set[str]:
+        """Canonical symbols fed by one Finnhub stream (HDFC and HDFCBANK both stream HDFCBANK.NS)."""
+        symbols = self.upstream_symbols.get(finnhub_symbol)
+        return symbols if symbols else {symbol_resolver.from_finnhub(finnhub_symbol).symbol}
+
+    async def _trade_flush_loop(self):
+        """Emits one EQUITY_BATCH frame per symbol per coalescing window."""
+        window = config.TRADE_COALESCE_MS / 1000
+        while self._is_running:
+            await asyncio.sleep(window)
+            if not self._trade_batches:
+                continue
+            batches, self._trade_batches = self._trade_batches, {}
+            try:
+                for symbol, batch in batches.items():
+                    market_snapshot.update_trade(symbol, batch["price"], batch["timestamp"])
+                    batch_clients = [c for c in self._clients_for(f"{EQUITY_TOPIC_PREFIX}{symbol}") if c.trade_mode == TRADE_MODE_BATCH]
+                    if not batch_clients:
+                        continue
+                    vwap = batch["notional"] / batch["volume"] if batch["volume"] else batch["price"]
+                    self._fanout(Frame({
+                        "type": "EQUITY_BATCH",
+                        "symbol": symbol,
+                        "price": batch["price"],
+                        "vwap": vwap,
+                        "volume": batch["volume"],
+                        "count": batch["count"],
+                        "timestamp": batch["timestamp"]
+                    }), batch_clients)
+            except Exception as e:
+                logger.error(f"Trade flush error: {e}")
 
     async def subscribe_to_symbol(self, symbol: str):
-        """Dynamically subscribe to a new Finnhub symbol."""
+        """
+        Subscribe upstream to a canonical symbol's Finnhub stream once a terminal is interested in it.
+        Symbols sharing a stream are ref-counted on it: only the first one subscribes upstream.
+        """
         if not self.connections.get("finnhub"):
             return
         
-        if symbol in self.active_symbols:
+        if symbol in self.active_symbols or f"{EQUITY_TOPIC_PREFIX}{symbol}" not in self.topic_clients:
+            return
+        
+        upstream = symbol_resolver.finnhub_symbol(symbol)
+        refs = self.upstream_symbols.setdefault(upstream, set())
+        first = not refs
+        refs.add(symbol)
+        self.active_symbols.add(symbol)
+        if not first:
             return
+        try:
+            await self.connections["finnhub"].send(json.dumps({"type": "subscribe", "symbol": upstream}))
+            logger.info(f"Dynamically subscribed to: {upstream} ({symbol})")
+        except Exception as e:
+            logger.error(f"Failed to subscribe to {upstream}: {e}")
 
-        symbol_to_sub = symbol
-        if "USDT" in symbol:
-            symbol_to_sub = f"BINANCE:{symbol}"
+    async def unsubscribe_from_symbol(self, symbol: str):
+        """Drop the upstream Finnhub subscription once no symbol on that stream is watched."""
+        if symbol not in self.active_symbols or f"{EQUITY_TOPIC_PREFIX}{symbol}" in self.topic_clients:
+            return
         
+        self.active_symbols.discard(symbol)
+        upstream = symbol_resolver.finnhub_symbol(symbol)
+        refs = self.upstream_symbols.get(upstream)
+        if refs is not None:
+            refs.discard(symbol)
+            if refs:
+                return  # Another symbol still reads this stream
+            del self.upstream_symbols[upstream]
+        if not self.connections.get("finnhub"):
+            return
         try:
-            await self.connections["finnhub"].send(json.dumps({"type": "subscribe", "symbol": symbol_to_sub}))
-            self.active_symbols.add(symbol)
-            logger.info(f"Dynamically subscribed to: {symbol}")
+            await self.connections["finnhub"].send(json.dumps({"type": "unsubscribe", "symbol": upstream}))
+            logger.info(f"Unsubscribed from idle symbol: {upstream} ({symbol})")
         except Exception as e:
-            logger.error(f"Failed to subscribe to {symbol}: {e}")
+            logger.error(f"Failed to unsubscribe from {upstream}: {e}")
 
     # --- Finnhub Internal Logic ---
     async def _finnhub_loop(self):
@@ -229,25 +548,12 @@ class WebSocketManager:
                 async with websockets.connect(uri, ssl=ssl_context) as websocket:
                     self.connections["finnhub"] = websocket
                     
-                    # Import here to avoid circular dependencies
-                    # Gather all unique symbols from all approved users
-                    from app.db.models import User
-                    from app.api.quotes import AXIOM_WATCHLIST
-                    
-                    users = await User.find(User.is_approved == True).to_list()
-                    initial_symbols = set(AXIOM_WATCHLIST.keys())
-                    for u in users:
-                        if u.watchlist:
-                            initial_symbols.update(u.watchlist)
-                    
-                    for symbol in initial_symbols:
-                        if symbol not in self.active_symbols:
-                            symbol_to_sub = symbol
-                            if "USDT" in symbol:
-                                symbol_to_sub = f"BINANCE:{symbol}"
-                            
-                            await websocket.send(json.dumps({"type": "subscribe", "symbol": symbol_to_sub}))
-                            self.active_symbols.add(symbol)
+                    # A fresh upstream socket has no subscriptions: replay current terminal interest
+                    self.active_symbols.clear()
+                    self.upstream_symbols.clear()
+                    for topic in list(self.topic_clients):
+                        if topic.startswith(EQUITY_TOPIC_PREFIX):
+                            await self.subscribe_to_symbol(topic[len(EQUITY_TOPIC_PREFIX):])
 
                     async for message in websocket:
                         if not self._is_running: break
@@ -257,6 +563,8 @@ class WebSocketManager:
             except Exception as e:
                 logger.error(f"Finnhub error: {e}. Reconnecting...")
                 await asyncio.sleep(5)
+            finally:
+                self.connections.pop("finnhub", None)
 
 # Global instance
 ws_manager = WebSocketManager()
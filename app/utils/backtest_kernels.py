@@ -0,0 +1,190 @@
+"""
+NumPy kernels for evaluating many strategy parameter sets on one bar history.
+Indicators that depend on a swept window are computed once per distinct window
+value (precompute_features); each candidate then only costs a few array passes
+for its signals, positions and metrics. Module-level and numpy/pandas only, so
+the kernels run in worker processes.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple
+from app.core import config
+
+# Parameters the regime-aware ensemble exposes, at the values VectorizedBacktester uses
+DEFAULT_PARAMS = {
+    "entry_threshold": 1.0,            # |composite score| needed to take a position
+    "rsi_window": config.RSI_WINDOW,
+    "rsi_oversold": 30.0,              # Mean reversion uses oversold + 5 / overbought - 5
+    "rsi_overbought": 70.0,
+    "bb_window": config.SMA_FAST,
+    "bb_std": 2.0,
+    "momentum_lookback": config.MOMENTUM_LOOKBACK,
+}
+WINDOW_PARAMS = ("rsi_window", "bb_window", "momentum_lookback")
+
+METRIC_NAMES = ("total_return", "sharpe_ratio", "sortino_ratio", "max_drawdown", "profit_factor", "win_rate", "final_equity")
+
+RISK_FREE_RATE = 0.02  # Assume 2%
+
+# Bars per year by yfinance interval: 252 sessions of 6.5h for intraday bars
+# (hourly bars are 7 per session, the last one partial)
+PERIODS_PER_YEAR = {
+    "1m": 252 * 390,
+    "2m": 252 * 195,
+    "5m": 252 * 78,
+    "15m": 252 * 26,
+    "30m": 252 * 13,
+    "60m": 252 * 7,
+    "1h": 252 * 7,
+    "90m": 252 * 5,
+    "1d": 252,
+    "5d": 52,
+    "1wk": 52,
+    "1mo": 12,
+    "3mo": 4,
+}
+
+
+def periods_per_year(interval: str) -> float:
+    """Annualization factor for metrics computed on `interval` bars (daily if unknown)."""
+    return PERIODS_PER_YEAR.get(interval, 252)
+
+
+def observed_periods_per_year(index: pd.DatetimeIndex, interval: str, min_days: float = 30) -> float:
+    """
+    Bars per year actually present in `index`, e.g. a basket mixing exchange calendars
+    (or 24/7 crypto). Falls back to the nominal factor when the span is under `min_days`.
+    """
+    if len(index) < 2:
+        return periods_per_year(interval)
+    span_days = (index[-1] - index[0]).total_seconds() / 86400
+    if span_days < min_days:
+        return periods_per_year(interval)
+    return (len(index) - 1) / (span_days / 365.25)
+
+
+def performance_metrics(returns: np.ndarray, initial_capital: float, periods_per_year: float = 252) -> Dict[str, float]:
+    """Return/risk metrics of a per-bar strategy return series (NaN-free)."""
+    n = len(returns)
+    if n == 0:
+        return {name: 0.0 for name in METRIC_NAMES} | {"final_equity": round(initial_capital, 2)}
+    equity = initial_capital * np.cumprod(1 + returns)
+    total_return = equity[-1] / initial_capital - 1
+
+    # Annualized volatility / Sharpe
+    mean = returns.mean()
+    std = returns.std(ddof=1) if n > 1 else np.nan
+    vol = std * np.sqrt(periods_per_year)
+    sharpe = (mean * periods_per_year - RISK_FREE_RATE) / vol if vol > 0 else 0
+
+    # Sortino (downside risk only)
+    downside = returns[returns < 0]
+    downside_std = (downside.std(ddof=1) if len(downside) > 1 else np.nan) * np.sqrt(periods_per_year)
+    sortino = (mean * periods_per_year - RISK_FREE_RATE) / downside_std if downside_std > 0 else 0
+
+    # Max Drawdown
+    max_dd = (equity / np.maximum.accumulate(equity) - 1).min()
+
+    # Profit Factor / Win Rate
+    gross_profit = returns[returns > 0].sum()
+    gross_loss = abs(downside.sum())
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+
+    traded = np.count_nonzero(returns)
+    win_rate = np.count_nonzero(returns > 0) / traded if traded > 0 else 0
+
+    return {
+        "total_return": round(float(total_return) * 100, 2),
+        "sharpe_ratio": round(float(sharpe), 2),
+        "sortino_ratio": round(float(sortino), 2),
+        "max_drawdown": round(float(max_dd) * 100, 2),
+        "profit_factor": round(float(profit_factor), 2),
+        "win_rate": round(float(win_rate) * 100, 2),
+        "final_equity": round(float(equity[-1]), 2),
+    }
+
+
+def precompute_features(df: pd.DataFrame, regime_weights: np.ndarray, grid: Dict[str, Sequence]) -> Dict[str, np.ndarray]:
+    """
+    Shared arrays for a sweep. `df` is a MarketAnalyzer frame after calculate_indicators,
+    `regime_weights` the (n, 3) per-bar ensemble weights, `grid` the candidate values per parameter.
+    Window-dependent indicators are stored once per distinct window, keyed "<name>:<window>".
+    """
+    close = df['Close']
+    features = {
+        "close": close.to_numpy(dtype=float),
+        "volume": df['Volume'].to_numpy(dtype=float),
+        "macd": df['MACD'].to_numpy(dtype=float),
+        "signal_line": df['Signal_Line'].to_numpy(dtype=float),
+        "market_return": close.pct_change().to_numpy(dtype=float),
+        "weights": np.asarray(regime_weights, dtype=float),
+    }
+    delta = close.diff()
+    for w in sorted({int(v) for v in grid.get("rsi_window", [DEFAULT_PARAMS["rsi_window"]])}):
+        gain = delta.where(delta > 0, 0).rolling(window=w).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=w).mean()
+        features[f"rsi:{w}"] = (100 - (100 / (1 + gain / loss))).to_numpy()
+    for w in sorted({int(v) for v in grid.get("bb_window", [DEFAULT_PARAMS["bb_window"]])}):
+        features[f"sma:{w}"] = close.rolling(window=w).mean().to_numpy()
+        features[f"std:{w}"] = close.rolling(window=w).std().to_numpy()
+    for w in sorted({int(v) for v in grid.get("momentum_lookback", [DEFAULT_PARAMS["momentum_lookback"]])}):
+        features[f"high:{w}"] = df['High'].rolling(window=w).max().to_numpy()
+        features[f"avg_vol:{w}"] = df['Volume'].rolling(window=w).mean().to_numpy()
+    return features
+
+
+def composite_signal(features: Dict[str, np.ndarray], params: Dict[str, float]) -> np.ndarray:
+    """Per-bar -1/0/1 signal of the regime-weighted ensemble for one parameter set."""
+    close, rsi = features["close"], features[f"rsi:{int(params['rsi_window'])}"]
+    macd, signal_line = features["macd"], features["signal_line"]
+    prev_macd = np.concatenate(([np.nan], macd[:-1]))
+    prev_signal = np.concatenate(([np.nan], signal_line[:-1]))
+
+    with np.errstate(invalid='ignore'):
+        # 1. Scalping
+        scalp = 2 * (rsi < params["rsi_oversold"]) - 2 * (rsi > params["rsi_overbought"])
+        scalp = scalp + 2 * ((macd > signal_line) & (prev_macd <= prev_signal)) - 2 * ((macd < signal_line) & (prev_macd >= prev_signal))
+
+        # 2. Momentum
+        lookback = int(params["momentum_lookback"])
+        momentum = 2 * ((close > features[f"high:{lookback}"] * config.MOMENTUM_PROXIMITY) &
+                        (features["volume"] > features[f"avg_vol:{lookback}"] * 1.3))
+
+        # 3. Mean reversion
+        w = int(params["bb_window"])
+        band = features[f"std:{w}"] * params["bb_std"]
+        upper, lower = features[f"sma:{w}"] + band, features[f"sma:{w}"] - band
+        mean_rev = np.where((close > upper) & (rsi > params["rsi_overbought"] - 5), -2,
+                            np.where((close < lower) & (rsi < params["rsi_oversold"] + 5), 2, 0))
+
+        weights = features["weights"]
+        score = scalp * weights[:, 0] + momentum * weights[:, 1] + mean_rev * weights[:, 2]
+        return np.where(score >= params["entry_threshold"], 1, np.where(score <= -params["entry_threshold"], -1, 0))
+
+
+def strategy_returns(features: Dict[str, np.ndarray], signal: np.ndarray, start: int, stop: int, cost: float) -> np.ndarray:
+    """
+    Per-bar strategy returns over bars [start, stop), entering flat at `start`.
+    Positions trade on the next bar (no lookahead); every position change pays `cost`.
+    """
+    sig = signal[start:stop]
+    if len(sig) < 2:
+        return np.empty(0)
+    position = sig[:-1].astype(float)
+    prev_position = np.concatenate(([0.0], position[:-1]))
+    returns = position * features["market_return"][start + 1:stop] - np.abs(position - prev_position) * cost
+    return returns[~np.isnan(returns)]
+
+
+def evaluate_candidates(features: Dict[str, np.ndarray], candidates: List[Dict[str, float]],
+                        windows: List[Tuple[int, int]], initial_capital: float, cost: float,
+                        periods_per_year: float = 252) -> List[List[Dict[str, float]]]:
+    """Metrics of every candidate on every (start, stop) window: result[candidate][window]."""
+    results = []
+    for params in candidates:
+        signal = composite_signal(features, params)
+        results.append([
+            performance_metrics(strategy_returns(features, signal, start, stop, cost), initial_capital, periods_per_year)
+            for start, stop in windows
+        ])
+    return results
@@ -0,0 +1,146 @@
+"""
+Dedicated thread pool for blocking provider SDKs (yfinance, FlightRadar24,
+deep_translator).
+Calls never run on the event loop or the default to_thread pool. Each provider
+has a concurrency cap, so one slow upstream cannot occupy every thread, and a
+per-call timeout, so a hung request fails the caller instead of stalling it.
+Queue depth, latency, timeouts and rejections are exposed for /health.
+"""
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# provider -> per-call timeout (seconds) and max calls running at once
+PROVIDERS: Dict[str, Dict] = {
+    "yfinance":  {"timeout": 30.0, "concurrency": 8},
+    "fr24":      {"timeout": 20.0, "concurrency": 1},
+    "translate": {"timeout": 10.0, "concurrency": 4},
+}
+DEFAULT_PROVIDER = {"timeout": 30.0, "concurrency": 2}
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised instead of queueing when a provider already has BLOCKING_MAX_QUEUE calls waiting."""
+
+
+class _ProviderState:
+    __slots__ = ("timeout", "slots", "queued", "running", "calls", "errors", "timeouts", "rejected", "total_ms", "max_ms")
+
+    def __init__(self, timeout: float, concurrency: int):
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(concurrency)
+        self.queued = self.running = 0
+        self.calls = self.errors = self.timeouts = self.rejected = 0
+        self.total_ms = self.max_ms = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class BlockingExecutor:
+    def __init__(self, workers: int = config.BLOCKING_WORKERS, max_queue: int = config.BLOCKING_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._providers: Dict[str, _ProviderState] = {}
+
+    def _get(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="blocking")
+        return self._executor
+
+    def _state(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            options = {**DEFAULT_PROVIDER, **PROVIDERS.get(provider, {})}
+            state = self._providers[provider] = _ProviderState(options["timeout"], options["concurrency"])
+        return state
+
+    async def run(self, provider: str, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Runs fn(*args, **kwargs) on the pool under `provider`'s limits.
+        Raises TimeoutError after the provider timeout (or `timeout`) and ExecutorSaturated when its queue is full.
+        """
+        state = self._state(provider)
+        if state.queued >= self.max_queue:
+            state.rejected += 1
+            raise ExecutorSaturated(f"{provider}: {state.queued} blocking calls already queued")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        state.queued += 1
+        try:
+            await state.slots.acquire()
+        finally:
+            state.queued -= 1
+
+        # The slot is held until the thread really finishes, even after a timeout,
+        # so abandoned calls still count against the provider's concurrency
+        state.running += 1
+        try:
+            future = self._get().submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._release(state)
+            raise
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._release, state)
+            except RuntimeError:
+                pass  # Loop already closed (shutdown)
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or state.timeout)
+        except TimeoutError:
+            state.timeouts += 1
+            logger.warning(f"Blocking {provider} call {getattr(fn, '__name__', fn)} timed out after {timeout or state.timeout}s")
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            state.errors += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            state.calls += 1
+            state.total_ms += elapsed
+            state.max_ms = max(state.max_ms, elapsed)
+
+    @staticmethod
+    def _release(state: _ProviderState):
+        state.running -= 1
+        state.slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": sum(s.queued for s in self._providers.values()),
+            "running": sum(s.running for s in self._providers.values()),
+            "providers": {name: state.stats() for name, state in self._providers.items()},
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            # Don't wait on hung provider calls at exit
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+blocking_executor = BlockingExecutor()
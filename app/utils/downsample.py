@@ -0,0 +1,39 @@
+"""
+Series downsampling for charts.
+Largest-Triangle-Three-Buckets keeps the visually significant points (peaks,
+troughs, drawdown edges) of a long curve, unlike striding or bucket averages.
+"""
+import numpy as np
+
+
+def lttb(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the `threshold` points LTTB keeps from y (x is the sample position).
+    Returns every index when the series is already short enough. NaNs are skipped.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n:
+        return valid
+    if threshold < 3:
+        return valid[np.linspace(0, n - 1, max(threshold, 0)).astype(int)]
+
+    x = valid.astype(float)
+    v = y[valid]
+    # Interior points split into threshold - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (just the last point for the final bucket)
+        nxt_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:nxt_stop].mean()
+        avg_y = v[stop:nxt_stop].mean()
+        # Point of this bucket forming the largest triangle with the previous pick and that average
+        area = np.abs((x[a] - avg_x) * (v[start:stop] - v[a]) - (x[a] - x[start:stop]) * (avg_y - v[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return valid[keep]
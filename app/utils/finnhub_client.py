@@ -1,11 +1,10 @@
 import os
 import time
-import requests
 import asyncio
-import aiohttp
 import logging
 from typing import Dict, Optional, Any
 from dotenv import load_dotenv
+from app.utils.http_pool import get_client
 
 load_dotenv()
 
@@ -38,22 +37,20 @@ class FinnhubClient:
         url = f"{self.BASE_URL}/quote"
         params = {"symbol": symbol, "token": self.api_key}
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 429:
-                        logger.warning("Finnhub Rate Limit Hit (429). Retrying after delay...")
-                        await asyncio.sleep(5)
-                        return await self.get_quote(symbol)
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Finnhub API error: {response.status} - {error_text}")
-                        return {}
-            except Exception as e:
-                logger.error(f"Finnhub connection error: {str(e)}")
-                return {}
+        try:
+            response = await get_client("finnhub").get(url, params=params)
+        except Exception as e:
+            logger.error(f"Finnhub connection error: {str(e)}")
+            return {}
+        if response.status_code == 200:
+            return response.json()
+        elif response.status_code == 429:
+            logger.warning("Finnhub Rate Limit Hit (429). Retrying after delay...")
+            await asyncio.sleep(5)
+            return await self.get_quote(symbol)
+        else:
+            logger.error(f"Finnhub API error: {response.status_code} - {response.text}")
+            return {}
 
     async def get_basic_financials(self, symbol: str) -> Dict[str, Any]:
         """Fetch basic financial data."""
@@ -61,11 +58,10 @@ class FinnhubClient:
         url = f"{self.BASE_URL}/stock/metric"
         params = {"symbol": symbol, "metric": "all", "token": self.api_key}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                return {}
+        response = await get_client("finnhub").get(url, params=params)
+        if response.status_code == 200:
+            return response.json()
+        return {}
 
     async def get_technical_indicators(self, symbol: str, resolution: str = "D") -> Dict[str, Any]:
         """Fetch technical indicators (if available in tier)."""
@@ -80,8 +76,7 @@ class FinnhubClient:
             "timeperiod": 14,
             "token": self.api_key
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                return {}
+        response = await get_client("finnhub").get(url, params=params)
+        if response.status_code == 200:
+            return response.json()
+        return {}
@@ -0,0 +1,78 @@
+"""
+Frame encoding for the terminal WebSocket hub.
+A Frame wraps one outbound message and serializes it lazily, at most once per
+wire encoding, no matter how many clients it is fanned out to.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+
+def available_encodings() -> set:
+    encodings = {ENCODING_JSON}
+    if msgpack is not None:
+        encodings.add(ENCODING_MSGPACK)
+    return encodings
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """Picks the wire encoding for a client, falling back to JSON if unsupported."""
+    requested = (requested or ENCODING_JSON).lower()
+    if requested in available_encodings():
+        return requested
+    logger.warning(f"Frame encoding '{requested}' unavailable, falling back to JSON")
+    return ENCODING_JSON
+
+
+def _default(obj: Any):
+    # numpy scalars / arrays coming out of pandas-backed services
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type {type(obj).__name__} is not serializable")
+
+
+def encode_message(message: Dict, encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """JSON frames go out as text, msgpack frames as binary."""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True, default=_default)
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                message,
+                default=_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            pass
+    return json.dumps(message, default=_default)
+
+
+class Frame:
+    """An outbound message with a per-encoding cache of its wire form."""
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: Dict):
+        self.message = message
+        self._encoded: Dict[str, Union[str, bytes]] = {}
+
+    def encode(self, encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = encode_message(self.message, encoding)
+            self._encoded[encoding] = data
+        return data
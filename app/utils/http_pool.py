@@ -0,0 +1,78 @@
+"""
+Application-scoped outbound HTTP connection pools.
+Each upstream provider gets one long-lived httpx.AsyncClient, so calls reuse
+warm keep-alive connections (HTTP/2 where the host and the h2 package allow)
+instead of paying a TCP+TLS handshake per request.
+"""
+import logging
+import httpx
+from typing import Dict
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+BROWSER_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# provider -> client options (one provider per upstream host)
+PROVIDERS: Dict[str, Dict] = {
+    "finnhub":   {"timeout": 10.0},
+    "opensky":   {"timeout": 15.0, "max_connections": 2},
+    "gdelt":     {"timeout": 8.0},
+    "anthropic": {"timeout": 30.0},
+    "yahoo":     {"timeout": 5.0, "headers": {"User-Agent": BROWSER_UA}},
+}
+
+
+class HTTPPool:
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        options = PROVIDERS.get(provider, {})
+        limits = httpx.Limits(
+            max_connections=options.get("max_connections", config.HTTP_MAX_CONNECTIONS),
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+        )
+        return httpx.AsyncClient(
+            timeout=options.get("timeout", 10.0),
+            limits=limits,
+            headers=options.get("headers"),
+            http2=config.HTTP2_ENABLED and HTTP2_AVAILABLE
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Returns the provider's shared client, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._clients[provider] = self._build(provider)
+        return client
+
+    async def start(self):
+        for provider in PROVIDERS:
+            self.get(provider)
+        logger.info(
+            f"HTTP pools ready: {', '.join(self._clients)} "
+            f"(http2={'on' if config.HTTP2_ENABLED and HTTP2_AVAILABLE else 'off'})"
+        )
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+http_pool = HTTPPool()
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    return http_pool.get(provider)
@@ -0,0 +1,141 @@
+"""
+Vectorized indicators and signals over a stacked (time x symbols) panel.
+Mirrors MarketAnalyzer.fetch_data normalization, calculate_indicators,
+generate_vectorized_signals and predict_direction, but for many symbols at
+once. Module-level and numpy/pandas only, so it can run in a worker process.
+
+Panels are right-aligned: each column holds one symbol's own bars with the
+last bar on the last row and NaN padding above, so exchanges with different
+calendars can share one array and every rolling window sees exactly the bars
+the single-symbol path would.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Sequence
+from app.core import config
+from app.utils.regime_detector import RegimeDetector
+
+FIELDS = ("High", "Low", "Close", "Volume")
+
+
+def stack_panel(fields: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Right-aligns (time x symbols) arrays on each symbol's valid Close rows.
+    Rows missing for a symbol (another exchange's session, holidays) are removed
+    from that column only; leading rows that are empty for every symbol are trimmed.
+    """
+    valid = ~np.isnan(fields["Close"])
+    # Stable sort puts each column's invalid rows on top and keeps the valid ones in order
+    order = np.argsort(valid, axis=0, kind="stable")
+    keep = np.take_along_axis(valid, order, axis=0)
+    start = len(valid) - int(valid.sum(axis=0).max()) if valid.size else 0
+    out = {}
+    for name in FIELDS:
+        arr = np.take_along_axis(fields[name].astype(float), order, axis=0)
+        arr[~keep] = np.nan
+        out[name] = arr[start:]
+    return out
+
+
+def score_panel(symbols: Sequence[str], high: np.ndarray, low: np.ndarray,
+                close: np.ndarray, volume: np.ndarray) -> Dict[str, dict]:
+    """Scores every column of a right-aligned panel. Returns {symbol: prediction dict}."""
+    columns = list(range(len(symbols)))
+    high = pd.DataFrame(high, columns=columns)
+    low = pd.DataFrame(low, columns=columns)
+    close = pd.DataFrame(close, columns=columns)
+    volume = pd.DataFrame(volume, columns=columns)
+    present = close.notna()
+    rows = present.sum().to_numpy()
+
+    # --- HFT Algo 1.1: Real-Time Data Normalization ---
+    rolling_median = close.rolling(window=config.SMA_FAST).median()
+    close = close.where(~((close > rolling_median * 1.10) | (close < rolling_median * 0.90)), rolling_median)
+    high, low, volume = high.ffill(), low.ffill(), volume.ffill()
+
+    # ATR
+    prev_close = close.shift()
+    tr = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+    atr = tr.rolling(window=config.ATR_WINDOW).mean()
+
+    # RSI (padding rows stay NaN so windows never count them as flat bars)
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).where(present).rolling(window=config.RSI_WINDOW).mean()
+    loss = (-delta.where(delta < 0, 0)).where(present).rolling(window=config.RSI_WINDOW).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+
+    # SMAs / Bollinger
+    sma_20 = close.rolling(window=config.SMA_FAST).mean()
+    sma_200 = close.rolling(window=config.SMA_SLOW).mean()
+    std = close.rolling(window=config.SMA_FAST).std()
+    bb_upper = sma_20 + std * 2.0
+    bb_lower = sma_20 - std * 2.0
+
+    # MACD
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal_line = macd.ewm(span=9, adjust=False).mean()
+
+    # Momentum inputs
+    recent_high = high.rolling(window=config.MOMENTUM_LOOKBACK).max()
+    avg_vol = volume.rolling(window=config.MOMENTUM_LOOKBACK).mean()
+    vol_median = (atr / close).median().to_numpy()
+
+    c, r, m, s = _last(close), _last(rsi), _last(macd), _last(signal_line)
+    pm, ps = _last(macd, 2), _last(signal_line, 2)
+    bbu, bbl = _last(bb_upper), _last(bb_lower)
+
+    # 1. Scalping
+    scalp = 2 * (r < 30).astype(int) - 2 * (r > 70).astype(int)
+    scalp += 2 * ((m > s) & (pm <= ps)).astype(int) - 2 * ((m < s) & (pm >= ps)).astype(int)
+    # 2. Momentum
+    momentum = 2 * ((c > _last(recent_high) * config.MOMENTUM_PROXIMITY) & (_last(volume) > _last(avg_vol) * 1.3)).astype(int)
+    # 3. Mean reversion
+    mean_rev = np.where((c > bbu) & (r > 65), -2, np.where((c < bbl) & (r < 35), 2, 0))
+
+    detector = RegimeDetector()
+    atr_last, sma_200_last = _last(atr), _last(sma_200)
+    results = {}
+    for i, symbol in enumerate(symbols):
+        if rows[i] == 0:
+            continue
+        regime = detector.classify(
+            close=c[i], sma_200=sma_200_last[i], atr=atr_last[i], vol_median=vol_median[i], rows=int(rows[i])
+        )
+        weights = detector.get_strategy_weights(regime)
+        total_score = float(
+            scalp[i] * weights['scalping'] + momentum[i] * weights['momentum'] + mean_rev[i] * weights['mean_reversion']
+        )
+
+        prediction = "NEUTRAL"
+        confidence = 0.5
+        if total_score >= 1.0:
+            prediction = "BULLISH"
+            confidence = min(0.6 + (total_score * 0.1), 0.95)
+        elif total_score <= -1.0:
+            prediction = "BEARISH"
+            confidence = min(0.6 + (abs(total_score) * 0.1), 0.95)
+
+        results[symbol] = _sanitize({
+            "symbol": symbol,
+            "prediction": prediction,
+            "confidence": round(confidence, 2),
+            "regime": regime.value,
+            "current_price": round(float(c[i]), 2),
+            "rsi": round(float(r[i]), 2),
+            "macd": round(float(m[i]), 4),
+            "atr": float(atr_last[i]),
+            "total_score": round(total_score, 2),
+            "strategy": f"Regime: {regime.value} | Weights: {weights}"
+        })
+    return results
+
+
+def _last(frame: pd.DataFrame, n: int = 1) -> np.ndarray:
+    """Row n from the end, all NaN when the panel is shorter."""
+    if len(frame) < n:
+        return np.full(frame.shape[1], np.nan)
+    return frame.iloc[-n].to_numpy()
+
+
+def _sanitize(obj: dict) -> dict:
+    return {k: None if isinstance(v, float) and not np.isfinite(v) else v for k, v in obj.items()}
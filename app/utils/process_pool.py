@@ -0,0 +1,52 @@
+"""
+Application-scoped process pool for CPU-bound numpy work.
+Panel scoring (and anything else that would hold the GIL for long) runs in
+worker processes so it neither blocks the event loop nor starves the thread
+pool used for blocking I/O.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPool:
+    def __init__(self, workers: int = config.PROCESS_POOL_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> ProcessPoolExecutor:
+        """Returns the shared executor, creating it on first use."""
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Process pool started ({self.workers} workers)")
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) in a worker process. fn and its arguments must be picklable."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.get(), partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM): drop the pool so the next call starts a fresh one
+            logger.error("Process pool broken, restarting on next use")
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+process_pool = ProcessPool()
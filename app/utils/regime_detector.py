@@ -12,6 +12,32 @@ class MarketRegime(Enum):
     LOW_VOL_RANGING = "LOW_VOL_RANGING"
     NEUTRAL = "NEUTRAL"
 
+# Ensemble weights per regime
+STRATEGY_WEIGHTS = {
+    MarketRegime.BULL_TREND: {
+        "scalping": 0.2, "momentum": 0.6, "mean_reversion": 0.2
+    },
+    MarketRegime.BEAR_TREND: {
+        "scalping": 0.2, "momentum": 0.5, "mean_reversion": 0.3
+    },
+    MarketRegime.HIGH_VOL_RANGING: {
+        "scalping": 0.5, "momentum": 0.1, "mean_reversion": 0.4
+    },
+    MarketRegime.LOW_VOL_RANGING: {
+        "scalping": 0.3, "momentum": 0.2, "mean_reversion": 0.5
+    },
+    MarketRegime.NEUTRAL: {
+        "scalping": 0.33, "momentum": 0.33, "mean_reversion": 0.34
+    }
+}
+
+# Integer codes for the vectorized path: REGIMES[code] is the regime,
+# WEIGHT_MATRIX[code] its (scalping, momentum, mean_reversion) weights
+REGIMES = list(MarketRegime)
+REGIME_CODES = {regime: code for code, regime in enumerate(REGIMES)}
+STRATEGIES = ("scalping", "momentum", "mean_reversion")
+WEIGHT_MATRIX = np.array([[STRATEGY_WEIGHTS[regime][name] for name in STRATEGIES] for regime in REGIMES])
+
 class RegimeDetector:
     """
     Classifies market state based on ADX and Volatility.
@@ -28,11 +54,25 @@ class RegimeDetector:
         # 1. Trend Strength (using simple SMA distance as proxy for now if ADX not pre-calc)
         # In a full implementation, we'd use a proper ADX
         close = last_row['Close']
-        sma_200 = last_row.get('SMA_200', close)
-        
+        return self.classify(
+            close=close,
+            sma_200=last_row.get('SMA_200', close),
+            atr=last_row.get('ATR', 0),
+            vol_median=(df['ATR'] / df['Close']).median(),
+            rows=len(df)
+        )
+
+    def classify(self, close: float, sma_200: float, atr: float, vol_median: float, rows: int) -> MarketRegime:
+        """
+        Regime from last-bar scalars (used directly by the incremental indicator engine).
+        vol_median is the median ATR/Close ratio over the frame.
+        """
+        if rows < 50:
+            return MarketRegime.NEUTRAL
+
         # Use ATR/Price for relative volatility
-        volatility = (last_row.get('ATR', 0) / close) * 100
-        vol_median = (df['ATR'] / df['Close']).median() * 100
+        volatility = (atr / close) * 100
+        vol_median = vol_median * 100
         
         is_trending = abs(close - sma_200) / sma_200 > 0.02 # 2% deviation from SMA 200
         
@@ -47,25 +87,34 @@ class RegimeDetector:
             else:
                 return MarketRegime.LOW_VOL_RANGING
 
+    def detect_regime_series(self, df: pd.DataFrame, window: int = 100) -> np.ndarray:
+        """
+        Regime code for every row, equal to detect_regime(df.loc[:row].tail(window)) per row
+        but computed with one rolling median and array masks. Index REGIMES / WEIGHT_MATRIX with it.
+        """
+        close = df['Close'].to_numpy(dtype=float)
+        sma_200 = df['SMA_200'].to_numpy(dtype=float) if 'SMA_200' in df else close
+        atr = df['ATR'].to_numpy(dtype=float) if 'ATR' in df else np.zeros(len(df))
+        # Median of ATR/Close over the trailing window (NaNs skipped, as Series.median does)
+        vol_median = (df['ATR'] / df['Close']).rolling(window, min_periods=1).median().to_numpy() * 100 \
+            if 'ATR' in df else np.full(len(df), np.nan)
+        volatility = (atr / close) * 100
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            is_trending = np.abs(close - sma_200) / sma_200 > 0.02  # NaN compares False
+            bull = is_trending & (close > sma_200)
+            high_vol = ~is_trending & (volatility > vol_median * 1.2)
+
+        codes = np.full(len(df), REGIME_CODES[MarketRegime.LOW_VOL_RANGING], dtype=np.int8)
+        codes[high_vol] = REGIME_CODES[MarketRegime.HIGH_VOL_RANGING]
+        codes[is_trending] = REGIME_CODES[MarketRegime.BEAR_TREND]
+        codes[bull] = REGIME_CODES[MarketRegime.BULL_TREND]
+        # Fewer than 50 rows in the trailing window
+        codes[:49] = REGIME_CODES[MarketRegime.NEUTRAL]
+        return codes
+
     def get_strategy_weights(self, regime: MarketRegime) -> dict:
         """
         Returns optimized weights for strategy ensemble based on regime.
         """
-        weights = {
-            MarketRegime.BULL_TREND: {
-                "scalping": 0.2, "momentum": 0.6, "mean_reversion": 0.2
-            },
-            MarketRegime.BEAR_TREND: {
-                "scalping": 0.2, "momentum": 0.5, "mean_reversion": 0.3
-            },
-            MarketRegime.HIGH_VOL_RANGING: {
-                "scalping": 0.5, "momentum": 0.1, "mean_reversion": 0.4
-            },
-            MarketRegime.LOW_VOL_RANGING: {
-                "scalping": 0.3, "momentum": 0.2, "mean_reversion": 0.5
-            },
-            MarketRegime.NEUTRAL: {
-                "scalping": 0.33, "momentum": 0.33, "mean_reversion": 0.34
-            }
-        }
-        return weights.get(regime, weights[MarketRegime.NEUTRAL])
+        return STRATEGY_WEIGHTS.get(regime, STRATEGY_WEIGHTS[MarketRegime.NEUTRAL])
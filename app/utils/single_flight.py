@@ -0,0 +1,41 @@
+"""
+Request coalescing ("single-flight").
+Concurrent calls for the same key share one in-flight coroutine and its result,
+so a burst of identical cache misses costs a single upstream request.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs fn() unless a call for `key` is already in flight, in which case its result
+        (or exception) is shared. The shared call runs as its own task, so a waiter
+        being cancelled never cancels it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    async def wait(self, key: Hashable) -> None:
+        """Waits for the call in flight for `key`, if any, without starting one. Its errors are not raised."""
+        task = self._inflight.get(key)
+        if task is not None:
+            await asyncio.wait({task})
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,80 @@
+"""
+Map viewports for the vessel / aircraft streams.
+Viewport selection is a vectorized bbox mask over a TrackStore's lat/lon columns.
+At low zoom, results are thinned to one object per screen-sized cell to keep
+payloads proportional to what a map can show.
+"""
+import numpy as np
+from typing import List, Optional, Set, Tuple
+from app.core import config
+from app.utils.track_store import TrackStore
+
+
+class Viewport:
+    """Client map window: bbox in degrees (west, south, east, north) plus slippy-map zoom."""
+    __slots__ = ("west", "south", "east", "north", "zoom", "key")
+
+    def __init__(self, west: float, south: float, east: float, north: float, zoom: int):
+        self.west = max(-180.0, min(180.0, float(west)))
+        self.east = max(-180.0, min(180.0, float(east)))
+        self.south = max(-90.0, min(90.0, float(south)))
+        self.north = max(-90.0, min(90.0, float(north)))
+        self.zoom = max(0, min(22, int(zoom)))
+        # Quantized so clients looking at (almost) the same area share selections and frames
+        self.key = (round(self.west, 2), round(self.south, 2), round(self.east, 2), round(self.north, 2), self.zoom)
+
+    @classmethod
+    def world(cls, zoom: int = config.VIEWPORT_DEFAULT_ZOOM) -> "Viewport":
+        return cls(-180, -90, 180, 90, zoom)
+
+    @classmethod
+    def from_message(cls, message: dict) -> Optional["Viewport"]:
+        """Parses {"bbox": [west, south, east, north], "zoom": z}. Returns None if malformed."""
+        try:
+            west, south, east, north = message["bbox"]
+            return cls(west, south, east, north, message.get("zoom", config.VIEWPORT_DEFAULT_ZOOM))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def lon_ranges(self) -> List[Tuple[float, float]]:
+        # A bbox crossing the antimeridian arrives with west > east
+        if self.west <= self.east:
+            return [(self.west, self.east)]
+        return [(self.west, 180.0), (-180.0, self.east)]
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if not (self.south <= lat <= self.north):
+            return False
+        return any(w <= lon <= e for w, e in self.lon_ranges())
+
+    def thinning_cell_deg(self) -> Optional[float]:
+        """Degrees per thinning cell at this zoom, or None when every object should be shown."""
+        if self.zoom >= config.VIEWPORT_DETAIL_ZOOM:
+            return None
+        return 360.0 / (2 ** self.zoom) / config.VIEWPORT_THIN_GRID
+
+
+def select_in_viewport(store: TrackStore, viewport: Viewport) -> Set[str]:
+    """Ids visible in the viewport, thinned to one object per cell at low zoom."""
+    n = len(store)
+    if not n:
+        return set()
+    lat, lon = store.col("lat"), store.col("lon")
+    mask = (lat >= viewport.south) & (lat <= viewport.north)
+    in_lon = np.zeros(n, dtype=bool)
+    for west, east in viewport.lon_ranges():
+        in_lon |= (lon >= west) & (lon <= east)
+    rows = np.flatnonzero(mask & in_lon)
+
+    thin_deg = viewport.thinning_cell_deg()
+    if thin_deg is not None and rows.size:
+        # Keep the lowest-hash object per cell so the choice is stable between ticks (no flicker)
+        lat_c = np.floor((lat[rows] + 90.0) / thin_deg).astype(np.int64)
+        lon_c = np.floor((lon[rows] + 180.0) / thin_deg).astype(np.int64)
+        cells = lat_c * (int(360.0 / thin_deg) + 2) + lon_c
+        order = np.lexsort((store.hashes[rows], cells))
+        _, first = np.unique(cells[order], return_index=True)
+        rows = rows[order[first]]
+
+    ids = store.ids
+    return {ids[i] for i in rows.tolist()}
@@ -0,0 +1,223 @@
+"""
+Columnar state store for moving objects (vessels, aircraft).
+Numeric telemetry lives in NumPy arrays row-aligned with an id -> row index, so
+threshold diffs, TTL eviction and hard-cap eviction are vectorized masks instead
+of Python loops over dict-of-dicts. Descriptive fields (name, type, ...) are kept
+in plain per-column lists.
+"""
+import zlib
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+COLUMNS = ("lat", "lon", "speed", "heading", "altitude", "last_seen")
+
+
+class TrackStore:
+    def __init__(
+        self,
+        id_field: str,
+        attr_fields: Dict[str, object] = None,
+        output_names: Dict[str, Optional[str]] = None,
+        int_columns: Iterable[str] = (),
+        capacity: int = 1024
+    ):
+        """
+        id_field:     record key holding the object id (e.g. "mmsi", "icao24")
+        attr_fields:  descriptive field -> default value
+        output_names: numeric column -> record key (None omits the column from records)
+        int_columns:  numeric columns emitted as ints in records (the arrays themselves are float)
+        """
+        self.id_field = id_field
+        self.attr_defaults = dict(attr_fields or {})
+        self.output_names = {c: c for c in COLUMNS}
+        self.output_names.update(output_names or {})
+        self.int_columns = frozenset(int_columns)
+
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._data = {c: np.zeros(capacity) for c in COLUMNS}
+        # Stable per-id tie-breaker (e.g. which object represents a map cell when thinning)
+        self._hash = np.zeros(capacity, dtype=np.uint32)
+        self._attrs: Dict[str, list] = {f: [] for f in self.attr_defaults}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, key: str):
+        return key in self._index
+
+    @property
+    def capacity(self) -> int:
+        return len(self._hash)
+
+    def col(self, name: str) -> np.ndarray:
+        """Live view of a numeric column over the occupied rows."""
+        return self._data[name][:len(self.ids)]
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._hash[:len(self.ids)]
+
+    def row(self, key: str) -> Optional[int]:
+        return self._index.get(key)
+
+    def rows_for(self, keys: Iterable[str]) -> np.ndarray:
+        index = self._index
+        return np.fromiter((index[k] for k in keys if k in index), dtype=np.intp)
+
+    def attr(self, field: str, row: int):
+        return self._attrs[field][row]
+
+    # --- Writes ---
+    def _reserve(self, needed: int):
+        if needed <= self.capacity:
+            return
+        new_cap = max(needed, self.capacity * 2)
+        for c, arr in self._data.items():
+            grown = np.zeros(new_cap)
+            grown[:len(self.ids)] = arr[:len(self.ids)]
+            self._data[c] = grown
+        grown = np.zeros(new_cap, dtype=np.uint32)
+        grown[:len(self.ids)] = self._hash[:len(self.ids)]
+        self._hash = grown
+
+    def upsert(self, key: str, attrs: Dict = None, **values) -> int:
+        """Scalar write path for streaming feeds. Returns the row."""
+        row = self._index.get(key)
+        if row is None:
+            row = len(self.ids)
+            self._reserve(row + 1)
+            self.ids.append(key)
+            self._index[key] = row
+            self._hash[row] = zlib.crc32(key.encode())
+            for c in COLUMNS:
+                self._data[c][row] = 0.0
+            for f, default in self.attr_defaults.items():
+                self._attrs[f].append(default)
+        for c, v in values.items():
+            self._data[c][row] = v
+        if attrs:
+            for f, v in attrs.items():
+                self._attrs[f][row] = v
+        return row
+
+    def load(self, ids: List[str], columns: Dict[str, Sequence[float]], attrs: Dict[str, list] = None):
+        """Replaces the whole store in one shot (poll-style feeds). Later duplicates win."""
+        index = dict(zip(ids, range(len(ids))))
+        keep = None
+        if len(index) != len(ids):
+            keep = np.fromiter(sorted(index.values()), dtype=np.intp)
+            ids = [ids[i] for i in keep]
+            index = dict(zip(ids, range(len(ids))))
+
+        n = len(ids)
+        self.ids = list(ids)
+        self._index = index
+        self._reserve(n)
+        for c in COLUMNS:
+            values = columns.get(c)
+            if values is None:
+                self._data[c][:n] = 0.0
+                continue
+            values = np.asarray(values, dtype=float)
+            self._data[c][:n] = values[keep] if keep is not None else values
+        self._hash[:n] = np.fromiter((zlib.crc32(k.encode()) for k in self.ids), dtype=np.uint32, count=n)
+        attrs = attrs or {}
+        for f, default in self.attr_defaults.items():
+            values = attrs.get(f)
+            if values is None:
+                self._attrs[f] = [default] * n
+            else:
+                self._attrs[f] = [values[i] for i in keep] if keep is not None else list(values)
+
+    def evict(self, mask: np.ndarray) -> List[str]:
+        """Drops the rows where mask is True, compacting the columns. Returns the evicted ids."""
+        drop = np.flatnonzero(mask)
+        if not drop.size:
+            return []
+        removed = [self.ids[i] for i in drop]
+        keep = np.flatnonzero(~mask)
+        k = keep.size
+        for c, arr in self._data.items():
+            arr[:k] = arr[keep]
+        self._hash[:k] = self._hash[keep]
+        keep_list = keep.tolist()
+        self.ids = [self.ids[i] for i in keep_list]
+        for f, values in self._attrs.items():
+            self._attrs[f] = [values[i] for i in keep_list]
+        self._index = dict(zip(self.ids, range(k)))
+        return removed
+
+    def discard(self, keys: Iterable[str]) -> List[str]:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.rows_for(keys)] = True
+        return self.evict(mask)
+
+    def evict_expired(self, now: float, ttl: float) -> List[str]:
+        return self.evict((now - self.col("last_seen")) > ttl)
+
+    def evict_oldest(self, max_rows: int) -> List[str]:
+        """Hard cap: keep only the `max_rows` most recently seen objects."""
+        n = len(self.ids)
+        if n <= max_rows:
+            return []
+        oldest = np.argpartition(self.col("last_seen"), n - max_rows)[:n - max_rows]
+        mask = np.zeros(n, dtype=bool)
+        mask[oldest] = True
+        return self.evict(mask)
+
+    # --- Reads ---
+    def records(self, rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Materializes terminal-ready dicts, only for the requested rows."""
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        row_list = rows.tolist()
+        keys = [self.id_field]
+        columns = [[self.ids[i] for i in row_list]]
+        for c, name in self.output_names.items():
+            if name:
+                keys.append(name)
+                values = self._data[c][rows]
+                if c in self.int_columns:
+                    values = np.rint(values).astype(np.int64)
+                columns.append(values.tolist())
+        for f, values in self._attrs.items():
+            keys.append(f)
+            columns.append([values[i] for i in row_list])
+        return [dict(zip(keys, vals)) for vals in zip(*columns)]
+
+    def sync(self, src: "TrackStore", thresholds: Dict[str, float]) -> Tuple[List[str], List[str]]:
+        """
+        Diffs `src` against this store, then mirrors it.
+        Returns (ids that are new or moved past a column threshold, ids no longer present).
+        """
+        n = len(src)
+        index = self._index
+        rows = np.fromiter((index.get(k, -1) for k in src.ids), dtype=np.intp, count=n)
+        known = rows >= 0
+        known_rows = rows[known]
+
+        changed = ~known
+        moved = np.zeros(known_rows.size, dtype=bool)
+        for c, eps in thresholds.items():
+            moved |= np.abs(src.col(c)[known] - self.col(c)[known_rows]) > eps
+        changed[known] = moved
+
+        present = np.zeros(len(self.ids), dtype=bool)
+        present[known_rows] = True
+        removed = [self.ids[i] for i in np.flatnonzero(~present)]
+        updated = [src.ids[i] for i in np.flatnonzero(changed)]
+
+        # Mirror src, schema included (C-level copies only)
+        self.id_field = src.id_field
+        self.attr_defaults = dict(src.attr_defaults)
+        self.output_names = dict(src.output_names)
+        self.int_columns = src.int_columns
+        self.ids = list(src.ids)
+        self._index = dict(src._index)
+        self._reserve(n)
+        for c in COLUMNS:
+            self._data[c][:n] = src.col(c)
+        self._hash[:n] = src.hashes
+        self._attrs = {f: list(values) for f, values in src._attrs.items()}
+        return updated, removed
@@ -9,6 +9,15 @@ from app.api import users, admin, prediction, trades, backtest, terminal, quotes
 from app.core.limiter import limiter
 from app.services.websocket_manager import ws_manager
 from app.services.news_service import news_service as _news_svc
+from app.utils.http_pool import http_pool
+from app.services.cache import shared_cache
+from app.utils.process_pool import process_pool
+from app.utils.blocking_executor import blocking_executor
+from app.services.backtest_jobs import backtest_jobs
+from app.services.market_snapshot import market_snapshot
+from app.services.macro_service import macro_service
+from app.services.symbol_resolver import symbol_resolver
+from app.services.symbol_catalog import symbol_catalog
 from contextlib import asynccontextmanager
 import asyncio
 import os
@@ -23,13 +32,27 @@ load_dotenv()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
+        await http_pool.start()
+        await shared_cache.start()
         await init_db()
+        symbol_resolver.load()
+        symbol_catalog.load()
         await ws_manager.start()
+        await market_snapshot.start()
+        await macro_service.start()
+        await backtest_jobs.start()
         asyncio.create_task(_news_svc.get_feed())
     except Exception as e:
         logger.error(f"Startup Error: {str(e)}")
     yield
+    await backtest_jobs.stop()
+    await macro_service.stop()
+    await market_snapshot.stop()
     await ws_manager.stop()
+    await shared_cache.stop()
+    await http_pool.close()
+    process_pool.shutdown()
+    blocking_executor.shutdown()
 
 app = FastAPI(
     title="AXIOM",
@@ -81,7 +104,15 @@ app.add_middleware(
 @app.get("/health")
 async def health_check():
     """Liveness probe for production monitoring."""
-    return {"status": "healthy", "timestamp": asyncio.get_event_loop().time()}
+    return {
+        "status": "healthy",
+        "timestamp": asyncio.get_event_loop().time(),
+        "cache": shared_cache.stats(),
+        "market_snapshot": market_snapshot.stats(),
+        "symbol_resolver": symbol_resolver.stats(),
+        "symbol_catalog": symbol_catalog.stats(),
+        "blocking_executor": blocking_executor.stats()
+    }
 
 # Include Routers
 app.include_router(users.router)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from app.services.ml_engine import MarketAnalyzer
+from app.services.indicator_engine import indicator_engine
+
+# Columns the incremental engine must reproduce from calculate_indicators
+INDICATORS = ['ATR', 'RSI', 'SMA_20', 'SMA_50', 'SMA_200', 'Vol_Ratio', 'MACD', 'Signal_Line', 'BB_Upper', 'BB_Lower']
+SIGNALS = ['Scalp_Signal', 'Momentum_Signal', 'MR_Signal']
+WINDOW = 300
+TOTAL = 1000
+
+
+def make_bars(n: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk OHLCV on an hourly index."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = close * rng.uniform(0.001, 0.02, n)
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.2, n),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 50_000, n).astype(float),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+def vectorized(frame: pd.DataFrame):
+    analyzer = MarketAnalyzer("PARITY")
+    analyzer.data = frame.copy()
+    analyzer.calculate_indicators()
+    signals = analyzer.generate_vectorized_signals()
+    return signals.iloc[-1], analyzer.regime_detector.detect_regime(signals)
+
+
+def incremental(frame: pd.DataFrame):
+    analyzer = MarketAnalyzer("PARITY")
+    analyzer.data, analyzer.interval = frame.copy(), "1h"
+    latest = analyzer._latest_signals()
+    assert latest is not None, "Incremental engine declined a clean frame"
+    rows, regime = latest
+    return rows.iloc[-1], regime
+
+
+def mismatches(frame: pd.DataFrame) -> list:
+    expected, expected_regime = vectorized(frame)
+    actual, actual_regime = incremental(frame)
+    diffs = []
+    for col in INDICATORS:
+        a, b = float(actual[col]), float(expected[col])
+        if not (np.isnan(a) and np.isnan(b)) and not np.isclose(a, b, rtol=1e-9, atol=1e-9):
+            diffs.append(f"{col}: incremental={a} vectorized={b}")
+    for col in SIGNALS:
+        if int(actual[col]) != int(expected[col]):
+            diffs.append(f"{col}: incremental={actual[col]} vectorized={expected[col]}")
+    if actual_regime != expected_regime:
+        diffs.append(f"Regime: incremental={actual_regime.value} vectorized={expected_regime.value}")
+    return diffs
+
+
+def test_indicator_parity():
+    print("--- Incremental vs Vectorized Indicator Parity ---")
+    bars = make_bars(TOTAL)
+    indicator_engine.reset()
+    checked, failures = 0, []
+
+    def check(label: str, frame: pd.DataFrame):
+        nonlocal checked
+        checked += 1
+        diffs = mismatches(frame)
+        if diffs:
+            failures.append((label, diffs))
+
+    # 1. Short frames through the warm-up rows (NaN indicators, regime below 50 rows)
+    for end in range(2, 60):
+        check(f"warm-up[:{end}]", bars.iloc[:end])
+
+    # 2. Sliding period window: one bar in, one bar out (the live 1mo / 1h case)
+    indicator_engine.reset()
+    for start in range(0, TOTAL - WINDOW):
+        frame = bars.iloc[start:start + WINDOW]
+        check(f"slide[{start}:{start + WINDOW}]", frame)
+
+        # The forming bar ticks a few times before it closes
+        if start % 25 == 0:
+            forming = frame.copy()
+            for tick in range(3):
+                forming.iloc[-1, forming.columns.get_loc('Close')] *= 1.0 + 0.002 * (tick + 1)
+                check(f"forming[{start}] tick {tick}", forming)
+
+        # A provider revision of an already committed bar rolls the state back
+        if start % 40 == 0:
+            revised = frame.copy()
+            revised.iloc[-5, revised.columns.get_loc('High')] *= 1.01
+            check(f"revised[{start}]", revised)
+
+    # 3. Gaps larger than the replay budget force a re-seed
+    indicator_engine.reset()
+    for start in (0, 400, 20, 650):
+        check(f"jump[{start}:{start + WINDOW}]", bars.iloc[start:start + WINDOW])
+
+    print(f"Windows checked: {checked}")
+    print(f"Mismatches: {len(failures)}")
+    for label, diffs in failures[:10]:
+        print(f" - {label}: {'; '.join(diffs)}")
+
+    assert not failures, "Incremental indicators diverged from the vectorized path"
+    print("\n--- Parity Verified! ---")
+
+
+if __name__ == "__main__":
+    test_indicator_parity()